@@ -1,30 +1,186 @@
 # app/api/endpoints/workflows.py
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from app.models.schemas import (
-    QueryRequest, WorkflowResponse
-)
-from app.core.workflow_selector import select_workflow
-from app.core.workflows import (
-    prompt_chaining, routing,
-    orchestrator_workers, evaluator_optimizer,
-    prompt_generator, parallel_section_voting
+    QueryRequest, WorkflowResponse, JobInfo, JobStatus, BatchRequest, UsageSummary
 )
+from app.core.workflow_runner import run_query, UnsupportedWorkflowError
 
 from app.utils.response_saver import ResponseSaver
+from app.core.deadlines import DeadlineExceeded
+from app.core.streaming import event_sink
+from app.core.jobs import JobManager, JobQueueFull
+from app.core.admission import AdmissionRejected, get_admission_controller
+from app.core.helpers.request_config import InvalidRequestConfig, config_flag, validate_request_config
+from app.core.batch import run_batch, summarize
+from app.core.response_index import get_response_index
+from app.core.metrics import REQUESTS_CANCELLED, counter_family, gauge_family, register_collector
 from app.config import settings
-import time
+from typing import Any, Optional
+import asyncio
+import json
 import logging
+import time
+import uuid
 
 router = APIRouter(
     prefix="/workflows",
     tags=["workflows"],
 )
 
-# Initialize ResponseSaver if enabled
-response_saver = ResponseSaver(settings.RESPONSES_DIR) if settings.SAVE_RESPONSES else None
+# Initialize ResponseSaver if enabled (writes in the background)
+response_saver = ResponseSaver(
+    settings.RESPONSES_DIR,
+    format=settings.RESPONSES_FORMAT,
+    queue_size=settings.RESPONSES_QUEUE_SIZE,
+    batch_size=settings.RESPONSES_BATCH_SIZE,
+    flush_seconds=settings.RESPONSES_FLUSH_SECONDS,
+    segment_max_bytes=int(settings.RESPONSES_SEGMENT_MAX_MB * 1024 * 1024),
+    index=get_response_index() if settings.ARCHIVE_INDEX_ENABLED else None,
+) if settings.SAVE_RESPONSES else None
+
+async def _serve_from_archive(request: QueryRequest) -> Optional[WorkflowResponse]:
+    """
+    Return the archived answer to a repeat of an earlier query, if serving from
+    the archive is enabled (settings.ARCHIVE_SERVE_ENABLED or ``config.from_archive``)
+    and the request does not fix its workflow (``config.workflow``).
+    """
+    config = request.config or {}
+    if not settings.ARCHIVE_INDEX_ENABLED or not config_flag(config, "from_archive", settings.ARCHIVE_SERVE_ENABLED):
+        return None
+    if config.get("workflow"):
+        # The archived answer may come from any workflow
+        return None
+    started = time.time()
+    try:
+        hit = await asyncio.to_thread(
+            get_response_index().find_repeat,
+            request.query,
+            settings.ARCHIVE_SERVE_MIN_SIMILARITY,
+            settings.ARCHIVE_SERVE_MAX_AGE_SECONDS or None,
+        )
+    except Exception as e:
+        logging.error(f"Archive lookup failed: {str(e)}")
+        return None
+    if hit is None:
+        return None
+    archived, similarity, saved_at = hit
+    logging.info(f"Serving archived answer from session {archived.session_id} (similarity {similarity:.2f}, saved {saved_at})")
+    return archived.model_copy(update={
+        "session_id": request.session_id or str(uuid.uuid4()),
+        "archived_from": archived.session_id,
+        "processing_time": time.time() - started,
+        "usage": UsageSummary(),
+        "degraded": None,
+        "error": None,
+    })
+
+async def _run_workflow(request: QueryRequest) -> WorkflowResponse:
+    """
+    Run the query in-process (see app.core.workflow_runner) and save the response.
+    
+    Shared by the blocking and streaming endpoints. A repeat of an archived
+    query is answered from the archive when that mode is enabled.
+    """
+    archived = await _serve_from_archive(request)
+    if archived is not None:
+        return archived
+    
+    response = await run_query(request)
+    
+    # Queue the response for the archive if enabled (never blocks the request)
+    if response_saver is not None:
+        try:
+            response_saver.save_response(response, request)
+        except Exception as save_error:
+            logging.error(f"Error saving response: {str(save_error)}")
+            # Don't fail the request if saving fails
+    
+    return response
+
+def _error_status(error: Exception) -> int:
+    """HTTP status for a failed workflow run (as raised by the blocking endpoint)."""
+    if isinstance(error, DeadlineExceeded):
+        return 504
+    if isinstance(error, (UnsupportedWorkflowError, InvalidRequestConfig)):
+        return 400
+    return 500
+
+# Background job pool for long-running queries (started on first submission)
+job_manager = JobManager(
+    _run_workflow,
+    workers=settings.JOB_WORKERS,
+    max_queued=settings.JOB_QUEUE_MAX,
+    retention_seconds=settings.JOB_RETENTION_SECONDS,
+    error_status=_error_status,
+)
+
+def _service_metrics():
+    """Scrape-time metrics of the job pool and the archive writer."""
+    stats = job_manager.get_stats()
+    yield gauge_family("jobs_running", "Background jobs running", {(): stats["running"]})
+    yield gauge_family("jobs_queued", "Background jobs waiting for a worker", {(): stats["queued"]})
+    yield counter_family(
+        "jobs", "Background jobs by outcome",
+        {(("outcome", outcome),): stats[outcome] for outcome in ("succeeded", "failed", "rejected")},
+    )
+    if response_saver is not None:
+        stats = response_saver.get_stats()
+        yield gauge_family("archive_queue_depth", "Responses waiting for the archive writer", {(): stats["pending"]})
+        yield counter_family(
+            "archived_responses", "Responses handed to the archive writer, by result",
+            {(("result", result),): stats[result] for result in ("written", "dropped", "failed")},
+        )
+
+register_collector(_service_metrics)
+
+async def _run_admitted(request: QueryRequest) -> WorkflowResponse:
+    """
+    Run the query under admission control (settings.ADMISSION_ENABLED): under
+    load it may be degraded, wait for capacity, or be rejected.
+    
+    Raises:
+        AdmissionRejected: If the server is at capacity
+    """
+    if not settings.ADMISSION_ENABLED:
+        return await _run_workflow(request)
+    allow_degraded = config_flag(request.config, "degrade", True)
+    async with get_admission_controller().admit(allow_degraded) as ticket:
+        response = await _run_workflow(request)
+        ticket.record(response)
+        return response
+
+async def _run_until_disconnect(request: QueryRequest, http_request: Request) -> WorkflowResponse:
+    """
+    Run the query, cancelling it (and its in-flight LLM calls) if the client
+    disconnects first. The connection is checked every DISCONNECT_POLL_SECONDS.
+    
+    Raises:
+        HTTPException: 499 if the client disconnected
+    """
+    if settings.DISCONNECT_POLL_SECONDS <= 0:
+        return await _run_admitted(request)
+    
+    task = asyncio.create_task(_run_admitted(request))
+    try:
+        while True:
+            done, _ = await asyncio.wait([task], timeout=settings.DISCONNECT_POLL_SECONDS)
+            if done:
+                return task.result()
+            if await http_request.is_disconnected():
+                break
+    finally:
+        if not task.done():
+            task.cancel()
+    
+    REQUESTS_CANCELLED.labels("client_disconnect").inc()
+    logging.info("Client disconnected, query cancelled")
+    await asyncio.wait([task])
+    raise HTTPException(status_code=499, detail="Client closed request")
 
 @router.post("/process", response_model=WorkflowResponse)
-async def process_query(request: QueryRequest):
+async def process_query(request: QueryRequest, http_request: Request):
     """
     Process a user query through the appropriate workflow.
     
@@ -33,7 +189,19 @@ async def process_query(request: QueryRequest):
     2. Executes the selected workflow
     3. Tracks intermediate processing steps
     4. Measures processing time
-    5. Optionally saves the response to disk
+    5. Attaches per-phase / per-role LLM token usage (``usage``)
+    6. Optionally saves the response to disk
+    
+    LLM calls run in the "interactive" priority lane unless the request sets
+    ``config.priority`` to "batch". Every LLM call made while handling the
+    request shares one deadline of settings.TIMEOUT_SECONDS (overridable via
+    ``config.timeout_seconds``); retries never extend past it. If the client
+    disconnects, the workflow and its in-flight LLM calls are cancelled.
+    
+    Under load, admission control (app.core.admission) first degrades new
+    queries (``degraded`` is set on the response), then queues them, and
+    finally rejects them with 429; ``config.degrade = false`` opts out of
+    degradation.
     
     Args:
         request: The QueryRequest containing the user's query
@@ -43,62 +211,260 @@ async def process_query(request: QueryRequest):
                          intermediate steps, and processing time
                          
     Raises:
-        HTTPException: If an unsupported workflow is selected or if processing fails
+        HTTPException: (400) if the config is invalid or an unsupported workflow
+                       is selected, if processing fails, (504) if the request
+                       deadline expired, or (429 with Retry-After) if the
+                       server is at capacity
     """
-    start_time = time.time()
-    
     try:
-        # Select the appropriate workflow
-        workflow_selection = await select_workflow(request.query)
-        
-        # Execute the selected workflow
-        selected_workflow = workflow_selection.selected_workflow
-        intermediate_steps = []
-        
-        # Route to the appropriate workflow handler
-        if selected_workflow == "prompt_chaining":
-            final_response, steps = await prompt_chaining.execute(workflow_selection, request.query)
-        elif selected_workflow == "routing":
-            final_response, steps = await routing.execute(workflow_selection, request.query)
-        elif selected_workflow == "orchestrator_workers":
-            final_response, steps = await orchestrator_workers.execute(workflow_selection, request.query)
-        elif selected_workflow == "evaluator_optimizer":
-            final_response, steps = await evaluator_optimizer.execute(workflow_selection, request.query)
-        elif selected_workflow == "prompt_generator":
-            final_response, steps = await prompt_generator.execute(workflow_selection, request.query)
-        elif selected_workflow == "parallel_section_voting":
-            final_response, steps = await parallel_section_voting.execute(workflow_selection, request.query)
-        else:
-            # Fallback to direct query if workflow is not recognized
-            raise HTTPException(status_code=400, detail=f"Unsupported workflow: {selected_workflow}")
+        return await _run_until_disconnect(request, http_request)
+    
+    except HTTPException:
+        raise
+    except AdmissionRejected as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    except DeadlineExceeded as e:
+        logging.error(f"Query exceeded its deadline: {str(e)}")
+        raise HTTPException(status_code=504, detail="Request deadline exceeded")
+    except (UnsupportedWorkflowError, InvalidRequestConfig) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logging.error(f"Error processing query: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+def _encode_event(event: str, payload: Any, fmt: str) -> str:
+    """Serialize one stream event as an SSE frame or an NDJSON line."""
+    data = jsonable_encoder(payload)
+    if fmt == "ndjson":
+        return json.dumps({"event": event, "data": data}) + "\n"
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.post("/process/stream")
+async def process_query_stream(request: QueryRequest, format: str = "sse"):
+    """
+    Process a user query and stream progress while the workflow runs.
+    
+    Emits, as Server-Sent Events (default) or NDJSON (``?format=ndjson``):
+    - ``selection``: the WorkflowSelection as soon as the selector returns
+    - ``step``: each AgentResponse when it completes
+    - ``final_start`` / ``token``: the final answer, chunk by chunk
+      (a new ``final_start`` stream id replaces the previous candidate)
+    - ``final``: the complete WorkflowResponse (authoritative)
+    - ``error``: ``{"status_code", "detail"}`` if processing failed (429 with
+      ``retry_after`` if admission control rejected the query)
+    
+    Args:
+        request: The QueryRequest containing the user's query
+        format: "sse" or "ndjson"
         
-        intermediate_steps.extend(steps)
+    Returns:
+        StreamingResponse: text/event-stream or application/x-ndjson
+    """
+    fmt = "ndjson" if format == "ndjson" else "sse"
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+    
+    async def run() -> None:
+        with event_sink(lambda event, payload: queue.put_nowait((event, payload))):
+            try:
+                response = await _run_admitted(request)
+                queue.put_nowait(("final", response))
+            except AdmissionRejected as e:
+                queue.put_nowait(("error", {"status_code": 429, "detail": str(e), "retry_after": e.retry_after}))
+            except DeadlineExceeded as e:
+                logging.error(f"Streamed query exceeded its deadline: {str(e)}")
+                queue.put_nowait(("error", {"status_code": 504, "detail": "Request deadline exceeded"}))
+            except (UnsupportedWorkflowError, InvalidRequestConfig) as e:
+                queue.put_nowait(("error", {"status_code": 400, "detail": str(e)}))
+            except Exception as e:
+                logging.error(f"Error processing streamed query: {str(e)}")
+                queue.put_nowait(("error", {"status_code": 500, "detail": str(e)}))
+            finally:
+                queue.put_nowait(done)
+    
+    async def events():
+        task = asyncio.create_task(run())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield _encode_event(item[0], item[1], fmt)
+        finally:
+            # Client went away: stop the workflow instead of finishing it unread
+            if not task.done():
+                task.cancel()
+                REQUESTS_CANCELLED.labels("client_disconnect").inc()
+    
+    media_type = "application/x-ndjson" if fmt == "ndjson" else "text/event-stream"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@router.post("/batch")
+async def process_batch(batch: BatchRequest, format: str = "ndjson"):
+    """
+    Process a list of queries together and stream each result as it completes.
+    
+    Identical queries (same query and config) run once. At most
+    ``max_concurrency`` queries run at a time (capped by
+    settings.BATCH_MAX_CONCURRENCY), their LLM calls share one in-flight budget
+    of settings.BATCH_MAX_IN_FLIGHT, and once ``token_budget`` tokens
+    (default settings.BATCH_TOKEN_BUDGET) are used no further queries start.
+    Queries run in the "batch" priority lane unless they set ``config.priority``.
+    
+    Emits, as NDJSON (default) or Server-Sent Events (``?format=sse``):
+    - ``result``: ``{"index", "ok": true, "deduplicated", "response"}`` or
+      ``{"index", "ok": false, "status_code", "error"}``, in completion order
+    - ``done``: totals, failures, deduplicated count, tokens and elapsed seconds
+    
+    Args:
+        batch: The BatchRequest with the QueryRequests
+        format: "ndjson" or "sse"
         
-        # Calculate processing time
-        processing_time = time.time() - start_time
+    Returns:
+        StreamingResponse: application/x-ndjson or text/event-stream
         
-        # Create the response object
-        response = WorkflowResponse(
-            workflow_info=workflow_selection,
-            final_response=final_response,
-            intermediate_steps=intermediate_steps,
-            processing_time=processing_time
+    Raises:
+        HTTPException: 400 if the batch exceeds settings.BATCH_MAX_REQUESTS
+    """
+    if len(batch.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Batch of {len(batch.requests)} queries exceeds the limit of {settings.BATCH_MAX_REQUESTS}"
         )
+    fmt = "sse" if format == "sse" else "ndjson"
+    max_concurrency = min(batch.max_concurrency or settings.BATCH_MAX_CONCURRENCY, settings.BATCH_MAX_CONCURRENCY)
+    token_budget = batch.token_budget or settings.BATCH_TOKEN_BUDGET or None
+    
+    async def events():
+        started = time.monotonic()
+        results = []
+        async for result in run_batch(
+            batch.requests,
+            _run_workflow,
+            max_concurrency=max_concurrency,
+            max_in_flight=settings.BATCH_MAX_IN_FLIGHT,
+            token_budget=token_budget,
+            error_status=_error_status,
+        ):
+            results.append(result)
+            yield _encode_event("result", result, fmt)
+        yield _encode_event("done", summarize(results, started), fmt)
+    
+    media_type = "text/event-stream" if fmt == "sse" else "application/x-ndjson"
+    return StreamingResponse(events(), media_type=media_type, headers={"Cache-Control": "no-cache"})
+
+@router.post("/jobs", response_model=JobInfo, status_code=202)
+async def submit_job(request: QueryRequest, http_request: Request, response: Response):
+    """
+    Queue a query for background execution and return its job id immediately.
+    
+    The job runs in a bounded worker pool (settings.JOB_WORKERS) with a deadline
+    of settings.JOB_TIMEOUT_SECONDS unless ``config.timeout_seconds`` is set.
+    Poll ``GET /jobs/{job_id}`` for progress and ``GET /jobs/{job_id}/result``
+    for the final WorkflowResponse.
+    
+    Args:
+        request: The QueryRequest containing the user's query
         
-        # Save the response to a file if enabled
-        if response_saver is not None:
-            try:
-                saved_path = response_saver.save_response(response)
-                logging.info(f"Response saved to: {saved_path}")
-            except Exception as save_error:
-                logging.error(f"Error saving response: {str(save_error)}")
-                # Don't fail the request if saving fails
+    Returns:
+        JobInfo: The queued job (status "queued" and its queue position)
         
-        return response
+    Raises:
+        HTTPException: 400 if config.priority or config.timeout_seconds is invalid,
+                       429 with a Retry-After header if the job queue is full
+    """
+    try:
+        validate_request_config(request.config)
+        job = job_manager.submit(request)
+    except InvalidRequestConfig as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    response.headers["Location"] = http_request.url_for("get_job", job_id=job.job_id).path
+    return job_manager.info(job)
+
+@router.get("/jobs/stats")
+async def job_stats():
+    """
+    Get the state of the background job pool.
     
-    except Exception as e:
-        logging.error(f"Error processing query: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    Returns:
+        dict: Workers, running and queued jobs, queue capacity, retained jobs,
+              submitted/rejected/succeeded/failed counts and mean job time
+    """
+    return job_manager.get_stats()
+
+@router.get("/admission/stats")
+async def admission_stats():
+    """
+    Get the state of admission control.
+    
+    Returns:
+        dict: Load vs. capacity (in expected LLM calls), in-flight and waiting
+              queries, expected fan-out per mode, and admitted/reduced/cheapest/
+              queued/rejected/timed-out counts
+    """
+    return get_admission_controller().get_stats()
+
+@router.get("/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str):
+    """
+    Get a job's status and progress.
+    
+    Returns:
+        JobInfo: Status, queue position, selected workflow, intermediate steps
+                 completed so far, the final answer text streamed so far, and
+                 the WorkflowResponse once it succeeded
+        
+    Raises:
+        HTTPException: 404 if the job is unknown or expired
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    return job_manager.info(job)
+
+@router.get("/jobs/{job_id}/result", response_model=WorkflowResponse)
+async def get_job_result(job_id: str):
+    """
+    Get the WorkflowResponse of a finished job.
+    
+    Raises:
+        HTTPException: 404 if the job is unknown, 409 if it has not finished or was cancelled,
+                       or the job's error status (400/500/504) if it failed
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=job.error_status or 500, detail=job.error)
+    if job.status != JobStatus.SUCCEEDED:
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    return job.result
+
+@router.delete("/jobs/{job_id}", response_model=JobInfo)
+async def cancel_job(job_id: str):
+    """
+    Cancel a queued or running job.
+    
+    A running job's workflow is cancelled together with its in-flight LLM
+    calls; the job ends with status "cancelled".
+    
+    Returns:
+        JobInfo: The job after the cancellation request
+        
+    Raises:
+        HTTPException: 404 if the job is unknown, 409 if it already finished
+    """
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Unknown job: {job_id}")
+    if not job_manager.cancel(job):
+        raise HTTPException(status_code=409, detail=f"Job is {job.status.value}")
+    if job.task is not None and not job.task.done():
+        # Let the cancellation unwind so the returned status is final
+        await asyncio.wait([job.task])
+    return job_manager.info(job)
 
 # Endpoint to get information about available tools
 @router.get("/tools")
@@ -128,4 +494,150 @@ async def list_tools():
             }
             for name, tool in tools.items()
         ]
-    }
\ No newline at end of file
+    }
+# Endpoint to inspect the response archive writer
+@router.get("/archive/stats")
+async def archive_stats():
+    """
+    Get the state of the background response archive writer.
+    
+    Returns:
+        dict: Format, pending/queued/written/dropped/failed responses, batches,
+              segments and compressed bytes written (empty if saving is disabled)
+    """
+    stats = response_saver.get_stats() if response_saver is not None else {}
+    if settings.ARCHIVE_INDEX_ENABLED:
+        stats["index"] = await asyncio.to_thread(get_response_index().get_stats)
+    return stats
+
+@router.get("/archive/search")
+async def search_archive(
+    q: Optional[str] = None,
+    workflow: Optional[str] = None,
+    session_id: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: int = 20,
+):
+    """
+    Search archived responses.
+    
+    Args:
+        q: Words that must all appear in the query or final answer (BM25 ranked)
+        workflow: Only responses of this workflow
+        session_id: Only responses of this session
+        since / until: ISO timestamps bounding when the response was saved
+        limit: Maximum hits (at most 100)
+        
+    Returns:
+        dict: ``hits`` with id, session_id, workflow, saved_at, query, snippet and score
+        
+    Raises:
+        HTTPException: 404 if the archive index is disabled
+    """
+    if not settings.ARCHIVE_INDEX_ENABLED:
+        raise HTTPException(status_code=404, detail="The archive index is disabled")
+    hits = await asyncio.to_thread(
+        get_response_index().search, q, workflow, session_id, since, until, min(max(1, limit), 100)
+    )
+    return {"hits": hits}
+
+@router.get("/archive/{entry_id}")
+async def get_archived_response(entry_id: int):
+    """
+    Get one archived response (by the id returned from ``/archive/search``).
+    
+    Returns:
+        dict: id, saved_at, user_id, query and the full WorkflowResponse
+        
+    Raises:
+        HTTPException: 404 if the entry does not exist or the index is disabled
+    """
+    record = await asyncio.to_thread(get_response_index().get, entry_id) if settings.ARCHIVE_INDEX_ENABLED else None
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Unknown archive entry: {entry_id}")
+    return record
+
+# Endpoint to inspect the LLM response cache
+@router.get("/cache/stats")
+async def llm_cache_stats():
+    """
+    Get hit/miss/eviction counters for the LLM response cache.
+    
+    Returns:
+        dict: Memory and disk hit counts, misses, stores, evictions, expirations,
+              overall hit rate and current tier sizes
+    """
+    from app.core.llm_cache import get_response_cache
+    
+    return get_response_cache().get_stats()
+
+# Endpoint to scrape process-wide LLM usage
+@router.get("/usage")
+async def llm_usage():
+    """
+    Get LLM token usage and latency accumulated since startup.
+    
+    Returns:
+        dict: Totals plus per workflow/phase and per persona role breakdowns of
+              calls, prompt/output/thinking/cached tokens and LLM wall time
+    """
+    from app.core.usage import get_usage_rollup
+    
+    return get_usage_rollup()
+
+# Endpoint to inspect the shared Gemini connection pool
+@router.get("/transport/stats")
+async def llm_transport_stats():
+    """
+    Get connection-pool utilization for the shared Gemini HTTP transport.
+    
+    Returns:
+        dict: Pool limits, live/active/idle connections, queued and in-flight
+              requests, and the LLM governor's in-flight limit for comparison
+    """
+    from app.core.gemini_transport import get_transport_stats
+    
+    stats = get_transport_stats()
+    stats["llm_max_in_flight"] = settings.LLM_MAX_IN_FLIGHT
+    return stats
+
+
+# Endpoint to inspect the local workflow pre-classifier and selection cache
+@router.get("/selector/stats")
+async def selector_stats():
+    """
+    Get metrics of the workflow selection shortcuts.
+    
+    Returns:
+        dict: Queries classified, bypass rate, agreement with the LLM selector
+              (on fallbacks and shadowed bypasses), mean classification time,
+              hit rate / size of the semantic selection cache, speculative
+              execution hit rate and wasted calls, and workflow race outcomes
+    """
+    from app.core.workflow_classifier import get_classifier_stats
+    from app.core.selection_cache import get_selection_cache
+    from app.core.speculation import get_speculation_stats
+    from app.core.workflow_race import get_race_stats
+    
+    stats = get_classifier_stats()
+    if settings.SELECTOR_CACHE_ENABLED:
+        stats["semantic_cache"] = get_selection_cache().get_stats()
+    stats["speculation"] = get_speculation_stats()
+    stats["race"] = get_race_stats()
+    return stats
+
+
+# Endpoint to inspect the workflow registry
+@router.get("/registry")
+async def workflow_registry():
+    """
+    List registered workflows and the import cost of their modules.
+    
+    Returns:
+        dict: Per workflow: module path, whether it has been loaded, import
+              seconds and the number of modules its import pulled in
+    """
+    from app.core.workflow_registry import get_import_report
+    
+    return get_import_report()
@@ -0,0 +1,210 @@
+# app/batch_runner.py
+"""
+Offline Batch Runner
+
+Runs a JSONL file of QueryRequests through workflow selection and the selected
+workflow in-process (no HTTP server), with a bounded number of queries in
+flight. Each result is appended to the output JSONL as soon as it completes, so
+a crashed or interrupted run can be resumed: rows already answered successfully
+in the output file are skipped, failed rows are retried.
+
+Input lines are QueryRequest objects, e.g. {"query": "...", "session_id": "..."}.
+Output lines look like:
+    {"row": 3, "key": "3:1f2e...", "ok": true, "elapsed": 12.4, "response": {...WorkflowResponse}}
+    {"row": 4, "key": "4:9a0b...", "ok": false, "elapsed": 0.1, "error": "..."}
+
+Queries run in the "batch" priority lane by default, so a batch sharing the
+process (and its LLM quota) with the API yields to interactive traffic.
+
+Usage:
+    python -m app.batch_runner queries.jsonl -o results.jsonl --concurrency 4
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+from pydantic import ValidationError
+
+from app.core.workflow_runner import run_query
+from app.core.usage import get_usage_rollup
+from app.models.schemas import QueryRequest
+
+
+def _row_key(row: int, line: str) -> str:
+    """Identity of an input row: its position plus a digest of its content."""
+    return f"{row}:{hashlib.sha256(line.strip().encode('utf-8')).hexdigest()[:16]}"
+
+
+def read_rows(path: str) -> Iterator[Tuple[int, str, str]]:
+    """Yield (row number, key, raw line) for each non-blank input line."""
+    with open(path, "r", encoding="utf-8") as f:
+        for row, line in enumerate(f, 1):
+            if line.strip():
+                yield row, _row_key(row, line), line
+
+
+def load_completed(path: str) -> Set[str]:
+    """
+    Collect the keys of rows already answered successfully in an output file.
+
+    A trailing partial line (from a crash mid-write) is truncated away so new
+    results are appended on a clean line boundary.
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(path):
+        return completed
+
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            cut = data.rfind(b"\n") + 1
+            logging.warning(f"Truncating partial last line of {path}")
+            f.truncate(cut)
+            data = data[:cut]
+
+    for line in data.decode("utf-8").splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if record.get("ok") and record.get("key"):
+            completed.add(record["key"])
+    return completed
+
+
+class ResultWriter:
+    """Appends one JSON line per finished row and flushes it immediately."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        self._file.close()
+
+
+async def _run_row(row: int, key: str, line: str, priority: str) -> Dict[str, Any]:
+    """Process one input row and return its output record."""
+    started = time.monotonic()
+    record: Dict[str, Any] = {"row": row, "key": key}
+    try:
+        request = QueryRequest.model_validate_json(line)
+        response = await run_query(request, default_priority=priority)
+        record.update(ok=True, response=response.model_dump(mode="json"))
+    except ValidationError as e:
+        record.update(ok=False, error=f"Invalid QueryRequest: {e.errors()[0].get('msg')}")
+    except Exception as e:
+        logging.error(f"Row {row} failed: {str(e)}")
+        record.update(ok=False, error=str(e))
+    record["elapsed"] = round(time.monotonic() - started, 3)
+    return record
+
+
+async def run_batch(
+    input_path: str,
+    output_path: str,
+    concurrency: int = 4,
+    priority: str = "batch",
+    resume: bool = True,
+    limit: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Run every pending row of ``input_path`` and append results to ``output_path``.
+
+    Args:
+        input_path: JSONL file of QueryRequests
+        output_path: JSONL results file (appended to)
+        concurrency: Maximum number of queries in flight
+        priority: Default priority lane for rows that do not set config.priority
+        resume: Skip rows already answered successfully in output_path
+        limit: Process at most this many pending rows
+
+    Returns:
+        dict: Counts of total/skipped/succeeded/failed rows, elapsed seconds and LLM usage totals
+    """
+    if not resume and os.path.exists(output_path):
+        os.remove(output_path)
+    completed = load_completed(output_path) if resume else set()
+
+    summary = {"total": 0, "skipped": 0, "succeeded": 0, "failed": 0}
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    writer = ResultWriter(output_path)
+    started = time.monotonic()
+
+    async def worker() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            record = await _run_row(*item, priority=priority)
+            writer.write(record)
+            summary["succeeded" if record["ok"] else "failed"] += 1
+            done = summary["succeeded"] + summary["failed"]
+            logging.info(f"Row {record['row']} {'ok' if record['ok'] else 'failed'} in {record['elapsed']:.1f}s ({done} done)")
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+    try:
+        pending = 0
+        for row, key, line in read_rows(input_path):
+            summary["total"] += 1
+            if key in completed:
+                summary["skipped"] += 1
+                continue
+            if limit is not None and pending >= limit:
+                continue
+            pending += 1
+            await queue.put((row, key, line))
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+        writer.close()
+
+    summary["elapsed"] = round(time.monotonic() - started, 3)
+    summary["usage"] = get_usage_rollup()["totals"]
+    return summary
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of QueryRequests through the workflow system.")
+    parser.add_argument("input", help="JSONL file with one QueryRequest per line")
+    parser.add_argument("-o", "--output", help="Results JSONL (default: <input>.results.jsonl)")
+    parser.add_argument("-c", "--concurrency", type=int, default=4, help="Queries in flight (default: 4)")
+    parser.add_argument("--priority", default="batch", choices=["batch", "interactive"],
+                        help="Priority lane for rows without config.priority (default: batch)")
+    parser.add_argument("--no-resume", action="store_true", help="Start over instead of skipping completed rows")
+    parser.add_argument("--limit", type=int, help="Process at most N pending rows")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    output = args.output or f"{os.path.splitext(args.input)[0]}.results.jsonl"
+    summary = asyncio.run(run_batch(
+        args.input,
+        output,
+        concurrency=args.concurrency,
+        priority=args.priority,
+        resume=not args.no_resume,
+        limit=args.limit,
+    ))
+    print(json.dumps(summary, indent=2))
+    return 0 if summary["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,307 @@
+# app/benchmark.py
+"""
+Workflow Benchmark Harness
+
+Drives each registered workflow's ``execute`` directly (no workflow selection, no
+HTTP) a fixed number of times and reports, per workflow:
+
+- End-to-end latency: p50 / p95 / p99 / mean / max seconds
+- LLM calls per run
+- Critical path: the longest chain of LLM calls that ran one after another
+  (calls and LLM seconds), i.e. the sequencing a workflow cannot parallelize
+- Concurrency achieved: mean (LLM seconds / wall seconds) and peak overlapping calls
+- Per-phase breakdown: calls, LLM seconds and wall-clock span of each phase
+
+By default the LLM is the fake backend (app.core.fake_genai), so runs are
+offline, deterministic and cheap; ``--live`` benchmarks the real API instead.
+Results are written as JSON. Passing ``--baseline`` compares against a previous
+results file and exits 1 when a workflow's fan-out or sequencing changed (LLM
+calls or critical-path calls) or its p95 latency regressed beyond a tolerance.
+
+Usage:
+    python -m app.benchmark -n 20 -c 4 -o bench.json
+    python -m app.benchmark -w routing -w prompt_chaining --time-scale 0.1 --baseline bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from app.config import settings
+from app.core.deadlines import deadline_scope
+from app.core.rate_limiter import priority_lane
+from app.core.usage import LLMCallRecord, usage_scope, set_workflow
+from app.core.workflow_registry import get_workflow_handler, get_workflow_registry
+from app.core.workflow_selector import forced_selection
+
+DEFAULT_QUERY = "Compare caching strategies for a read-heavy web API and recommend one with a rollout plan."
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of ``values`` (pct in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(position), math.ceil(position)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def _distribution(values: List[float]) -> Dict[str, float]:
+    return {
+        "p50": round(_percentile(values, 50), 4),
+        "p95": round(_percentile(values, 95), 4),
+        "p99": round(_percentile(values, 99), 4),
+        "mean": round(statistics.fmean(values), 4) if values else 0.0,
+        "max": round(max(values), 4) if values else 0.0,
+    }
+
+
+def analyze_calls(records: List[LLMCallRecord], wall_seconds: float) -> Dict[str, Any]:
+    """
+    Derive critical path, concurrency and per-phase spans from one run's LLM call records.
+
+    The critical path is the longest chain of calls where each call started
+    after the previous one finished.
+    """
+    intervals = sorted(
+        ((r.started_at, r.started_at + r.wall_seconds, r) for r in records),
+        key=lambda interval: interval[0],
+    )
+    chain_calls: List[int] = []
+    chain_seconds: List[float] = []
+    for i, (start, _, record) in enumerate(intervals):
+        best_calls, best_seconds = 0, 0.0
+        for j in range(i):
+            if intervals[j][1] <= start:
+                best_calls = max(best_calls, chain_calls[j])
+                best_seconds = max(best_seconds, chain_seconds[j])
+        chain_calls.append(best_calls + 1)
+        chain_seconds.append(best_seconds + record.wall_seconds)
+
+    # Peak overlap: sweep over start (+1) / end (-1) events, ends first on ties
+    events = sorted([(start, 1) for start, _, _ in intervals] + [(end, -1) for _, end, _ in intervals])
+    active = peak = 0
+    for _, delta in events:
+        active += delta
+        peak = max(peak, active)
+
+    phases: Dict[str, Dict[str, Any]] = {}
+    for start, end, record in intervals:
+        phase = phases.setdefault(record.phase or "unlabeled", {"calls": 0, "llm_seconds": 0.0, "start": start, "end": end})
+        phase["calls"] += 1
+        phase["llm_seconds"] += record.wall_seconds
+        phase["start"] = min(phase["start"], start)
+        phase["end"] = max(phase["end"], end)
+
+    llm_seconds = sum(r.wall_seconds for r in records)
+    return {
+        "llm_calls": len(records),
+        "critical_path_calls": max(chain_calls, default=0),
+        "critical_path_seconds": max(chain_seconds, default=0.0),
+        "mean_concurrency": llm_seconds / wall_seconds if wall_seconds > 0 else 0.0,
+        "peak_concurrency": peak,
+        "total_tokens": sum(r.total_tokens for r in records),
+        "phases": {
+            name: {"calls": p["calls"], "llm_seconds": p["llm_seconds"], "span_seconds": p["end"] - p["start"]}
+            for name, p in phases.items()
+        },
+    }
+
+
+async def run_once(workflow: str, query: str) -> Dict[str, Any]:
+    """Execute one workflow run and return its wall time plus call analysis."""
+    selection = forced_selection(workflow, reasoning="Fixed by the benchmark harness.")
+    started = time.monotonic()
+    with priority_lane("interactive"), deadline_scope(float(settings.TIMEOUT_SECONDS)), usage_scope() as tracker:
+        set_workflow(workflow)
+        await get_workflow_handler(workflow)(selection, query)
+    wall_seconds = time.monotonic() - started
+    result = analyze_calls(tracker.records, wall_seconds)
+    result["wall_seconds"] = wall_seconds
+    return result
+
+
+async def benchmark_workflow(workflow: str, query: str, iterations: int, concurrency: int) -> Dict[str, Any]:
+    """
+    Run a workflow ``iterations`` times with up to ``concurrency`` runs in flight.
+
+    Each run gets a distinct query suffix so the response cache and in-flight
+    coalescing never short-circuit a run.
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    failures: List[str] = []
+
+    async def one(i: int) -> Optional[Dict[str, Any]]:
+        async with semaphore:
+            try:
+                return await run_once(workflow, f"{query} (benchmark run {i + 1})")
+            except Exception as e:
+                logging.error(f"{workflow} run {i + 1} failed: {str(e)}")
+                failures.append(str(e))
+                return None
+
+    started = time.monotonic()
+    runs = [run for run in await asyncio.gather(*(one(i) for i in range(iterations))) if run is not None]
+    elapsed = time.monotonic() - started
+
+    phase_names = sorted({name for run in runs for name in run["phases"]})
+    phases = {}
+    for name in phase_names:
+        samples = [run["phases"][name] for run in runs if name in run["phases"]]
+        phases[name] = {
+            "calls": round(statistics.fmean(s["calls"] for s in samples), 3),
+            "llm_seconds": _distribution([s["llm_seconds"] for s in samples]),
+            "span_seconds": _distribution([s["span_seconds"] for s in samples]),
+        }
+
+    return {
+        "runs": len(runs),
+        "failures": len(failures),
+        "errors": sorted(set(failures))[:5],
+        "throughput_per_minute": round(len(runs) / elapsed * 60, 2) if elapsed > 0 else 0.0,
+        "latency_seconds": _distribution([run["wall_seconds"] for run in runs]),
+        "llm_calls": _distribution([run["llm_calls"] for run in runs]),
+        "critical_path_calls": _distribution([run["critical_path_calls"] for run in runs]),
+        "critical_path_seconds": _distribution([run["critical_path_seconds"] for run in runs]),
+        "concurrency": {
+            "mean": round(statistics.fmean(run["mean_concurrency"] for run in runs), 3) if runs else 0.0,
+            "peak": max((run["peak_concurrency"] for run in runs), default=0),
+        },
+        "total_tokens": _distribution([run["total_tokens"] for run in runs]),
+        "phases": phases,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], latency_tolerance: float) -> List[str]:
+    """
+    List regressions of ``results`` against ``baseline``.
+
+    Flags changed mean LLM calls or critical-path calls (fan-out / sequencing
+    changes) and p95 latency above baseline * (1 + latency_tolerance).
+    """
+    regressions = []
+    for workflow, current in results["workflows"].items():
+        previous = baseline.get("workflows", {}).get(workflow)
+        if previous is None:
+            continue
+        for metric in ("llm_calls", "critical_path_calls"):
+            before, after = previous[metric]["mean"], current[metric]["mean"]
+            if abs(after - before) > 1e-6:
+                regressions.append(f"{workflow}: mean {metric} changed {before} -> {after}")
+        before, after = previous["latency_seconds"]["p95"], current["latency_seconds"]["p95"]
+        if before > 0 and after > before * (1 + latency_tolerance):
+            regressions.append(f"{workflow}: p95 latency {before:.3f}s -> {after:.3f}s")
+    return regressions
+
+
+async def run_benchmark(workflows: List[str], query: str, iterations: int, concurrency: int) -> Dict[str, Any]:
+    """Benchmark each workflow in turn and return the full results document."""
+    results: Dict[str, Any] = {
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "backend": settings.GEMINI_BACKEND,
+        "model": settings.GEMINI_MODEL,
+        "query": query,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "workflows": {},
+    }
+    if settings.GEMINI_BACKEND == "fake":
+        results["fake_backend"] = {
+            "seed": settings.FAKE_LLM_SEED,
+            "latency_ms": settings.FAKE_LLM_LATENCY_MS,
+            "latency_sigma": settings.FAKE_LLM_LATENCY_SIGMA,
+            "tokens_per_second": settings.FAKE_LLM_TOKENS_PER_SECOND,
+            "output_tokens": settings.FAKE_LLM_OUTPUT_TOKENS,
+            "error_rate": settings.FAKE_LLM_ERROR_RATE,
+            "time_scale": settings.FAKE_LLM_TIME_SCALE,
+        }
+    for workflow in workflows:
+        logging.info(f"Benchmarking {workflow} ({iterations} runs, concurrency {concurrency})")
+        results["workflows"][workflow] = await benchmark_workflow(workflow, query, iterations, concurrency)
+        summary = results["workflows"][workflow]
+        logging.info(
+            f"{workflow}: p50 {summary['latency_seconds']['p50']:.2f}s, "
+            f"p95 {summary['latency_seconds']['p95']:.2f}s, "
+            f"{summary['llm_calls']['mean']:.1f} calls, "
+            f"critical path {summary['critical_path_calls']['mean']:.1f}"
+        )
+    return results
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the workflow modules end to end.")
+    parser.add_argument("-w", "--workflow", action="append", choices=get_workflow_registry().names(),
+                        help="Workflow to benchmark (repeatable; default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=10, help="Runs per workflow (default: 10)")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="Runs in flight per workflow (default: 1)")
+    parser.add_argument("-q", "--query", default=DEFAULT_QUERY, help="Query to run")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="Results JSON (default: benchmark.json)")
+    parser.add_argument("--baseline", help="Previous results JSON to compare against")
+    parser.add_argument("--latency-tolerance", type=float, default=0.2,
+                        help="Allowed relative p95 latency increase vs. baseline (default: 0.2)")
+    parser.add_argument("--live", action="store_true", help="Use the real Gemini API instead of the fake backend")
+    parser.add_argument("--no-rate-limit", action="store_true",
+                        help="Disable the LLM request/token rate limits (in-flight cap still applies)")
+    parser.add_argument("--seed", type=int, help="Fake backend seed")
+    parser.add_argument("--latency-ms", type=float, help="Fake backend median time to first token")
+    parser.add_argument("--tokens-per-second", type=float, help="Fake backend generation rate")
+    parser.add_argument("--error-rate", type=float, help="Fake backend injected error rate")
+    parser.add_argument("--time-scale", type=float, help="Fake backend latency multiplier")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+
+    # Settings are read when the clients and governor are first created, so override them up front
+    if not args.live:
+        settings.GEMINI_BACKEND = "fake"
+    for option, setting in (
+        ("seed", "FAKE_LLM_SEED"),
+        ("latency_ms", "FAKE_LLM_LATENCY_MS"),
+        ("tokens_per_second", "FAKE_LLM_TOKENS_PER_SECOND"),
+        ("error_rate", "FAKE_LLM_ERROR_RATE"),
+        ("time_scale", "FAKE_LLM_TIME_SCALE"),
+    ):
+        if getattr(args, option) is not None:
+            setattr(settings, setting, getattr(args, option))
+    if args.no_rate_limit:
+        settings.LLM_REQUESTS_PER_MINUTE = 0
+        settings.LLM_TOKENS_PER_MINUTE = 0
+
+    workflows = args.workflow or get_workflow_registry().names()
+    results = asyncio.run(run_benchmark(workflows, args.query, args.iterations, args.concurrency))
+
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.latency_tolerance)
+        results["regressions"] = regressions
+        for regression in regressions:
+            logging.warning(f"Regression: {regression}")
+        exit_code = 1 if regressions else 0
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(json.dumps({name: {
+        "p50": summary["latency_seconds"]["p50"],
+        "p95": summary["latency_seconds"]["p95"],
+        "p99": summary["latency_seconds"]["p99"],
+        "llm_calls": summary["llm_calls"]["mean"],
+        "critical_path_calls": summary["critical_path_calls"]["mean"],
+        "mean_concurrency": summary["concurrency"]["mean"],
+    } for name, summary in results["workflows"].items()}, indent=2))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
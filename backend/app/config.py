@@ -12,6 +12,14 @@ The Settings class includes:
 - File paths for agent workspace and response storage
 - Google Gemini API configuration (migrated from Azure OpenAI)
 - Workflow behavior settings
+- LLM response cache settings
+- LLM rate limiting and concurrency settings
+- LLM retry / backoff settings
+- Gemini HTTP transport (connection pool) settings
+- Fake Gemini backend settings (offline load testing)
+- LLM record / replay cassette settings
+- Workflow pre-classifier settings
+- Semantic workflow selection cache settings
 
 The module also ensures required directories exist on startup.
 
@@ -42,14 +50,25 @@ class Settings(BaseSettings):
     # Response saving settings
     SAVE_RESPONSES: bool = True
     RESPONSES_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "responses"))
+    RESPONSES_FORMAT: str = "jsonl"  # "jsonl" (compressed, rotating segments) or "markdown" (one file per response)
+    RESPONSES_QUEUE_SIZE: int = 1000  # Responses waiting for the background writer; more are dropped
+    RESPONSES_BATCH_SIZE: int = 50
+    RESPONSES_FLUSH_SECONDS: float = 1.0
+    RESPONSES_SEGMENT_MAX_MB: float = 64  # JSONL segment size before rotation
+    ARCHIVE_INDEX_ENABLED: bool = True  # SQLite/FTS5 index of archived responses (search API)
+    ARCHIVE_INDEX_PATH: str = ""  # Empty: index.sqlite3 in RESPONSES_DIR
+    ARCHIVE_SERVE_ENABLED: bool = False  # Answer repeat queries from the archive (per request: config.from_archive)
+    ARCHIVE_SERVE_MIN_SIMILARITY: float = 0.95  # 1.0 serves exact (normalized) repeats only
+    ARCHIVE_SERVE_MAX_AGE_SECONDS: int = 86400  # Oldest archived answer to serve (0 = any age)
     
     # Context File Setting
     CONTEXT_FILE_PATH: Optional[str] = os.getenv("CONTEXT_FILE_PATH", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "context.md")))
 
     # Google Gemini API Settings (migrated from Azure OpenAI)
-    GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY")
+    GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.5-pro")  # Default to latest model
     GEMINI_THINKING_BUDGET: Optional[int] = None  # e.g., -1 for auto/unlimited, or an integer
+    GEMINI_BACKEND: str = "live"  # "live" calls the API; "fake" uses the offline stand-in (app.core.fake_genai)
     
     # Alternative Vertex AI settings (for enterprise use)
     GOOGLE_CLOUD_PROJECT: str = os.getenv("GOOGLE_CLOUD_PROJECT", "")
@@ -58,8 +77,106 @@ class Settings(BaseSettings):
 
     # Workflow Settings
     DEFAULT_WORKFLOW: str = "orchestrator_workers"
-    MAX_RETRIES: int = 3
-    TIMEOUT_SECONDS: int = 120
+    DIRECT_ANSWER_ENABLED: bool = True  # Answer simple, confidently classified queries in a single call
+    DIRECT_ANSWER_MIN_CONFIDENCE: float = 0.8
+    DIRECT_ANSWER_FROM: str = "routing,prompt_chaining,evaluator_optimizer"  # Workflows the fast path may replace
+    WORKFLOW_PRELOAD: str = ""  # Comma-separated workflows to import at startup ("all" for every one); lazy otherwise
+    MAX_RETRIES: int = 3  # Retries per LLM call after the first attempt (transient errors only)
+    TIMEOUT_SECONDS: int = 120  # End-to-end deadline for one API request, shared by all its LLM calls
+
+    # LLM retry backoff (exponential with full jitter; Retry-After is honored)
+    LLM_RETRY_BASE_DELAY_SECONDS: float = 1.0
+    LLM_RETRY_MAX_DELAY_SECONDS: float = 30.0
+
+    # LLM response cache settings (opt-in per call / per persona config)
+    LLM_CACHE_ENABLED: bool = False  # Default for calls that don't pass cache=...
+    LLM_CACHE_MEMORY_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: int = 24 * 60 * 60  # 0 disables expiry
+    LLM_CACHE_DISK_ENABLED: bool = True
+    LLM_CACHE_DIR: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "llm"))
+    LLM_CACHE_DISK_MAX_MB: int = 256
+    LLM_COALESCE_IN_FLIGHT: bool = True  # Await identical in-flight requests instead of re-issuing
+
+    # LLM rate limiting / concurrency (shared by all Gemini clients; 0 disables a limit)
+    LLM_REQUESTS_PER_MINUTE: int = 150  # Match your Gemini quota tier
+    LLM_TOKENS_PER_MINUTE: int = 2_000_000
+    LLM_MAX_IN_FLIGHT: int = 16
+
+    # Gemini HTTP transport (one shared connection pool for all Gemini calls)
+    LLM_HTTP_MAX_CONNECTIONS: int = 32
+    LLM_HTTP_MAX_KEEPALIVE: int = 16
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 120.0
+    LLM_HTTP2: bool = True  # Requires the optional 'h2' package; falls back to HTTP/1.1
+    LLM_HTTP_WARMUP: bool = True  # Open a connection on startup
+    LLM_HTTP_WARMUP_TIMEOUT_SECONDS: float = 10.0
+
+    # Fake Gemini backend (GEMINI_BACKEND=fake): deterministic outputs, simulated latency and errors
+    FAKE_LLM_SEED: int = 0
+    FAKE_LLM_LATENCY_MS: float = 600.0  # Median time to first token
+    FAKE_LLM_LATENCY_SIGMA: float = 0.4  # Lognormal spread of time to first token (0 = fixed)
+    FAKE_LLM_TOKENS_PER_SECOND: float = 120.0  # Output and thinking token generation rate
+    FAKE_LLM_OUTPUT_TOKENS: int = 500  # Median length of free-text responses
+    FAKE_LLM_ERROR_RATE: float = 0.0  # Fraction of calls failing with 429 / 503
+    FAKE_LLM_TIME_SCALE: float = 1.0  # Multiplies all simulated latency (0 = no sleeping)
+
+    # LLM record / replay cassettes (see app.core.cassettes)
+    LLM_CASSETTE_MODE: str = "off"  # "off", "record" (overwrites the file) or "replay"
+    LLM_CASSETTE_PATH: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "cassettes", "default.jsonl.gz"))
+    LLM_CASSETTE_REPLAY_LATENCY: bool = False  # Replay with the recorded latency instead of instantly
+
+    # Local workflow pre-classifier (skips the LLM selector call when confident)
+    SELECTOR_CLASSIFIER_ENABLED: bool = True
+    SELECTOR_CLASSIFIER_THRESHOLD: float = 0.85  # Minimum confidence to skip the LLM selector
+    SELECTOR_CLASSIFIER_MODEL_WEIGHT: float = 0.5  # Weight of the trained model vs. the rules
+    SELECTOR_CLASSIFIER_SHADOW_RATE: float = 0.0  # Fraction of bypassed queries also sent to the LLM to measure agreement
+    SELECTOR_CLASSIFIER_MODEL_PATH: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "selector", "classifier.json"))
+    SELECTOR_LOG_ENABLED: bool = False  # Log LLM selections (raw queries) as training data; never with GEMINI_BACKEND=fake
+    SELECTOR_LOG_PATH: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "selector", "selections.jsonl"))
+    SELECTOR_LOG_MAX_MB: float = 16  # Rotated to <path>.1 beyond this size
+
+    # Semantic cache of LLM workflow selections (reused for near-duplicate queries)
+    SELECTOR_CACHE_ENABLED: bool = True
+    SELECTOR_CACHE_THRESHOLD: float = 0.9  # Minimum cosine similarity to reuse a decision
+    SELECTOR_CACHE_MAX_ENTRIES: int = 2048  # Least recently used entries are evicted beyond this
+    SELECTOR_CACHE_EMBEDDER: str = "hashing"  # "hashing" (local) or "gemini" (embedding API call per lookup)
+    SELECTOR_CACHE_EMBEDDING_MODEL: str = "gemini-embedding-001"
+    SELECTOR_CACHE_DIMENSIONS: int = 512
+    SELECTOR_CACHE_PATH: str = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "selector", "decisions.npz"))  # Empty keeps it in memory
+
+    # Speculative execution: run the predicted workflow while the selector decides
+    SPECULATIVE_EXECUTION_ENABLED: bool = False  # Per request: config.speculative
+    SPECULATIVE_MIN_CONFIDENCE: float = 0.5  # Minimum classifier confidence to speculate
+    SPECULATIVE_SESSION_MEMORY: int = 1024  # Sessions whose last selection is remembered as a prediction
+
+    # Race the selector's alternative workflow when its confidence is low
+    WORKFLOW_RACE_ENABLED: bool = False  # Per request: config.race
+    WORKFLOW_RACE_MAX_CONFIDENCE: float = 0.8  # Race only selections below this confidence
+    WORKFLOW_RACE_MAX_IN_FLIGHT: int = 4  # LLM calls both raced workflows may have in flight together (0 = no cap)
+    WORKFLOW_RACE_GRACE_SECONDS: float = 0.0  # Extra wait for the selected workflow once the alternative finished
+
+    # Admission control for /workflows/process (and /process/stream)
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_CAPACITY: int = 0  # Expected LLM calls of all admitted queries (0 = 4 x LLM_MAX_IN_FLIGHT)
+    ADMISSION_REDUCE_AT: float = 0.7  # Above this share of capacity, run with the "simple" complexity budget
+    ADMISSION_CHEAPEST_AT: float = 0.9  # Above this share, answer with direct_answer
+    ADMISSION_QUEUE_MAX: int = 32  # Queries waiting for capacity; more are rejected with 429
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = 10.0  # Longest wait for capacity before 429
+    ADMISSION_DEFAULT_FANOUT: float = 8.0  # Expected LLM calls per query until observed
+
+    # Cancel /workflows/process queries whose client disconnected
+    DISCONNECT_POLL_SECONDS: float = 0.5  # How often the connection is checked (0 = never cancel)
+
+    # Background job API (/workflows/jobs)
+    JOB_WORKERS: int = 4  # Jobs executing concurrently
+    JOB_QUEUE_MAX: int = 100  # Jobs waiting for a worker; more are rejected with 429
+    JOB_TIMEOUT_SECONDS: int = 900  # Default deadline of a job (config.timeout_seconds overrides)
+    JOB_RETENTION_SECONDS: int = 3600  # Finished jobs stay retrievable this long
+
+    # Batch endpoint (/workflows/batch)
+    BATCH_MAX_REQUESTS: int = 100  # Queries per batch
+    BATCH_MAX_CONCURRENCY: int = 4  # Queries of one batch running at once
+    BATCH_MAX_IN_FLIGHT: int = 8  # LLM calls in flight across one batch (0 = governor limit only)
+    BATCH_TOKEN_BUDGET: int = 0  # Default token budget per batch (0 = unlimited)
 
     class Config:
         env_file = ".env"
@@ -70,6 +187,8 @@ class Settings(BaseSettings):
     @property
     def is_gemini_configured(self) -> bool:
         """Check if Google Gemini is properly configured"""
+        if self.GEMINI_BACKEND == "fake":
+            return True
         if self.USE_VERTEX_AI:
             return bool(self.GOOGLE_CLOUD_PROJECT and self.GOOGLE_CLOUD_LOCATION)
         return bool(self.GEMINI_API_KEY)
@@ -102,7 +221,10 @@ if settings.SAVE_RESPONSES and not os.path.exists(settings.RESPONSES_DIR):
 # Print configuration status on startup
 if settings.DEBUG:
     if settings.is_gemini_configured:
-        provider = "Vertex AI" if settings.USE_VERTEX_AI else "Gemini Developer API"
+        if settings.GEMINI_BACKEND == "fake":
+            provider = "the fake backend (offline, simulated responses)"
+        else:
+            provider = "Vertex AI" if settings.USE_VERTEX_AI else "Gemini Developer API"
         print(f"✓ Google Gemini configured using {provider}")
         print(f"  Model: {settings.GEMINI_MODEL}")
     else:
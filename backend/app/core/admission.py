@@ -0,0 +1,279 @@
+# app/core/admission.py
+"""
+Admission Control and Load Shedding
+
+Under a burst every accepted query fans out into many LLM calls that all wait
+on the same governor, so they slow each other down until they time out
+together. The admission controller sits in front of the query endpoints and
+keeps the expected LLM fan-out of the queries it admits under a capacity
+target (ADMISSION_CAPACITY, in LLM calls; default 4 x LLM_MAX_IN_FLIGHT):
+
+- Each admitted query is charged its expected fan-out: a running average of
+  the LLM calls made by queries admitted in the same mode.
+- As load grows, new queries are degraded before anything is rejected:
+  "reduced" (above ADMISSION_REDUCE_AT of capacity) runs the selected workflow
+  with the "simple" complexity budget (fewer subtasks / sections / rounds and
+  lower thinking budgets); "cheapest" (above ADMISSION_CHEAPEST_AT) skips the
+  selector and answers with the single-call direct_answer workflow.
+- When not even the cheapest mode fits, the query waits in a FIFO queue (up to
+  ADMISSION_QUEUE_MAX queries, for at most ADMISSION_QUEUE_TIMEOUT_SECONDS)
+  and is then rejected with AdmissionRejected (HTTP 429 + Retry-After).
+
+``config.degrade = false`` opts a query out of degradation: it runs in full or
+waits for capacity.
+
+Usage:
+    from app.core.admission import get_admission_controller
+
+    async with get_admission_controller().admit() as ticket:
+        response = await run_query(request)   # reads current_degradation()
+        ticket.record(response)
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+
+from app.config import settings
+from app.models.schemas import WorkflowResponse
+
+NORMAL = "normal"
+REDUCED = "reduced"
+CHEAPEST = "cheapest"
+
+# Degradation of the query running in this context (None = full workflow)
+_degradation: ContextVar[Optional[str]] = ContextVar("admission_degradation", default=None)
+
+
+def current_degradation() -> Optional[str]:
+    """Return "reduced" or "cheapest" if the current query was admitted degraded."""
+    return _degradation.get()
+
+
+class AdmissionRejected(Exception):
+    """Raised when a query cannot be admitted within the queue limits."""
+
+    def __init__(self, retry_after: int, reason: str):
+        super().__init__(f"Server is at capacity ({reason}), retry after {retry_after}s")
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+@dataclass
+class AdmissionStats:
+    """Counters for admission decisions."""
+    admitted: int = 0
+    reduced: int = 0  # Admitted with the "simple" complexity budget
+    cheapest: int = 0  # Admitted as direct_answer
+    queued: int = 0
+    rejected: int = 0  # Queue full
+    queue_timeouts: int = 0
+    peak_load: float = 0.0
+
+
+class AdmissionTicket:
+    """An admitted query: its mode and a hook to learn its actual fan-out."""
+
+    def __init__(self, controller: "AdmissionController", mode: str):
+        self.controller = controller
+        self.mode = mode
+
+    @property
+    def degraded(self) -> Optional[str]:
+        return None if self.mode == NORMAL else self.mode
+
+    def record(self, response: WorkflowResponse) -> None:
+        """Feed the query's LLM call count into the expected fan-out of its mode."""
+        if response.usage is not None:
+            self.controller.observe(self.mode, response.usage.totals.calls)
+
+
+class AdmissionController:
+    """
+    Admits queries while their expected LLM fan-out fits the capacity target.
+
+    Args:
+        capacity: Expected LLM calls of all admitted queries
+        reduce_at / cheapest_at: Fractions of capacity above which new queries are degraded
+        max_queued: Queries allowed to wait for capacity
+        queue_timeout_seconds: Longest wait before rejecting
+        default_fanout: Expected LLM calls of a full query until some were observed
+    """
+
+    def __init__(
+        self,
+        capacity: float,
+        reduce_at: float = 0.7,
+        cheapest_at: float = 0.9,
+        max_queued: int = 32,
+        queue_timeout_seconds: float = 10.0,
+        default_fanout: float = 8.0,
+    ):
+        self.capacity = max(1.0, capacity)
+        self.thresholds = ((NORMAL, reduce_at), (REDUCED, cheapest_at), (CHEAPEST, 1.0))
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout_seconds = queue_timeout_seconds
+        # Running average of LLM calls per query, by admission mode
+        self.fanout = {NORMAL: default_fanout, REDUCED: max(1.0, default_fanout / 2), CHEAPEST: 1.0}
+        self.load = 0.0
+        self.in_flight = 0
+        self.stats = AdmissionStats()
+        self._waiters: Deque[Tuple["asyncio.Future[str]", bool]] = deque()
+        self._mean_seconds: Optional[float] = None
+
+    def _mode_for(self, allow_degraded: bool) -> Optional[str]:
+        """Best mode whose expected fan-out fits under its threshold, or None."""
+        if self.in_flight == 0:
+            return NORMAL
+        for mode, threshold in self.thresholds:
+            if self.load + self.fanout[mode] <= threshold * self.capacity:
+                return mode
+            if not allow_degraded:
+                return None
+        return None
+
+    def _reserve(self, mode: str) -> None:
+        self.load += self.fanout[mode]
+        self.in_flight += 1
+        self.stats.admitted += 1
+        if mode == REDUCED:
+            self.stats.reduced += 1
+        elif mode == CHEAPEST:
+            self.stats.cheapest += 1
+        self.stats.peak_load = max(self.stats.peak_load, self.load)
+
+    def _release(self, cost: float) -> None:
+        self.load = max(0.0, self.load - cost)
+        self.in_flight -= 1
+        self._pump()
+
+    def _pump(self) -> None:
+        """Admit waiting queries, in order, while they fit."""
+        while self._waiters:
+            future, allow_degraded = self._waiters[0]
+            if future.done():
+                self._waiters.popleft()
+                continue
+            mode = self._mode_for(allow_degraded)
+            if mode is None:
+                break
+            self._waiters.popleft()
+            self._reserve(mode)
+            future.set_result(mode)
+
+    def _waiting(self) -> int:
+        """Queries still waiting for capacity (timed-out and cancelled waits are not counted)."""
+        return sum(1 for future, _ in self._waiters if not future.done())
+
+    def _forget(self, future: "asyncio.Future[str]") -> None:
+        """Drop a waiter that gave up, so it no longer holds a queue slot."""
+        self._waiters = deque(entry for entry in self._waiters if entry[0] is not future)
+
+    def retry_after(self) -> int:
+        """Seconds until capacity is likely to free up."""
+        mean = self._mean_seconds or 10.0
+        return max(1, min(300, math.ceil(mean * (self._waiting() + 1) / max(1, self.in_flight))))
+
+    async def _wait(self, allow_degraded: bool) -> str:
+        if self._waiting() >= self.max_queued:
+            self.stats.rejected += 1
+            raise AdmissionRejected(self.retry_after(), "queue full")
+        future: "asyncio.Future[str]" = asyncio.get_running_loop().create_future()
+        self._waiters.append((future, allow_degraded))
+        self.stats.queued += 1
+        try:
+            return await asyncio.wait_for(future, timeout=self.queue_timeout_seconds)
+        except asyncio.TimeoutError:
+            self._forget(future)
+            self.stats.queue_timeouts += 1
+            raise AdmissionRejected(self.retry_after(), "queue timeout") from None
+        except asyncio.CancelledError:
+            self._forget(future)
+            if future.done() and not future.cancelled():
+                # Admitted just before we were cancelled: hand the capacity back
+                self._release(self.fanout[future.result()])
+            raise
+
+    @asynccontextmanager
+    async def admit(self, allow_degraded: bool = True) -> AsyncIterator[AdmissionTicket]:
+        """
+        Admit one query for the duration of the block.
+
+        Args:
+            allow_degraded: Whether the query may run reduced or as direct_answer
+
+        Yields:
+            AdmissionTicket: The admission mode (also exposed via current_degradation())
+
+        Raises:
+            AdmissionRejected: If the queue is full or the wait timed out
+        """
+        mode = None if self._waiting() else self._mode_for(allow_degraded)
+        if mode is not None:
+            self._reserve(mode)
+        else:
+            mode = await self._wait(allow_degraded)
+        cost = self.fanout[mode]
+        if mode != NORMAL:
+            logging.info(f"Admitted query as {mode} (load {self.load:.0f}/{self.capacity:.0f} expected LLM calls)")
+
+        ticket = AdmissionTicket(self, mode)
+        token = _degradation.set(ticket.degraded)
+        started = time.monotonic()
+        try:
+            yield ticket
+        finally:
+            _degradation.reset(token)
+            elapsed = time.monotonic() - started
+            self._mean_seconds = elapsed if self._mean_seconds is None else 0.9 * self._mean_seconds + 0.1 * elapsed
+            self._release(cost)
+
+    def observe(self, mode: str, calls: int) -> None:
+        """Update the expected fan-out of a mode with a finished query's LLM calls."""
+        if calls > 0:
+            self.fanout[mode] = 0.9 * self.fanout[mode] + 0.1 * calls
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return load, capacity, in-flight and queued queries, expected fan-out per mode and decision counters."""
+        stats = asdict(self.stats)
+        stats.update({
+            "enabled": settings.ADMISSION_ENABLED,
+            "load": round(self.load, 2),
+            "capacity": self.capacity,
+            "in_flight": self.in_flight,
+            "waiting": self._waiting(),
+            "expected_fanout": {mode: round(value, 2) for mode, value in self.fanout.items()},
+            "mean_query_seconds": round(self._mean_seconds, 3) if self._mean_seconds is not None else None,
+        })
+        stats["peak_load"] = round(stats["peak_load"], 2)
+        return stats
+
+
+# Singleton instance
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Get the process-wide admission controller (singleton pattern).
+
+    Returns:
+        AdmissionController: Configured from the ADMISSION_* settings.
+    """
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            capacity=settings.ADMISSION_CAPACITY or 4 * settings.LLM_MAX_IN_FLIGHT,
+            reduce_at=settings.ADMISSION_REDUCE_AT,
+            cheapest_at=settings.ADMISSION_CHEAPEST_AT,
+            max_queued=settings.ADMISSION_QUEUE_MAX,
+            queue_timeout_seconds=settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+            default_fanout=settings.ADMISSION_DEFAULT_FANOUT,
+        )
+    return _admission_controller
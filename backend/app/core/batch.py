@@ -0,0 +1,136 @@
+# app/core/batch.py
+"""
+Batch Query Scheduling
+
+Runs a list of QueryRequests from one client as a unit instead of as N
+independent requests that each fan out without limit:
+
+- Deduplication: requests with the same query and config run once; every
+  duplicate receives that result (with its own session_id).
+- Shared concurrency: at most ``max_concurrency`` queries run at a time, and
+  the LLM calls of all of them share one in-flight budget
+  (``request_concurrency``) on top of the process-wide governor.
+- Shared token budget: once the batch's completed queries used
+  ``token_budget`` tokens, queries not yet started fail with status 429.
+- Queries run in the "batch" priority lane unless they set ``config.priority``,
+  so a batch yields to interactive traffic.
+
+Results are yielded in completion order, one per input index.
+
+Usage:
+    from app.core.batch import run_batch
+
+    async for result in run_batch(requests, runner, max_concurrency=4):
+        print(result["index"], result["ok"])
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from app.core.metrics import REQUESTS_CANCELLED
+from app.core.rate_limiter import request_concurrency
+from app.models.schemas import QueryRequest, WorkflowResponse
+
+BatchRunner = Callable[[QueryRequest], Awaitable[WorkflowResponse]]
+
+
+def request_key(request: QueryRequest) -> str:
+    """Identity of a request for deduplication: its query and config."""
+    payload = json.dumps({"query": request.query.strip(), "config": request.config or {}}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def run_batch(
+    requests: List[QueryRequest],
+    runner: BatchRunner,
+    max_concurrency: int = 4,
+    max_in_flight: int = 0,
+    token_budget: Optional[int] = None,
+    error_status: Optional[Callable[[Exception], int]] = None,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run a batch of queries and yield their results as they complete.
+
+    Args:
+        requests: The QueryRequests, in client order
+        runner: Coroutine function executing one QueryRequest
+        max_concurrency: Queries running at once
+        max_in_flight: LLM calls in flight across the whole batch (0 = only the governor's limit)
+        token_budget: Total tokens after which no further queries start (None = unlimited)
+        error_status: Maps an exception to the status code reported for a failed query
+
+    Yields:
+        {"index", "ok": True, "deduplicated", "response": WorkflowResponse} or
+        {"index", "ok": False, "status_code", "error"}
+    """
+    error_status = error_status or (lambda e: 500)
+    groups: Dict[str, List[int]] = {}
+    for index, request in enumerate(requests):
+        groups.setdefault(request_key(request), []).append(index)
+
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+    results: asyncio.Queue = asyncio.Queue()
+    tokens_used = 0
+
+    async def run_group(indices: List[int]) -> None:
+        nonlocal tokens_used
+        request = requests[indices[0]]
+        config = dict(request.config or {})
+        config.setdefault("priority", "batch")
+        async with semaphore:
+            if token_budget is not None and tokens_used >= token_budget:
+                results.put_nowait((indices, None, 429, "Batch token budget exhausted"))
+                return
+            try:
+                response = await runner(request.model_copy(update={"config": config}))
+            except Exception as e:
+                logging.error(f"Batch query {indices[0]} failed: {str(e)}")
+                results.put_nowait((indices, None, error_status(e), str(e)))
+                return
+        if response.usage is not None:
+            tokens_used += response.usage.totals.total_tokens
+        results.put_nowait((indices, response, None, None))
+
+    with request_concurrency(max_in_flight):
+        tasks = [asyncio.create_task(run_group(indices)) for indices in groups.values()]
+    if len(groups) < len(requests):
+        logging.info(f"Batch of {len(requests)} queries deduplicated to {len(groups)}")
+
+    try:
+        for _ in range(len(tasks)):
+            indices, response, status_code, error = await results.get()
+            for position, index in enumerate(indices):
+                if response is None:
+                    yield {"index": index, "ok": False, "status_code": status_code, "error": error}
+                    continue
+                item = response
+                session_id = requests[index].session_id
+                if position > 0:
+                    item = response.model_copy(update={"session_id": session_id} if session_id else {})
+                yield {"index": index, "ok": True, "deduplicated": position > 0, "response": item}
+    finally:
+        # Consumer went away (or finished): stop anything still running
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+                REQUESTS_CANCELLED.labels("client_disconnect").inc()
+
+
+def summarize(results: List[Dict[str, Any]], started: float) -> Dict[str, Any]:
+    """Counts and elapsed time of a finished batch."""
+    succeeded = [r for r in results if r["ok"]]
+    return {
+        "total": len(results),
+        "succeeded": len(succeeded),
+        "failed": len(results) - len(succeeded),
+        "deduplicated": sum(1 for r in succeeded if r.get("deduplicated")),
+        "total_tokens": sum(
+            r["response"].usage.totals.total_tokens
+            for r in succeeded if not r.get("deduplicated") and r["response"].usage is not None
+        ),
+        "elapsed": round(time.monotonic() - started, 3),
+    }
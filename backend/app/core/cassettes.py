@@ -0,0 +1,227 @@
+# app/core/cassettes.py
+"""
+LLM Record / Replay Cassettes
+
+Records every Gemini request/response pair that goes through the LLM clients
+(text, continuation rounds, function calls and structured outputs) into a
+compact cassette file, and replays them later without touching the network, so
+a slow or wrong workflow run can be re-executed offline for profiling and
+regression tests.
+
+A cassette is gzip-compressed JSONL when its path ends in ``.gz`` (plain JSONL
+otherwise); one line per API call:
+    {"key": "<request digest>", "kind": "generate", "model": "...", "phase": "...",
+     "role": "...", "latency": 1.84, "response": {...GenerateContentResponse}}
+
+Requests are matched by a digest of model, contents and generation config. A
+request issued several times in one run is replayed in recorded order (the last
+recording is reused once exhausted). In replay mode a request missing from the
+cassette raises CassetteMiss; replay serves responses instantly, or after the
+recorded latency with ``replay_latency=True``.
+
+Cassettes are selected process-wide with LLM_CASSETTE_MODE / LLM_CASSETTE_PATH,
+or for one block of code with ``use_cassette()`` (a context variable, so it
+flows into asyncio.gather fan-outs).
+
+Usage:
+    from app.core.cassettes import use_cassette
+
+    with use_cassette("runs/slow_orchestrator.jsonl.gz", mode="record"):
+        await orchestrator_workers.execute(selection, query)
+
+    with use_cassette("runs/slow_orchestrator.jsonl.gz", mode="replay"):
+        await orchestrator_workers.execute(selection, query)  # milliseconds, offline
+"""
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterator, List, Optional
+
+from google.genai import types
+
+from app.config import settings
+from app.core.llm_cache import make_cache_key
+from app.core.usage import current_labels
+
+# Response fields that are transport details or SDK conveniences rebuilt from the rest
+_EXCLUDED_RESPONSE_FIELDS = {"sdk_http_response", "parsed", "automatic_function_calling_history"}
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a request was never recorded."""
+
+
+@dataclass
+class CassetteStats:
+    """Counters for one cassette."""
+    recorded: int = 0
+    replayed: int = 0
+    misses: int = 0
+
+
+def cassette_key(model: str, contents: Any, config: Optional[types.GenerateContentConfig]) -> str:
+    """Digest of everything in a request that determines its response."""
+    fields = {}
+    if config is not None:
+        for name in type(config).model_fields:
+            value = getattr(config, name)
+            if value is not None and name != "http_options":
+                fields[name] = value
+    return make_cache_key({"model": model, "contents": contents, "config": fields})
+
+
+def _open(path: str, mode: str):
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class Cassette:
+    """
+    One cassette file in record or replay mode.
+
+    Args:
+        path: Cassette file (``.gz`` suffix for gzip compression)
+        mode: "record" (truncates the file) or "replay"
+        replay_latency: In replay mode, wait the recorded latency before returning
+    """
+
+    def __init__(self, path: str, mode: str, replay_latency: bool = False):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode '{mode}' (expected 'record' or 'replay')")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.stats = CassetteStats()
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._file = None
+
+        if mode == "replay":
+            self._load()
+        else:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = _open(path, "w")
+            logging.info(f"Recording LLM interactions to {path}")
+
+    def _load(self) -> None:
+        count = 0
+        try:
+            with _open(self.path, "r") as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    entry = json.loads(line)
+                    self._entries.setdefault(entry["key"], []).append(entry)
+                    count += 1
+        except EOFError:
+            # Cassette from a process that died mid-write: keep what was flushed
+            logging.warning(f"Cassette {self.path} is truncated; using the first {count} interactions")
+        logging.info(f"Loaded {count} LLM interactions from cassette {self.path}")
+
+    def record(self, key: str, kind: str, model: str, response: types.GenerateContentResponse, latency: float) -> None:
+        """Append one request/response pair (flushed immediately)."""
+        _, phase, role = current_labels()
+        entry = {
+            "key": key,
+            "kind": kind,
+            "model": model,
+            "phase": phase,
+            "role": role,
+            "latency": round(latency, 4),
+            "response": response.model_dump(mode="json", exclude_none=True, exclude=_EXCLUDED_RESPONSE_FIELDS),
+        }
+        line = json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line)
+            self._file.flush()
+            self.stats.recorded += 1
+
+    async def replay(self, key: str) -> types.GenerateContentResponse:
+        """
+        Serve the next recorded response for ``key``.
+
+        Raises:
+            CassetteMiss: If the request is not in the cassette
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.stats.misses += 1
+                raise CassetteMiss(f"Request {key[:12]} not found in cassette {self.path}")
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            entry = entries[min(cursor, len(entries) - 1)]
+            self.stats.replayed += 1
+
+        if self.replay_latency and entry.get("latency"):
+            await asyncio.sleep(entry["latency"])
+        return types.GenerateContentResponse.model_validate(entry["response"])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"path": self.path, "mode": self.mode, **asdict(self.stats)}
+
+
+_active: ContextVar[Optional[Cassette]] = ContextVar("llm_cassette", default=None)
+_configured: Optional[Cassette] = None
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "replay", replay_latency: bool = False) -> Iterator[Cassette]:
+    """Record or replay the LLM calls made in the enclosed block (and the tasks it spawns)."""
+    cassette = Cassette(path, mode, replay_latency=replay_latency)
+    token = _active.set(cassette)
+    try:
+        yield cassette
+    finally:
+        _active.reset(token)
+        cassette.close()
+
+
+def current_cassette() -> Optional[Cassette]:
+    """
+    Return the cassette for the current context: the innermost ``use_cassette()``
+    block, else the one configured by LLM_CASSETTE_MODE (None when "off").
+    """
+    global _configured
+    cassette = _active.get()
+    if cassette is not None:
+        return cassette
+    if settings.LLM_CASSETTE_MODE == "off":
+        return None
+    if _configured is None:
+        _configured = Cassette(
+            settings.LLM_CASSETTE_PATH,
+            settings.LLM_CASSETTE_MODE,
+            replay_latency=settings.LLM_CASSETTE_REPLAY_LATENCY,
+        )
+    return _configured
+
+
+def close_cassette() -> None:
+    """Flush and close the configured cassette (called on application shutdown)."""
+    global _configured
+    if _configured is not None:
+        _configured.close()
+        _configured = None
+
+
+def get_cassette_stats() -> Optional[Dict[str, Any]]:
+    """Return record/replay counters of the configured cassette, if any."""
+    return _configured.get_stats() if _configured is not None else None
@@ -0,0 +1,83 @@
+# app/core/deadlines.py
+"""
+Request Deadlines
+
+A per-request deadline carried in a context variable. The API handler opens a
+``deadline_scope`` once; every LLM call made by the selector and by any workflow
+phase underneath it (including asyncio.gather fan-outs, which copy the context)
+sees the same absolute deadline, so total request latency stays bounded.
+
+Nested scopes can only tighten the deadline, never extend it.
+
+Usage:
+    from app.core.deadlines import deadline_scope, remaining_time
+
+    with deadline_scope(settings.TIMEOUT_SECONDS):
+        result = await run_workflow(...)
+"""
+
+import asyncio
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """Raised when the current request's deadline has passed."""
+
+
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """
+    Bound everything in the enclosed block to ``seconds`` from now.
+
+    Args:
+        seconds: Time budget; None or <= 0 leaves the current deadline unchanged.
+
+    Yields:
+        The effective absolute deadline (time.monotonic() based), or None.
+    """
+    current = _deadline.get()
+    deadline = current
+    if seconds is not None and seconds > 0:
+        candidate = time.monotonic() + seconds
+        deadline = candidate if current is None else min(current, candidate)
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """Seconds left before the current deadline (never negative), or None if unbounded."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return max(0.0, deadline - time.monotonic())
+
+
+def deadline_expired() -> bool:
+    """True if a deadline is set and has already passed."""
+    remaining = remaining_time()
+    return remaining is not None and remaining <= 0
+
+
+def check_deadline(operation: str = "request") -> None:
+    """Raise DeadlineExceeded if the current deadline has passed."""
+    if deadline_expired():
+        raise DeadlineExceeded(f"Deadline exceeded before {operation}")
+
+
+def detach_deadline() -> None:
+    """
+    Remove the deadline from the current context.
+
+    For work shared by several requests (a coalesced LLM call) that runs in its
+    own copied context: each request bounds its own wait instead.
+    """
+    _deadline.set(None)
@@ -0,0 +1,371 @@
+# app/core/fake_genai.py
+"""
+Fake Gemini Backend
+
+A deterministic, offline stand-in for ``genai.Client`` used for load tests and
+regression benchmarks (set ``GEMINI_BACKEND=fake``). It implements the subset of
+the SDK surface the application uses:
+
+- ``client.aio.models.generate_content`` / ``generate_content_stream`` / ``get``
+- ``client.models.generate_content`` (sync)
+
+and returns real ``types.GenerateContentResponse`` objects:
+
+- JSON-mode requests with a ``response_schema`` get a schema-valid JSON document
+- Requests with function declarations get a function call whose arguments match
+  the declared parameters (honoring forced function names)
+- Everything else gets filler text, truncated with MAX_TOKENS when it exceeds
+  ``max_output_tokens`` so auto-continuation is exercised
+
+Outputs and latencies are derived from a hash of the request plus FAKE_LLM_SEED,
+so identical requests behave identically across runs. Latency is time to first
+token (lognormal around FAKE_LLM_LATENCY_MS) plus generated tokens (output and
+thinking) at FAKE_LLM_TOKENS_PER_SECOND, scaled by FAKE_LLM_TIME_SCALE. A
+FAKE_LLM_ERROR_RATE fraction of calls fail with 429 / 503 API errors.
+
+Usage:
+    GEMINI_BACKEND=fake FAKE_LLM_TIME_SCALE=0.1 uvicorn app.main:app
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from google.genai import errors, types
+from pydantic import BaseModel
+
+from app.config import settings
+
+
+_WORDS = (
+    "analysis approach context data design detail evaluate example factor framework goal "
+    "impact insight key method model outcome overview plan priority process quality "
+    "recommendation requirement result review risk scope section solution step strategy "
+    "structure summary system task tradeoff value workflow"
+).split()
+
+
+def _contents_text(contents: Any) -> str:
+    """Flatten str / Content / list-of-Content request contents into plain text."""
+    if contents is None:
+        return ""
+    if isinstance(contents, str):
+        return contents
+    if isinstance(contents, (list, tuple)):
+        return "\n".join(_contents_text(item) for item in contents)
+    parts = getattr(contents, "parts", None)
+    if parts is not None:
+        return "\n".join(part.text or "" for part in parts)
+    return str(contents)
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+# ============================================================================
+# Schema-valid value generation
+# ============================================================================
+
+class _ValueFactory:
+    """Builds deterministic values that satisfy a JSON schema (pydantic or Gemini flavor)."""
+
+    def __init__(self, rng: random.Random, defs: Optional[Dict[str, Any]] = None):
+        self.rng = rng
+        self.defs = defs or {}
+        self._counters: Dict[str, int] = {}
+
+    def value(self, schema: Dict[str, Any], name: str = "value") -> Any:
+        if "$ref" in schema:
+            return self.value(self.defs.get(schema["$ref"].split("/")[-1], {}), name)
+        for key in ("anyOf", "oneOf", "allOf"):
+            if schema.get(key):
+                options = [s for s in schema[key] if str(s.get("type", "")).lower() != "null"] or schema[key]
+                return self.value(options[0], name)
+        if "const" in schema:
+            return schema["const"]
+        if schema.get("enum"):
+            return self.rng.choice(schema["enum"])
+
+        kind = schema.get("type", "object" if "properties" in schema else "string")
+        if isinstance(kind, list):
+            kind = next((k for k in kind if str(k).lower() != "null"), "string")
+        kind = str(kind).lower()
+
+        if kind == "object":
+            properties = schema.get("properties") or {}
+            return {key: self.value(sub, key) for key, sub in properties.items()}
+        if kind == "array":
+            # Dependency lists stay empty so generated plans are always executable
+            if name == "dependencies":
+                return []
+            low = int(schema.get("minItems") or schema.get("min_items") or 2)
+            high = int(schema.get("maxItems") or schema.get("max_items") or max(low, 4))
+            return [self.value(schema.get("items") or {}, name.rstrip("s")) for _ in range(self.rng.randint(low, high))]
+        if kind == "boolean":
+            return self.rng.random() < 0.5
+        if kind in ("integer", "number"):
+            low = schema.get("minimum", 0 if kind == "number" else 1)
+            high = schema.get("maximum", 1 if kind == "number" else 5)
+            if kind == "integer":
+                return self.rng.randint(int(low), int(high))
+            return round(self.rng.uniform(float(low), float(high)), 2)
+        return self._string(name)
+
+    def _string(self, name: str) -> str:
+        count = self._counters.get(name, 0) + 1
+        self._counters[name] = count
+        if name == "id" or name.endswith("_id"):
+            return f"{name}_{count}"
+        words = " ".join(self.rng.choice(_WORDS) for _ in range(self.rng.randint(4, 12)))
+        return f"{name.replace('_', ' ').title()} {count}: {words}"
+
+
+def _schema_dict(schema: Any) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """Return (schema, $defs) for a pydantic model class, genai Schema or plain dict."""
+    if isinstance(schema, type) and issubclass(schema, BaseModel):
+        json_schema = schema.model_json_schema()
+        return json_schema, json_schema.get("$defs", {})
+    if isinstance(schema, BaseModel):
+        return schema.model_dump(mode="json", exclude_none=True), {}
+    if isinstance(schema, dict):
+        return schema, schema.get("$defs", {})
+    return {}, {}
+
+
+# ============================================================================
+# Fake client
+# ============================================================================
+
+class _FakeModels:
+    """Async ``client.aio.models`` surface."""
+
+    def __init__(self, backend: "FakeGenaiClient"):
+        self._backend = backend
+
+    async def generate_content(self, model: str, contents: Any, config: Optional[types.GenerateContentConfig] = None):
+        response, latency = self._backend.build_response(model, contents, config)
+        await asyncio.sleep(latency)
+        return response
+
+    async def generate_content_stream(self, model: str, contents: Any, config: Optional[types.GenerateContentConfig] = None):
+        response, latency = self._backend.build_response(model, contents, config)
+        return self._backend.stream(response, latency)
+
+    async def get(self, model: str, config: Any = None) -> types.Model:
+        return types.Model(name=f"models/{model}", display_name=f"{model} (fake)")
+
+
+class _FakeSyncModels:
+    """Sync ``client.models`` surface."""
+
+    def __init__(self, backend: "FakeGenaiClient"):
+        self._backend = backend
+
+    def generate_content(self, model: str, contents: Any, config: Optional[types.GenerateContentConfig] = None):
+        response, latency = self._backend.build_response(model, contents, config)
+        time.sleep(latency)
+        return response
+
+
+class _FakeAio:
+    def __init__(self, backend: "FakeGenaiClient"):
+        self.models = _FakeModels(backend)
+
+    async def aclose(self) -> None:
+        return None
+
+
+class FakeGenaiClient:
+    """
+    Deterministic local replacement for ``genai.Client``.
+
+    Attributes:
+        calls: Number of generate requests served.
+        errors_injected: Number of requests failed on purpose.
+    """
+
+    def __init__(
+        self,
+        seed: int = 0,
+        latency_ms: float = 600.0,
+        latency_sigma: float = 0.4,
+        tokens_per_second: float = 120.0,
+        output_tokens: int = 500,
+        error_rate: float = 0.0,
+        time_scale: float = 1.0,
+    ):
+        self.seed = seed
+        self.latency_ms = latency_ms
+        self.latency_sigma = latency_sigma
+        self.tokens_per_second = tokens_per_second
+        self.output_tokens = output_tokens
+        self.error_rate = error_rate
+        self.time_scale = time_scale
+        self._error_rng = random.Random(seed)
+        self.calls = 0
+        self.errors_injected = 0
+        self.aio = _FakeAio(self)
+        self.models = _FakeSyncModels(self)
+
+    def _request_rng(self, model: str, text: str, config: Optional[types.GenerateContentConfig]) -> random.Random:
+        schema = getattr(config, "response_schema", None)
+        material = json.dumps([
+            self.seed,
+            model,
+            text,
+            str(getattr(config, "system_instruction", None)),
+            getattr(schema, "__name__", str(schema)),
+        ])
+        return random.Random(hashlib.sha256(material.encode("utf-8")).hexdigest())
+
+    def _maybe_fail(self) -> None:
+        if self.error_rate <= 0 or self._error_rng.random() >= self.error_rate:
+            return
+        self.errors_injected += 1
+        if self._error_rng.random() < 0.5:
+            raise errors.ClientError(429, {"error": {
+                "code": 429, "status": "RESOURCE_EXHAUSTED", "message": "Injected rate limit (fake backend)",
+                "details": [{"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "1s"}],
+            }})
+        raise errors.ServerError(503, {"error": {
+            "code": 503, "status": "UNAVAILABLE", "message": "Injected server error (fake backend)",
+        }})
+
+    def build_response(
+        self, model: str, contents: Any, config: Optional[types.GenerateContentConfig]
+    ) -> Tuple[types.GenerateContentResponse, float]:
+        """Build the response for a request and the simulated latency (seconds) to deliver it."""
+        self.calls += 1
+        self._maybe_fail()
+
+        config = config or types.GenerateContentConfig()
+        prompt_text = _contents_text(contents)
+        rng = self._request_rng(model, prompt_text, config)
+        finish_reason = types.FinishReason.STOP
+
+        declaration = self._function_to_call(config)
+        if declaration is not None:
+            parameters = declaration.parameters_json_schema or declaration.parameters
+            schema, defs = _schema_dict(parameters)
+            args = _ValueFactory(rng, defs).value(schema) if schema else {}
+            part = types.Part(function_call=types.FunctionCall(name=declaration.name, args=args))
+            output_tokens = _estimate_tokens(json.dumps(args))
+        elif config.response_schema is not None or config.response_json_schema is not None:
+            schema, defs = _schema_dict(config.response_schema or config.response_json_schema)
+            value = _ValueFactory(rng, defs).value(schema)
+            if isinstance(config.response_schema, type) and issubclass(config.response_schema, BaseModel):
+                value = config.response_schema.model_validate(value).model_dump(mode="json")
+            text = json.dumps(value)
+            part = types.Part(text=text)
+            output_tokens = _estimate_tokens(text)
+        else:
+            output_tokens = max(16, int(rng.lognormvariate(math.log(self.output_tokens), 0.3)))
+            if config.max_output_tokens and output_tokens > config.max_output_tokens:
+                output_tokens = config.max_output_tokens
+                finish_reason = types.FinishReason.MAX_TOKENS
+            part = types.Part(text=self._text(rng, output_tokens))
+
+        thinking_budget = getattr(config.thinking_config, "thinking_budget", None) or 0
+        thinking_tokens = rng.randint(thinking_budget // 4, thinking_budget) if thinking_budget > 0 else 0
+        prompt_tokens = _estimate_tokens(prompt_text + str(config.system_instruction or ""))
+
+        response = types.GenerateContentResponse(
+            candidates=[types.Candidate(
+                content=types.Content(role="model", parts=[part]),
+                finish_reason=finish_reason,
+                index=0,
+            )],
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                thoughts_token_count=thinking_tokens or None,
+                total_token_count=prompt_tokens + output_tokens + thinking_tokens,
+            ),
+            model_version=f"{model}-fake",
+        )
+
+        first_token = self.latency_ms / 1000.0
+        if self.latency_sigma > 0:
+            first_token = rng.lognormvariate(math.log(first_token), self.latency_sigma)
+        generation = (output_tokens + thinking_tokens) / self.tokens_per_second if self.tokens_per_second > 0 else 0.0
+        return response, (first_token + generation) * self.time_scale
+
+    def _function_to_call(self, config: types.GenerateContentConfig) -> Optional[types.FunctionDeclaration]:
+        """The function declaration the model should call, honoring tool_config."""
+        declarations: List[types.FunctionDeclaration] = []
+        for tool in config.tools or []:
+            declarations.extend(getattr(tool, "function_declarations", None) or [])
+        if not declarations:
+            return None
+
+        calling = getattr(config.tool_config, "function_calling_config", None)
+        mode = str(getattr(calling, "mode", "") or "").upper()
+        if mode.endswith("NONE"):
+            return None
+        allowed = getattr(calling, "allowed_function_names", None)
+        if allowed:
+            for declaration in declarations:
+                if declaration.name in allowed:
+                    return declaration
+        return declarations[0]
+
+    def _text(self, rng: random.Random, tokens: int) -> str:
+        """Filler markdown of roughly ``tokens`` tokens (~0.75 words per token)."""
+        words = max(1, int(tokens * 0.75))
+        paragraphs, sentence, paragraph = [], [], []
+        for i in range(words):
+            sentence.append(rng.choice(_WORDS))
+            if len(sentence) >= rng.randint(8, 16) or i == words - 1:
+                paragraph.append(" ".join(sentence).capitalize() + ".")
+                sentence = []
+                if len(paragraph) >= 4:
+                    paragraphs.append(" ".join(paragraph))
+                    paragraph = []
+        if paragraph:
+            paragraphs.append(" ".join(paragraph))
+        return "\n\n".join(paragraphs)
+
+    async def stream(self, response: types.GenerateContentResponse, latency: float) -> AsyncIterator[types.GenerateContentResponse]:
+        """Deliver a response as text chunks spread over its simulated latency."""
+        candidate = response.candidates[0]
+        part = candidate.content.parts[0]
+        if not part.text:
+            await asyncio.sleep(latency)
+            yield response
+            return
+
+        words = part.text.split(" ")
+        chunks = [" ".join(words[i:i + 12]) + (" " if i + 12 < len(words) else "") for i in range(0, len(words), 12)]
+        first_token = latency * 0.3
+        step = (latency - first_token) / max(1, len(chunks))
+        await asyncio.sleep(first_token)
+        for i, chunk in enumerate(chunks):
+            last = i == len(chunks) - 1
+            yield types.GenerateContentResponse(
+                candidates=[types.Candidate(
+                    content=types.Content(role="model", parts=[types.Part(text=chunk)]),
+                    finish_reason=candidate.finish_reason if last else None,
+                    index=0,
+                )],
+                usage_metadata=response.usage_metadata if last else None,
+            )
+            if not last:
+                await asyncio.sleep(step)
+
+
+def create_fake_client() -> FakeGenaiClient:
+    """Build a fake client configured from the FAKE_LLM_* settings."""
+    return FakeGenaiClient(
+        seed=settings.FAKE_LLM_SEED,
+        latency_ms=settings.FAKE_LLM_LATENCY_MS,
+        latency_sigma=settings.FAKE_LLM_LATENCY_SIGMA,
+        tokens_per_second=settings.FAKE_LLM_TOKENS_PER_SECOND,
+        output_tokens=settings.FAKE_LLM_OUTPUT_TOKENS,
+        error_rate=settings.FAKE_LLM_ERROR_RATE,
+        time_scale=settings.FAKE_LLM_TIME_SCALE,
+    )
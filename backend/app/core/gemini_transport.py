@@ -0,0 +1,242 @@
+# app/core/gemini_transport.py
+"""
+Shared Gemini Transport
+
+One ``genai.Client`` for the whole process, used by both LLM client singletons,
+so every Gemini request shares a single connection pool (one set of TLS
+handshakes, one keep-alive pool) instead of one pool per client class.
+
+The pool is an httpx transport with configurable limits and, when the optional
+``h2`` package is installed, HTTP/2 so many concurrent requests multiplex over a
+few long-lived connections. ``warm_up()`` opens the first connection at startup
+so the first user request does not pay for DNS + TLS. Pool utilization is
+exposed through ``get_transport_stats()`` to help size LLM_HTTP_MAX_CONNECTIONS
+against LLM_MAX_IN_FLIGHT.
+
+With ``GEMINI_BACKEND=fake`` the shared client is the offline stand-in from
+``app.core.fake_genai`` instead, and no network transport is created.
+
+Usage:
+    from app.core.gemini_transport import get_genai_client, get_transport_stats
+
+    client = get_genai_client()
+    response = await client.aio.models.generate_content(...)
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from google import genai
+from google.genai import types
+
+from app.config import settings
+from app.core.fake_genai import FakeGenaiClient, create_fake_client
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Async transport that counts requests in flight (until response headers arrive)."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            return await super().handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional ``h2`` package (pip install httpx[http2])."""
+    if not settings.LLM_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logging.warning("LLM_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1 keep-alive")
+        return False
+    return True
+
+
+class _SharedTransport:
+    """The process-wide genai.Client plus the transports it was built on."""
+
+    def __init__(self):
+        http2 = _http2_available()
+        self.http2 = http2
+        self.async_transport = _InstrumentedTransport(http2=http2, limits=_pool_limits())
+        self.sync_transport = httpx.HTTPTransport(http2=http2, limits=_pool_limits())
+        self.warmed_up: Optional[bool] = None
+        self.warm_up_seconds: Optional[float] = None
+
+        # Passing a transport makes the SDK use httpx (rather than aiohttp) for async calls
+        http_options = types.HttpOptions(
+            client_args={"transport": self.sync_transport},
+            async_client_args={"transport": self.async_transport},
+        )
+        if settings.USE_VERTEX_AI:
+            self.client = genai.Client(
+                vertexai=True,
+                project=settings.GOOGLE_CLOUD_PROJECT,
+                location=settings.GOOGLE_CLOUD_LOCATION,
+                http_options=http_options,
+            )
+        else:
+            self.client = genai.Client(api_key=settings.GEMINI_API_KEY, http_options=http_options)
+        logging.info(
+            f"Initialized shared Gemini transport (HTTP/{'2' if http2 else '1.1'}, "
+            f"max_connections={settings.LLM_HTTP_MAX_CONNECTIONS}, "
+            f"max_keepalive={settings.LLM_HTTP_MAX_KEEPALIVE})"
+        )
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Connection counts read from the underlying httpcore pool."""
+        pool = getattr(self.async_transport, "_pool", None)
+        connections = list(getattr(pool, "connections", []) or [])
+        stats = {"connections": len(connections), "active": 0, "idle": 0, "http2_connections": 0}
+        for connection in connections:
+            try:
+                if connection.is_idle():
+                    stats["idle"] += 1
+                else:
+                    stats["active"] += 1
+                if "HTTP/2" in connection.info():
+                    stats["http2_connections"] += 1
+            except Exception:
+                continue
+        stats["queued_requests"] = max(0, len(getattr(pool, "_requests", []) or []) - stats["active"])
+        return stats
+
+
+# Singleton instances
+_shared_transport: Optional[_SharedTransport] = None
+_fake_client: Optional[FakeGenaiClient] = None
+
+
+def _use_fake_backend() -> bool:
+    return settings.GEMINI_BACKEND == "fake"
+
+
+def _get_shared_transport() -> _SharedTransport:
+    global _shared_transport
+    if _shared_transport is None:
+        _shared_transport = _SharedTransport()
+    return _shared_transport
+
+
+def get_genai_client() -> genai.Client:
+    """
+    Get the process-wide Gemini SDK client (singleton pattern).
+
+    Returns:
+        genai.Client: Configured for the Gemini Developer API or Vertex AI,
+                      backed by the shared, tuned connection pool (or the
+                      FakeGenaiClient when GEMINI_BACKEND is "fake").
+    """
+    global _fake_client
+    if _use_fake_backend():
+        if _fake_client is None:
+            _fake_client = create_fake_client()
+            logging.info("Using the fake Gemini backend (GEMINI_BACKEND=fake)")
+        return _fake_client
+    return _get_shared_transport().client
+
+
+async def warm_up() -> bool:
+    """
+    Open a connection to the Gemini endpoint ahead of the first real request.
+
+    Issues a cheap model-metadata lookup, bounded by LLM_HTTP_WARMUP_TIMEOUT_SECONDS.
+    Failures are logged and never block startup.
+
+    Returns:
+        bool: True if the endpoint was reached.
+    """
+    if _use_fake_backend():
+        return True
+    transport = _get_shared_transport()
+    started = time.monotonic()
+    try:
+        await asyncio.wait_for(
+            transport.client.aio.models.get(model=settings.GEMINI_MODEL),
+            timeout=settings.LLM_HTTP_WARMUP_TIMEOUT_SECONDS,
+        )
+        transport.warmed_up = True
+    except Exception as e:
+        transport.warmed_up = False
+        logging.warning(f"Gemini connection warm-up failed: {e}")
+    transport.warm_up_seconds = round(time.monotonic() - started, 3)
+    if transport.warmed_up:
+        logging.info(f"Gemini connection warmed up in {transport.warm_up_seconds:.2f}s")
+    return bool(transport.warmed_up)
+
+
+async def close() -> None:
+    """Close the shared client's connections (called on application shutdown)."""
+    global _shared_transport, _fake_client
+    _fake_client = None
+    if _shared_transport is None:
+        return
+    try:
+        await _shared_transport.client.aio.aclose()
+    except Exception as e:
+        logging.warning(f"Error closing Gemini transport: {e}")
+    _shared_transport = None
+
+
+def get_transport_stats() -> Dict[str, Any]:
+    """
+    Return connection-pool utilization for the shared Gemini transport.
+
+    Returns:
+        dict: Pool limits, live/active/idle/HTTP-2 connection counts, queued
+              requests, in-flight and peak in-flight requests, totals and warm-up state.
+    """
+    if _fake_client is not None:
+        return {
+            "initialized": True,
+            "backend": "fake",
+            "requests": _fake_client.calls,
+            "errors_injected": _fake_client.errors_injected,
+        }
+    if _shared_transport is None:
+        return {"initialized": False}
+    transport = _shared_transport.async_transport
+    stats = {
+        "initialized": True,
+        "http2": _shared_transport.http2,
+        "max_connections": settings.LLM_HTTP_MAX_CONNECTIONS,
+        "max_keepalive_connections": settings.LLM_HTTP_MAX_KEEPALIVE,
+        "in_flight": transport.in_flight,
+        "peak_in_flight": transport.peak_in_flight,
+        "requests": transport.requests,
+        "errors": transport.errors,
+        "warmed_up": _shared_transport.warmed_up,
+        "warm_up_seconds": _shared_transport.warm_up_seconds,
+    }
+    stats.update(_shared_transport.pool_stats())
+    stats["utilization"] = (
+        round(stats["active"] / settings.LLM_HTTP_MAX_CONNECTIONS, 3) if settings.LLM_HTTP_MAX_CONNECTIONS else None
+    )
+    return stats
@@ -0,0 +1,68 @@
+# app/core/helpers/complexity.py
+"""
+Complexity Budgets
+
+Turns the selector's task complexity ("simple" / "medium" / "complex") into
+fan-out and reasoning limits for the heavier workflows, so a simple query does
+not get the same number of subtasks, sections, refinement rounds and thinking
+tokens as a complex one. "medium" (also used when complexity is unknown)
+keeps the workflows' original limits.
+
+Usage:
+    from app.core.helpers.complexity import complexity_budget, scale_thinking_budget
+
+    budget = complexity_budget(workflow_selection)
+    subtasks = subtasks[:budget.max_subtasks]
+    thinking_budget = scale_thinking_budget(config["thinking_budget"], workflow_selection)
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from app.models.schemas import WorkflowSelection
+
+
+# Smallest positive thinking budget the Gemini 2.5 models accept
+MIN_THINKING_BUDGET = 128
+MAX_THINKING_BUDGET = 24576
+
+
+@dataclass(frozen=True)
+class ComplexityBudget:
+    """Fan-out and reasoning limits for one complexity level."""
+    max_subtasks: int  # orchestrator_workers plan size
+    min_sections: int  # parallel_section_voting sections
+    max_sections: int
+    max_refinement_iterations: int  # evaluator_optimizer rounds
+    thinking_scale: float  # multiplier for persona thinking budgets
+
+
+_BUDGETS = {
+    "simple": ComplexityBudget(max_subtasks=2, min_sections=2, max_sections=2, max_refinement_iterations=1, thinking_scale=0.25),
+    "medium": ComplexityBudget(max_subtasks=5, min_sections=3, max_sections=5, max_refinement_iterations=3, thinking_scale=1.0),
+    "complex": ComplexityBudget(max_subtasks=8, min_sections=4, max_sections=6, max_refinement_iterations=3, thinking_scale=2.0),
+}
+
+
+def complexity_of(workflow_selection: Optional[WorkflowSelection]) -> str:
+    """Normalized complexity of a selection ("medium" if missing or unrecognized)."""
+    complexity = (getattr(workflow_selection, "complexity", None) or "medium").strip().lower()
+    return complexity if complexity in _BUDGETS else "medium"
+
+
+def complexity_budget(workflow_selection: Optional[WorkflowSelection]) -> ComplexityBudget:
+    """Fan-out and reasoning limits for the selection's complexity."""
+    return _BUDGETS[complexity_of(workflow_selection)]
+
+
+def scale_thinking_budget(thinking_budget: Optional[int], workflow_selection: Optional[WorkflowSelection]) -> Optional[int]:
+    """
+    Scale a persona thinking budget by the selection's complexity.
+
+    None (model default), 0 (thinking off) and -1 (dynamic) are returned unchanged;
+    positive budgets stay within [MIN_THINKING_BUDGET, MAX_THINKING_BUDGET].
+    """
+    if thinking_budget is None or thinking_budget <= 0:
+        return thinking_budget
+    scaled = int(thinking_budget * complexity_budget(workflow_selection).thinking_scale)
+    return max(MIN_THINKING_BUDGET, min(MAX_THINKING_BUDGET, scaled))
@@ -0,0 +1,63 @@
+# app/core/helpers/fanout.py
+"""
+Cancellation-Safe Fan-Out
+
+``asyncio.gather`` cancels its children when the caller is cancelled, but when
+one child fails (without ``return_exceptions``) it lets the siblings run to
+completion unread, and it returns before cancelled children have unwound.
+Workflows fan out to many concurrent LLM calls, so both leak quota:
+
+- If the caller is cancelled (client disconnect, job cancel, lost race), every
+  child is cancelled and awaited before the CancelledError propagates, so no
+  Gemini call outlives the request that needed it.
+- Without ``return_exceptions``, the first failure cancels the remaining
+  children instead of letting them finish for nothing.
+
+Usage:
+    from app.core.helpers.fanout import gather_cancelling
+
+    results = await gather_cancelling(*[process_subtask(st) for st in executable])
+"""
+
+import asyncio
+from typing import Any, Awaitable, List
+
+
+async def gather_cancelling(*aws: Awaitable[Any], return_exceptions: bool = False) -> List[Any]:
+    """
+    Run awaitables concurrently like ``asyncio.gather``, cancelling the rest on failure.
+
+    Args:
+        *aws: Coroutines or futures to run
+        return_exceptions: Return exceptions in place of results instead of raising the first
+
+    Returns:
+        list: Results in argument order
+
+    Raises:
+        Exception: The first child exception (when ``return_exceptions`` is False)
+        asyncio.CancelledError: If the caller was cancelled (after all children stopped)
+    """
+    tasks = [asyncio.ensure_future(aw) for aw in aws]
+    if not tasks:
+        return []
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.ALL_COMPLETED if return_exceptions else asyncio.FIRST_EXCEPTION)
+    finally:
+        pending = [task for task in tasks if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.wait(pending)
+
+    if not return_exceptions:
+        for task in tasks:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+        if any(task.cancelled() for task in tasks):
+            raise asyncio.CancelledError()
+        return [task.result() for task in tasks]
+    return [
+        asyncio.CancelledError() if task.cancelled() else (task.exception() or task.result())
+        for task in tasks
+    ]
@@ -114,7 +114,7 @@ STRENGTHS: {strengths_inline}
 """
 
 
-def get_agent_config(agent_persona: Dict[str, Any]) -> Dict[str, Any]:
+def get_agent_config(agent_persona: Dict[str, Any], cache: Optional[bool] = None) -> Dict[str, Any]:
     """
     Extract SDK configuration values from persona.
     
@@ -122,10 +122,13 @@ def get_agent_config(agent_persona: Dict[str, Any]) -> Dict[str, Any]:
     
     Args:
         agent_persona: Persona dictionary, optionally containing "config" key
+        cache: Default for ``cache`` when the persona does not set it (calls
+            whose output depends only on their input opt in with True)
     
     Returns:
-        Dict with keys: temperature, thinking_budget, max_tokens
-        Uses defaults if config not present.
+        Dict with keys: temperature, thinking_budget, max_tokens, cache
+        Uses defaults if config not present. ``cache`` is None (settings.LLM_CACHE_ENABLED)
+        unless the persona or the caller opts in to (or out of) the LLM response cache.
     
     Example:
         >>> persona = {"role": "Planner", "config": {"thinking_budget": 1024, "temperature": 0.7}}
@@ -136,6 +139,7 @@ def get_agent_config(agent_persona: Dict[str, Any]) -> Dict[str, Any]:
         "temperature": 0.7,
         "thinking_budget": None,  # None = use model default
         "max_tokens": 8192,
+        "cache": cache,  # None = use settings.LLM_CACHE_ENABLED
     }
     
     if not agent_persona:
@@ -147,6 +151,7 @@ def get_agent_config(agent_persona: Dict[str, Any]) -> Dict[str, Any]:
         "temperature": config.get("temperature", defaults["temperature"]),
         "thinking_budget": config.get("thinking_budget", defaults["thinking_budget"]),
         "max_tokens": config.get("max_tokens", defaults["max_tokens"]),
+        "cache": config.get("cache", defaults["cache"]),
     }
 
 
@@ -177,6 +182,7 @@ def build_generate_content_config(
     """
     agent_config = get_agent_config(agent_persona)
     system_instruction = generate_agent_context(agent_persona, as_system_instruction=True)
+    overrides.pop("cache", None)  # Client-side option, not part of the SDK config
     
     # Build thinking config if budget specified
     thinking_budget = overrides.pop("thinking_budget", agent_config["thinking_budget"])
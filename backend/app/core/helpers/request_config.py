@@ -0,0 +1,119 @@
+# app/core/helpers/request_config.py
+"""
+Request Config Parsing
+
+``QueryRequest.config`` is a free-form JSON object, so options arrive as
+whatever type the client sent: ``"degrade": "false"`` is a non-empty string
+and ``bool()`` would read it as True. These helpers parse options explicitly;
+values that cannot be used raise InvalidRequestConfig, which the endpoints
+report as HTTP 400.
+
+Usage:
+    from app.core.helpers.request_config import config_flag, config_priority, config_seconds
+
+    allow_degraded = config_flag(request.config, "degrade", True)
+    priority = config_priority(request.config, "interactive")
+    timeout_seconds = config_seconds(request.config, "timeout_seconds", settings.TIMEOUT_SECONDS)
+"""
+
+import math
+from typing import Any, Dict, Optional
+
+from app.core.rate_limiter import Priority
+
+
+class InvalidRequestConfig(ValueError):
+    """Raised when a request config option has a value that cannot be used."""
+
+
+_TRUE = {"true", "1", "yes", "on"}
+_FALSE = {"false", "0", "no", "off", ""}
+
+
+def config_flag(config: Optional[Dict[str, Any]], key: str, default: bool) -> bool:
+    """
+    Read a boolean option from a request config.
+
+    Args:
+        config: The request's config dict (may be None)
+        key: Option name
+        default: Value when the option is missing, null or not recognisable
+
+    Returns:
+        bool: True for true/1/"true"/"yes"/"on", False for false/0/"false"/"no"/"off"
+    """
+    value = (config or {}).get(key)
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, (int, float)):
+        return value != 0
+    if isinstance(value, str):
+        normalized = value.strip().lower()
+        if normalized in _TRUE:
+            return True
+        if normalized in _FALSE:
+            return False
+    return default
+
+
+def config_priority(config: Optional[Dict[str, Any]], default: str) -> str:
+    """
+    Read the priority lane option.
+
+    Args:
+        config: The request's config dict (may be None)
+        default: Lane when ``priority`` is missing or null
+
+    Returns:
+        str: A lane name ("interactive" / "batch")
+
+    Raises:
+        InvalidRequestConfig: If ``priority`` is not the name of a lane
+    """
+    value = (config or {}).get("priority")
+    if value is None:
+        return default
+    if not isinstance(value, str) or value.strip().upper() not in Priority.__members__:
+        lanes = ", ".join(lane.lower() for lane in Priority.__members__)
+        raise InvalidRequestConfig(f"config.priority must be one of: {lanes} (got {value!r})")
+    return value.strip().lower()
+
+
+def config_seconds(config: Optional[Dict[str, Any]], key: str, default: float) -> float:
+    """
+    Read a duration option in seconds.
+
+    Args:
+        config: The request's config dict (may be None)
+        key: Option name
+        default: Value when the option is missing or null
+
+    Returns:
+        float: A positive, finite number of seconds
+
+    Raises:
+        InvalidRequestConfig: If the option is not a positive number (numeric strings are accepted)
+    """
+    value = (config or {}).get(key)
+    if value is None:
+        return default
+    try:
+        if isinstance(value, bool):
+            raise TypeError
+        seconds = float(value)
+    except (TypeError, ValueError):
+        raise InvalidRequestConfig(f"config.{key} must be a number of seconds (got {value!r})") from None
+    if not math.isfinite(seconds) or seconds <= 0:
+        raise InvalidRequestConfig(f"config.{key} must be a positive number of seconds (got {value!r})")
+    return seconds
+
+
+def validate_request_config(config: Optional[Dict[str, Any]]) -> None:
+    """
+    Check the options run_query parses, for endpoints that accept a query before running it.
+
+    Raises:
+        InvalidRequestConfig: If an option has an unusable value
+    """
+    config_priority(config, "interactive")
+    config_seconds(config, "timeout_seconds", 1.0)
@@ -0,0 +1,297 @@
+# app/core/jobs.py
+"""
+Background Workflow Jobs
+
+Long workflows (autonomous agent, orchestrator with tools) can run for
+minutes, longer than proxies keep an HTTP request open. The job API accepts a
+QueryRequest, returns a job id at once and runs the query in a bounded pool of
+background workers:
+
+- At most JOB_WORKERS jobs run at a time; up to JOB_QUEUE_MAX more wait in a
+  FIFO queue. Beyond that ``submit`` raises JobQueueFull with a Retry-After
+  estimate (queue length x mean job time / workers), so the process never
+  accepts more work than it can run.
+- While a job runs, its selection, each completed step and the final answer
+  text streamed so far are captured (through the workflow event sink) and
+  served by ``JobInfo`` snapshots.
+- ``cancel`` drops a queued job, or cancels a running one: the cancellation
+  propagates through the workflow's fan-outs into its in-flight Gemini calls.
+- Finished jobs are kept for JOB_RETENTION_SECONDS.
+
+Jobs default to a deadline of JOB_TIMEOUT_SECONDS instead of the interactive
+TIMEOUT_SECONDS; ``config.timeout_seconds`` still overrides it.
+
+Usage:
+    from app.core.jobs import JobManager, JobQueueFull
+
+    jobs = JobManager(run_query)
+    job = jobs.submit(request)        # raises JobQueueFull when saturated
+    info = jobs.get(job.job_id).info()
+    jobs.cancel(jobs.get(job.job_id))
+"""
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.config import settings
+from app.core.metrics import REQUESTS_CANCELLED
+from app.core.streaming import event_sink
+from app.models.schemas import AgentResponse, JobInfo, JobStatus, QueryRequest, WorkflowResponse, WorkflowSelection
+
+JobRunner = Callable[[QueryRequest], Awaitable[WorkflowResponse]]
+
+
+class JobQueueFull(Exception):
+    """Raised when the job queue is at capacity."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Job queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class Job:
+    """One submitted query and everything known about its execution so far."""
+
+    def __init__(self, request: QueryRequest):
+        self.job_id = str(uuid.uuid4())
+        self.request = request
+        self.status = JobStatus.QUEUED
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.selection: Optional[WorkflowSelection] = None
+        self.steps: List[AgentResponse] = []
+        self.partial_response: Optional[str] = None
+        self.result: Optional[WorkflowResponse] = None
+        self.error: Optional[str] = None
+        self.error_status: Optional[int] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_requested = False
+        self._stream: Optional[int] = None
+
+    def on_event(self, event: str, payload: Any) -> None:
+        """Event sink for the job's run: keeps the selection, steps and final text."""
+        if event == "selection":
+            self.selection = payload
+        elif event == "step":
+            self.steps.append(payload)
+        elif event == "final_start":
+            self._stream = payload["stream"]
+            self.partial_response = ""
+        elif event == "token" and payload["stream"] == self._stream:
+            self.partial_response += payload["text"]
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.SUCCEEDED, JobStatus.FAILED, JobStatus.CANCELLED)
+
+    def info(self, queue_position: Optional[int] = None) -> JobInfo:
+        """Snapshot of the job for the API."""
+        return JobInfo(
+            job_id=self.job_id,
+            status=self.status,
+            created_at=self.created_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            queue_position=queue_position,
+            workflow_info=self.selection,
+            intermediate_steps=list(self.steps),
+            partial_response=self.partial_response if self.result is None else None,
+            result=self.result,
+            error=self.error,
+        )
+
+
+class JobManager:
+    """
+    Bounded worker pool and job table for background workflow runs.
+
+    Args:
+        runner: Coroutine function executing one QueryRequest
+        workers: Jobs run concurrently
+        max_queued: Jobs allowed to wait for a worker
+        retention_seconds: How long finished jobs stay retrievable
+        error_status: Maps an exception to the HTTP status reported for a failed job
+    """
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        workers: int = 4,
+        max_queued: int = 100,
+        retention_seconds: float = 3600,
+        error_status: Optional[Callable[[Exception], int]] = None,
+    ):
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.max_queued = max(0, max_queued)
+        self.retention_seconds = retention_seconds
+        self.error_status = error_status or (lambda e: 500)
+
+        self._jobs: Dict[str, Job] = {}
+        self._queued: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self.running = 0
+        self.submitted = 0
+        self.rejected = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.cancelled = 0
+        self._mean_job_seconds: Optional[float] = None
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._worker_tasks = [task for task in self._worker_tasks if not task.done()]
+        while len(self._worker_tasks) < self.workers:
+            self._worker_tasks.append(asyncio.create_task(self._worker()))
+
+    def retry_after(self) -> int:
+        """Seconds until a queue slot is likely to free up."""
+        mean = self._mean_job_seconds or 30.0
+        waiting = len(self._queued) - self.max_queued + 1
+        return max(1, min(600, math.ceil(mean * max(1, waiting) / self.workers)))
+
+    def submit(self, request: QueryRequest) -> Job:
+        """
+        Queue a query for background execution.
+
+        Raises:
+            JobQueueFull: If max_queued jobs are already waiting
+        """
+        self._prune()
+        self._ensure_workers()
+        if len(self._queued) >= self.max_queued:
+            self.rejected += 1
+            raise JobQueueFull(self.retry_after())
+
+        job = Job(request)
+        self._jobs[job.job_id] = job
+        self._queued[job.job_id] = job
+        self._queue.put_nowait(job)
+        self.submitted += 1
+        logging.info(f"Job {job.job_id} queued ({len(self._queued)} waiting, {self.running} running)")
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def queue_position(self, job: Job) -> Optional[int]:
+        """1-based position of a queued job."""
+        if job.status != JobStatus.QUEUED:
+            return None
+        for position, job_id in enumerate(self._queued, 1):
+            if job_id == job.job_id:
+                return position
+        return None
+
+    def info(self, job: Job) -> JobInfo:
+        return job.info(self.queue_position(job))
+
+    def cancel(self, job: Job) -> bool:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            bool: False if the job had already finished
+        """
+        if job.finished:
+            return False
+        job.cancel_requested = True
+        if job.status == JobStatus.QUEUED:
+            # The worker skips it when it comes up in the queue
+            self._queued.pop(job.job_id, None)
+            self._finish_cancelled(job)
+        elif job.task is not None:
+            job.task.cancel()
+        REQUESTS_CANCELLED.labels("job_cancel").inc()
+        logging.info(f"Job {job.job_id} cancelled")
+        return True
+
+    def _finish_cancelled(self, job: Job) -> None:
+        job.status = JobStatus.CANCELLED
+        job.error = "Job was cancelled"
+        job.finished_at = time.time()
+        self.cancelled += 1
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._queued.pop(job.job_id, None)
+            if job.finished:
+                self._queue.task_done()
+                continue
+            self.running += 1
+            try:
+                await self._run(job)
+            finally:
+                self.running -= 1
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = JobStatus.RUNNING
+        job.started_at = time.time()
+        request = job.request
+        config = dict(request.config or {})
+        config.setdefault("timeout_seconds", settings.JOB_TIMEOUT_SECONDS)
+        request = request.model_copy(update={"config": config})
+
+        try:
+            with event_sink(job.on_event):
+                # Own task, so cancelling the job does not cancel the worker
+                job.task = asyncio.create_task(self.runner(request))
+                job.result = await job.task
+            job.status = JobStatus.SUCCEEDED
+            self.succeeded += 1
+        except asyncio.CancelledError:
+            if not job.cancel_requested:
+                # The worker itself is being shut down
+                raise
+            self._finish_cancelled(job)
+            return
+        except Exception as e:
+            logging.error(f"Job {job.job_id} failed: {str(e)}")
+            job.error = str(e) or type(e).__name__
+            job.error_status = self.error_status(e)
+            job.status = JobStatus.FAILED
+            self.failed += 1
+        job.finished_at = time.time()
+
+        elapsed = job.finished_at - job.started_at
+        self._mean_job_seconds = elapsed if self._mean_job_seconds is None else 0.8 * self._mean_job_seconds + 0.2 * elapsed
+
+    def _prune(self) -> None:
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+    async def shutdown(self) -> None:
+        """Stop the workers (running jobs are cancelled)."""
+        for task in self._worker_tasks:
+            task.cancel()
+        if self._worker_tasks:
+            await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return pool size, queue depth, running jobs and outcome counters (incl. cancelled)."""
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queued": len(self._queued),
+            "max_queued": self.max_queued,
+            "retained_jobs": len(self._jobs),
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "mean_job_seconds": round(self._mean_job_seconds, 3) if self._mean_job_seconds is not None else None,
+        }
@@ -0,0 +1,347 @@
+# app/core/llm_cache.py
+"""
+LLM Response Cache Module
+
+This module provides a content-addressed cache for Gemini responses so that
+identical requests (gate checks, classifier prompts, criteria designer calls)
+are served locally instead of paying full latency and cost again.
+
+The cache has two tiers:
+
+1. Memory tier: a bounded LRU (OrderedDict) for the hottest entries
+2. Disk tier: a SQLite file with TTL and size-based (least recently used) eviction
+
+Keys are SHA-256 digests of a canonical JSON rendering of everything that
+influences the model output: model, contents, system instruction, temperature,
+thinking budget, tool declarations and response schema.
+
+Caching is opt-in: callers pass ``cache=True`` to the client methods (or set
+``"cache": True`` in a persona's ``config`` block), and ``LLM_CACHE_ENABLED``
+controls the default for calls that do not specify.
+
+Usage:
+    from app.core.llm_cache import get_response_cache, make_cache_key
+
+    cache = get_response_cache()
+    key = make_cache_key({"model": "gemini-2.5-pro", "contents": prompt})
+    value = await cache.get(key)
+    stats = cache.get_stats()
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Optional, Tuple
+
+from pydantic import BaseModel
+
+from app.config import settings
+
+
+# Sentinel distinguishing "not cached" from a cached ``None``/empty value
+MISSING = object()
+
+
+# ============================================================================
+# Key Construction
+# ============================================================================
+
+def _canonical(value: Any) -> Any:
+    """Convert a request component into a JSON-serializable, order-stable form."""
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json", exclude_none=True)
+    if isinstance(value, type) and issubclass(value, BaseModel):
+        return {"schema": value.__name__, "json_schema": value.model_json_schema()}
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if callable(value):
+        return {
+            "callable": getattr(value, "__qualname__", repr(value)),
+            "doc": getattr(value, "__doc__", None),
+        }
+    return repr(value)
+
+
+def make_cache_key(parts: Dict[str, Any]) -> str:
+    """
+    Build a content-addressed cache key from request components.
+
+    Args:
+        parts: Mapping of everything that affects the response (model, contents,
+               system_instruction, temperature, thinking_budget, tools, schema...)
+
+    Returns:
+        str: Hex SHA-256 digest of the canonical JSON encoding of ``parts``
+    """
+    encoded = json.dumps(_canonical(parts), sort_keys=True, separators=(",", ":"), default=repr)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# Cache Tiers
+# ============================================================================
+
+@dataclass
+class CacheStats:
+    """Hit/miss/eviction counters for the response cache."""
+    memory_hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    memory_evictions: int = 0
+    disk_evictions: int = 0
+    expirations: int = 0
+
+
+class _MemoryTier:
+    """Bounded in-process LRU with per-entry expiry."""
+
+    def __init__(self, max_entries: int, stats: CacheStats):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._stats = stats
+
+    def get(self, key: str) -> Any:
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISSING
+        expires_at, value = entry
+        if expires_at and expires_at < time.time():
+            del self._entries[key]
+            self._stats.expirations += 1
+            return MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats.memory_evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class _DiskTier:
+    """
+    SQLite-backed tier with TTL and size-based LRU eviction.
+
+    All methods are blocking; the async cache front end runs them in a worker
+    thread so the event loop is never stalled on disk I/O.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, stats: CacheStats):
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, "responses.sqlite")
+        self.max_bytes = max_bytes
+        self._stats = stats
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, "
+            "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_accessed ON entries (accessed_at)")
+        self._conn.commit()
+        row = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()
+        self._total_bytes = int(row[0])
+
+    def get(self, key: str) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, size, expires_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return MISSING
+            value, size, expires_at = row
+            if expires_at and expires_at < now:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._conn.commit()
+                self._total_bytes -= size
+                self._stats.expirations += 1
+                return MISSING
+            self._conn.execute("UPDATE entries SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return json.loads(value)
+
+    def set(self, key: str, value: Any, expires_at: float) -> None:
+        encoded = json.dumps(value, separators=(",", ":"))
+        size = len(encoded.encode("utf-8"))
+        if size > self.max_bytes:
+            logging.debug(f"LLM cache entry {key[:12]} larger than disk limit, not persisted")
+            return
+        now = time.time()
+        with self._lock:
+            previous = self._conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            if previous:
+                self._total_bytes -= previous[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, encoded, size, expires_at, now),
+            )
+            self._total_bytes += size
+            self._evict_locked(now)
+            self._conn.commit()
+
+    def _evict_locked(self, now: float) -> None:
+        """Drop expired rows, then least recently used rows until under the size limit."""
+        expired = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries WHERE expires_at > 0 AND expires_at < ?",
+            (now,),
+        ).fetchone()
+        if expired[0]:
+            self._conn.execute("DELETE FROM entries WHERE expires_at > 0 AND expires_at < ?", (now,))
+            self._total_bytes -= int(expired[1])
+            self._stats.expirations += expired[0]
+
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM entries ORDER BY accessed_at ASC LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._total_bytes -= size
+                self._stats.disk_evictions += 1
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._conn.commit()
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU + SQLite) cache for LLM responses.
+
+    Values must be JSON-serializable (strings, dicts, model dumps). Callers are
+    responsible for encoding rich objects before ``set`` and decoding after ``get``.
+
+    Attributes:
+        ttl_seconds: Time-to-live applied to every entry (0 disables expiry).
+        memory: The in-process LRU tier.
+        disk: The on-disk tier, or None when disabled/unavailable.
+    """
+
+    def __init__(
+        self,
+        memory_entries: int = 1024,
+        ttl_seconds: int = 86400,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 256 * 1024 * 1024,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stats = CacheStats()
+        self.memory = _MemoryTier(memory_entries, self.stats)
+        self.disk: Optional[_DiskTier] = None
+        if disk_dir:
+            try:
+                self.disk = _DiskTier(disk_dir, disk_max_bytes, self.stats)
+            except Exception as e:
+                logging.error(f"LLM cache disk tier unavailable, using memory only: {e}")
+
+    def _expires_at(self) -> float:
+        return time.time() + self.ttl_seconds if self.ttl_seconds > 0 else 0.0
+
+    async def get(self, key: str) -> Any:
+        """
+        Look up a key in memory, then on disk (promoting disk hits to memory).
+
+        Returns:
+            The cached value, or ``MISSING`` if absent or expired.
+        """
+        value = self.memory.get(key)
+        if value is not MISSING:
+            self.stats.memory_hits += 1
+            return value
+
+        if self.disk is not None:
+            try:
+                value = await asyncio.to_thread(self.disk.get, key)
+            except Exception as e:
+                logging.warning(f"LLM cache disk read failed: {e}")
+                value = MISSING
+            if value is not MISSING:
+                self.stats.disk_hits += 1
+                self.memory.set(key, value, self._expires_at())
+                return value
+
+        self.stats.misses += 1
+        return MISSING
+
+    async def set(self, key: str, value: Any) -> None:
+        """Store a JSON-serializable value in both tiers."""
+        expires_at = self._expires_at()
+        self.memory.set(key, value, expires_at)
+        self.stats.stores += 1
+        if self.disk is not None:
+            try:
+                await asyncio.to_thread(self.disk.set, key, value, expires_at)
+            except Exception as e:
+                logging.warning(f"LLM cache disk write failed: {e}")
+
+    def clear(self) -> None:
+        """Drop every entry from both tiers (counters are preserved)."""
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters plus current tier sizes."""
+        stats = asdict(self.stats)
+        lookups = self.stats.memory_hits + self.stats.disk_hits + self.stats.misses
+        stats["hit_rate"] = (self.stats.memory_hits + self.stats.disk_hits) / lookups if lookups else 0.0
+        stats["memory_entries"] = len(self.memory)
+        stats["disk_bytes"] = self.disk.total_bytes if self.disk is not None else 0
+        return stats
+
+
+# Singleton instance
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Get the process-wide response cache (singleton pattern).
+
+    Returns:
+        ResponseCache: Configured from the LLM_CACHE_* settings.
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            memory_entries=settings.LLM_CACHE_MEMORY_ENTRIES,
+            ttl_seconds=settings.LLM_CACHE_TTL_SECONDS,
+            disk_dir=settings.LLM_CACHE_DIR if settings.LLM_CACHE_DISK_ENABLED else None,
+            disk_max_bytes=settings.LLM_CACHE_DISK_MAX_MB * 1024 * 1024,
+        )
+    return _response_cache
@@ -9,18 +9,48 @@ It includes two main client classes:
 2. GoogleGeminiFunctions: Extended client with function calling capabilities
 
 The module implements a singleton pattern for both clients to ensure efficient
-resource usage across the application.
+resource usage across the application. Both clients share one underlying
+genai.Client and connection pool (see app.core.gemini_transport).
+
+Responses can optionally be served from a content-addressed cache (see
+app.core.llm_cache) by passing ``cache=True`` to any generation method, and
+identical requests already in flight are coalesced (see app.core.single_flight).
+Every request passes through the shared rate limiter / concurrency governor
+(see app.core.rate_limiter) before it is sent. Transient failures (429/5xx,
+timeouts, dropped connections) are retried up to settings.MAX_RETRIES times with
+exponential backoff and full jitter, honoring Retry-After, and never beyond the
+current request deadline (see app.core.deadlines). Token usage and wall time
+of every call are recorded against the current phase / persona role (see
+app.core.usage). Calls can be recorded to, or replayed offline from, a
+cassette file (see app.core.cassettes).
 
 Functions:
     get_llm_client: Returns the singleton instance of the basic LLM client
     get_functions_client: Returns the singleton instance of the functions-enabled client
 """
 
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Optional, List, Tuple, Union, Callable, Awaitable
+from dataclasses import dataclass, asdict
+from email.utils import parsedate_to_datetime
 import logging
 import json
+import copy
+import random
+import re
+import time
 import asyncio
+import httpx
 from app.config import settings
+from app.core.deadlines import DeadlineExceeded, remaining_time
+from app.core.gemini_transport import get_genai_client
+from app.core.usage import (
+    LLMCallRecord, adopt_shared_calls, record_llm_call, record_cache_hit, record_cancelled_call, shared_call_scope,
+)
+from app.core.streaming import current_token_sink
+from app.core.cassettes import current_cassette, cassette_key
+from app.core.llm_cache import get_response_cache, make_cache_key, MISSING
+from app.core.single_flight import get_single_flight
+from app.core.rate_limiter import get_llm_governor, estimate_tokens
 import os
 from dotenv import load_dotenv
 
@@ -30,6 +60,332 @@ from google.genai import types
 
 load_dotenv()
 
+
+# HTTP status codes worth retrying: timeouts, rate limiting and transient server errors
+_RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+
+@dataclass
+class RetryStats:
+    """Counters for the LLM retry layer."""
+    attempts: int = 0
+    retries: int = 0
+    exhausted: int = 0
+    deadline_exceeded: int = 0
+
+
+_retry_stats = RetryStats()
+
+
+def get_retry_stats() -> Dict[str, int]:
+    """Return attempt/retry/exhausted/deadline counters for all Gemini calls."""
+    return asdict(_retry_stats)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    """HTTP status of an API error (google.genai.errors.APIError or httpx)."""
+    code = getattr(error, "code", None)
+    if not isinstance(code, int):
+        code = getattr(getattr(error, "response", None), "status_code", None)
+    return code if isinstance(code, int) else None
+
+
+def _is_retryable(error: BaseException) -> bool:
+    """Whether an error is transient and the request may be re-sent."""
+    if isinstance(error, DeadlineExceeded):
+        return False
+    code = _status_code(error)
+    if code is not None:
+        return code in _RETRYABLE_STATUS_CODES
+    return isinstance(error, (asyncio.TimeoutError, ConnectionError, httpx.TransportError))
+
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    """
+    Server-requested delay in seconds, if any.
+
+    Reads the Retry-After header (seconds or HTTP date) and falls back to the
+    google.rpc.RetryInfo ``retryDelay`` (e.g. "12s") in the error details.
+    """
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    value = None
+    if headers is not None:
+        try:
+            value = headers.get("retry-after") or headers.get("Retry-After")
+        except Exception:
+            value = None
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+
+    details = getattr(error, "details", None)
+    if isinstance(details, dict):
+        details = details.get("error", details).get("details", [])
+    for detail in details if isinstance(details, list) else []:
+        delay = detail.get("retryDelay") if isinstance(detail, dict) else None
+        match = re.fullmatch(r"([\d.]+)s", str(delay or ""))
+        if match:
+            return float(match.group(1))
+    return None
+
+
+def _backoff_delay(retry: int, error: BaseException) -> float:
+    """Full-jitter exponential backoff, never shorter than the server's Retry-After."""
+    ceiling = min(settings.LLM_RETRY_MAX_DELAY_SECONDS, settings.LLM_RETRY_BASE_DELAY_SECONDS * (2 ** retry))
+    delay = random.uniform(0, ceiling)
+    retry_after = _retry_after(error)
+    return max(delay, retry_after) if retry_after is not None else delay
+
+
+# User turn appended after a truncated model turn to resume generation
+CONTINUATION_INSTRUCTION = (
+    "Continue exactly where your previous response stopped. "
+    "Do not repeat any text you already wrote and do not add a preamble."
+)
+
+
+@dataclass
+class ContinuationStats:
+    """Counters for auto-continued (truncated) generations."""
+    calls: int = 0
+    rounds: int = 0
+    extra_tokens: int = 0
+
+
+_continuation_stats = ContinuationStats()
+
+
+def get_continuation_stats() -> Dict[str, int]:
+    """Return how many calls were auto-continued, total rounds and extra tokens spent."""
+    return asdict(_continuation_stats)
+
+
+def _merge_continuation(text: str, continuation: str, max_overlap: int = 500, min_overlap: int = 8) -> str:
+    """
+    Append a continuation, dropping text the model repeated at the seam.
+
+    Finds the longest suffix of ``text`` (up to ``max_overlap`` chars) that the
+    continuation starts with; shorter matches than ``min_overlap`` are treated
+    as coincidence.
+    """
+    stripped = continuation.lstrip()
+    tail = text[-max_overlap:]
+    for size in range(min(len(tail), len(stripped)), min_overlap - 1, -1):
+        if tail.endswith(stripped[:size]):
+            return text + stripped[size:]
+    return text + continuation
+
+
+async def _consume_stream(stream: Any, on_text: Callable[[str], None]) -> types.GenerateContentResponse:
+    """
+    Forward the text of a generate_content_stream to ``on_text`` and rebuild a
+    single response (full text, last finish reason and usage) from the chunks.
+    """
+    text_parts: List[str] = []
+    finish_reason = None
+    usage = None
+    async for chunk in stream:
+        for candidate in chunk.candidates or []:
+            finish_reason = candidate.finish_reason or finish_reason
+            for part in (candidate.content.parts if candidate.content else None) or []:
+                if part.text and not part.thought:
+                    text_parts.append(part.text)
+                    on_text(part.text)
+        usage = chunk.usage_metadata or usage
+    return types.GenerateContentResponse(
+        candidates=[types.Candidate(
+            content=types.Content(role="model", parts=[types.Part(text="".join(text_parts))]),
+            finish_reason=finish_reason,
+        )],
+        usage_metadata=usage,
+    )
+
+
+async def _generate_content(
+    client: genai.Client,
+    model: str,
+    contents: Any,
+    config: types.GenerateContentConfig,
+    kind: str = "generate",
+    on_text: Optional[Callable[[str], None]] = None,
+) -> types.GenerateContentResponse:
+    """
+    Send one generate_content request through the shared LLM governor.
+
+    Both client singletons funnel their requests through here so RPM/TPM quotas
+    and the max-in-flight limit are enforced process-wide. Transient errors are
+    retried (settings.MAX_RETRIES) with full-jitter backoff; each attempt, and
+    the wait for a governor slot, is bounded by the request deadline, or by
+    settings.TIMEOUT_SECONDS when no deadline is set. Usage is recorded under
+    ``kind`` with the current phase / role labels.
+
+    With ``on_text`` the request is streamed and each text chunk is forwarded as
+    it arrives; a stream that already produced text is not retried.
+
+    When a cassette is active the response is recorded to it, or, in replay
+    mode, served from it without reaching the governor or the network.
+
+    Raises:
+        DeadlineExceeded: The request deadline passed before a response arrived.
+        CassetteMiss: Replaying and the request was never recorded.
+    """
+    started = time.monotonic()
+    cassette = current_cassette()
+    request_key = cassette_key(model, contents, config) if cassette is not None else None
+    if cassette is not None and cassette.mode == "replay":
+        response = await cassette.replay(request_key)
+        if on_text is not None and response.text:
+            on_text(response.text)
+        record_llm_call(kind, model, response, started, time.monotonic() - started)
+        return response
+
+    estimated = estimate_tokens(contents, config.system_instruction)
+    governor = get_llm_governor()
+
+    emitted = False
+    sent = False
+
+    def forward(text: str) -> None:
+        nonlocal emitted
+        emitted = True
+        on_text(text)
+
+    async def attempt() -> types.GenerateContentResponse:
+        nonlocal sent
+        async with governor.slot(estimated_tokens=estimated):
+            sent = True
+            if on_text is not None:
+                stream = await client.aio.models.generate_content_stream(
+                    model=model,
+                    contents=contents,
+                    config=config,
+                )
+                return await _consume_stream(stream, forward)
+            return await client.aio.models.generate_content(
+                model=model,
+                contents=contents,
+                config=config,
+            )
+
+    retry = 0
+    try:
+        while True:
+            remaining = remaining_time()
+            if remaining is not None and remaining <= 0:
+                _retry_stats.deadline_exceeded += 1
+                raise DeadlineExceeded("LLM request deadline exceeded")
+
+            _retry_stats.attempts += 1
+            try:
+                response = await asyncio.wait_for(
+                    attempt(), timeout=remaining if remaining is not None else settings.TIMEOUT_SECONDS
+                )
+                break
+            except asyncio.TimeoutError as e:
+                if remaining is not None:
+                    _retry_stats.deadline_exceeded += 1
+                    raise DeadlineExceeded("LLM request deadline exceeded") from e
+                error: BaseException = e
+            except Exception as e:
+                error = e
+
+            if not _is_retryable(error) or retry >= settings.MAX_RETRIES or emitted:
+                if retry:
+                    _retry_stats.exhausted += 1
+                    logging.error(f"Gemini request failed after {retry + 1} attempts: {error}")
+                raise error
+
+            delay = _backoff_delay(retry, error)
+            remaining = remaining_time()
+            if remaining is not None and delay >= remaining:
+                _retry_stats.deadline_exceeded += 1
+                logging.warning(f"Not retrying Gemini request: backoff {delay:.1f}s exceeds remaining deadline")
+                raise error
+
+            retry += 1
+            _retry_stats.retries += 1
+            logging.warning(
+                f"Transient Gemini error ({_status_code(error) or type(error).__name__}), "
+                f"retry {retry}/{settings.MAX_RETRIES} in {delay:.1f}s"
+            )
+            await asyncio.sleep(delay)
+    except asyncio.CancelledError:
+        # Request abandoned (client disconnect, job cancel, lost race): count what that saved
+        record_cancelled_call(estimated, sent)
+        raise
+
+    usage = getattr(response, "usage_metadata", None)
+    governor.reconcile(estimated, getattr(usage, "total_token_count", None))
+    elapsed = time.monotonic() - started
+    if cassette is not None:
+        cassette.record(request_key, kind, model, response, elapsed)
+    record_llm_call(kind, model, response, started, elapsed)
+    return response
+
+
+async def _run_request(
+    key_parts: Dict[str, Any],
+    call: Callable[[], Awaitable[Any]],
+    cache: Optional[bool] = None,
+    encode: Callable[[Any], Any] = lambda value: value,
+    decode: Callable[[Any], Any] = lambda value: value,
+) -> Any:
+    """
+    Execute an LLM call through the response cache and single-flight coalescing.
+
+    Identical requests already in flight are awaited instead of re-issued
+    (settings.LLM_COALESCE_IN_FLIGHT), and every caller is charged the shared
+    request's usage; results are optionally served from and stored in the
+    response cache.
+
+    Args:
+        key_parts: Everything that influences the response (used to build the request key).
+        call: Zero-argument coroutine factory performing the actual API request.
+        cache: True/False to force caching on/off; None uses settings.LLM_CACHE_ENABLED.
+        encode: Converts the call result into a JSON-serializable, shareable value.
+        decode: Converts a shared value back into a fresh instance of the call's return type.
+
+    Returns:
+        The (possibly cached or coalesced) call result.
+    """
+    use_cache = settings.LLM_CACHE_ENABLED if cache is None else cache
+    coalesce = settings.LLM_COALESCE_IN_FLIGHT
+    if not use_cache and not coalesce:
+        return await call()
+
+    key = make_cache_key(key_parts)
+    response_cache = get_response_cache() if use_cache else None
+    if response_cache is not None:
+        cached = await response_cache.get(key)
+        if cached is not MISSING:
+            logging.debug(f"LLM cache hit for {key_parts.get('kind')} ({key[:12]})")
+            record_cache_hit()
+            return decode(cached)
+
+    async def call_and_store() -> Any:
+        encoded = encode(await call())
+        if response_cache is not None:
+            await response_cache.set(key, encoded)
+        return encoded
+
+    async def shared_call() -> Tuple[Any, List[LLMCallRecord]]:
+        # Runs once for all coalesced callers; each adopts its usage below
+        with shared_call_scope() as shared_usage:
+            encoded = await call_and_store()
+        return encoded, shared_usage.records
+
+    if coalesce:
+        encoded, records = await get_single_flight().do(key, shared_call)
+        adopt_shared_calls(records)
+        return decode(encoded)
+    return decode(await call_and_store())
+
+
 class GoogleGeminiClient:
     """
     Basic client for Google Gemini using the unified Google GenAI SDK.
@@ -42,17 +398,8 @@ class GoogleGeminiClient:
         if not settings.is_gemini_configured:
             raise ValueError("Missing Google Gemini configuration.")
         
-        # Initialize the Google GenAI client
-        if settings.USE_VERTEX_AI:
-            # Use Vertex AI
-            self.client = genai.Client(
-                vertexai=True,
-                project=settings.GOOGLE_CLOUD_PROJECT,
-                location=settings.GOOGLE_CLOUD_LOCATION
-            )
-        else:
-            # Use Gemini Developer API
-            self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        # Shared Google GenAI client (one connection pool for both client singletons)
+        self.client = get_genai_client()
         
         self.model = settings.GEMINI_MODEL
         logging.info(f"Initialized Google Gemini client with model: {self.model}")
@@ -66,6 +413,7 @@ class GoogleGeminiClient:
         max_continuations: int = 2,
         system_instruction: Optional[str] = None,
         thinking_budget: Optional[int] = None,
+        cache: Optional[bool] = None,
     ) -> str:
         """
         Generate a response from Google Gemini.
@@ -74,6 +422,11 @@ class GoogleGeminiClient:
             prompt (str): The prompt to send to the Gemini API.
             temperature (float): Controls randomness in the output (0.0 to 1.0).
             max_tokens (int): The maximum number of tokens to generate in the response.
+            cache (Optional[bool]): Serve/store this call via the response cache.
+                None falls back to settings.LLM_CACHE_ENABLED.
+
+        Inside ``app.core.streaming.final_output()`` the call is streamed and its
+        text forwarded chunk by chunk to the workflow event stream.
 
         Returns:
             str: The generated response content from the Gemini API.
@@ -106,40 +459,107 @@ class GoogleGeminiClient:
             if system_instruction:
                 config.system_instruction = system_instruction
 
-            # Make the API call
-            response = await self.client.aio.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=config,
+            # Inside streaming.final_output(), stream this call's text to the client
+            on_text = current_token_sink()
+            streamed = False
+
+            def forward(text: str) -> None:
+                nonlocal streamed
+                streamed = True
+                on_text(text)
+
+            key_parts = {
+                "kind": "generate",
+                "model": self.model,
+                "contents": prompt,
+                "system_instruction": system_instruction,
+                "temperature": temperature,
+                "max_output_tokens": max_tokens,
+                "thinking_config": thinking_cfg,
+                "auto_continue": auto_continue,
+                "max_continuations": max_continuations,
+                "stream": on_text is not None,
+            }
+            response_text = await _run_request(
+                key_parts,
+                lambda: self._generate_uncached(
+                    prompt, config, auto_continue, max_continuations, forward if on_text is not None else None
+                ),
+                cache=cache,
             )
-
-            # Extract text from response
-            response_text = self._extract_text(response)
-            
-            # Handle truncation with auto-continuation (existing logic)
-            if auto_continue and self._is_truncated(response):
-                continuations = 0
-                while continuations < max_continuations and self._is_truncated(response):
-                    continuations += 1
-                    logging.info(f"Response truncated, attempting continuation {continuations}")
-                    
-                    continuation_prompt = f"{prompt}\n\n{response_text}\n\nPlease continue from where you left off:"
-                    
-                    response = await self.client.aio.models.generate_content(
-                        model=self.model,
-                        contents=continuation_prompt,
-                        config=config,  # Reuse same config including system_instruction
-                    )
-                    
-                    continuation_text = self._extract_text(response)
-                    response_text += continuation_text
-
+            if on_text is not None and not streamed and response_text:
+                # Served from the cache or by another caller's request: send it in one chunk
+                on_text(response_text)
             return response_text
 
         except Exception as e:
             logging.error(f"Gemini generation error: {e}")
             raise
 
+    async def _generate_uncached(
+        self,
+        prompt: str,
+        config: types.GenerateContentConfig,
+        auto_continue: bool,
+        max_continuations: int,
+        on_text: Optional[Callable[[str], None]] = None,
+    ) -> str:
+        """
+        Issue the generate_content request(s), auto-continuing truncated output.
+
+        Continuations are sent as a multi-turn conversation (original prompt,
+        the text so far as the model turn, then a short "continue" user turn)
+        instead of re-embedding the output in a new prompt, so the model resumes
+        mid-answer and the request prefix stays stable between rounds. Any text
+        the model repeats at the seam is dropped.
+
+        If ``on_text`` is given the first request is streamed and every text
+        chunk is forwarded as it arrives; each continuation's new text is
+        forwarded once it has been merged.
+        """
+        # Make the API call
+        response = await _generate_content(self.client, self.model, prompt, config, on_text=on_text)
+
+        # Extract text from response
+        response_text = self._extract_text(response)
+        
+        # Handle truncation with auto-continuation
+        if auto_continue and self._is_truncated(response):
+            continuations = 0
+            extra_tokens = 0
+            while continuations < max_continuations and self._is_truncated(response):
+                continuations += 1
+                logging.info(f"Response truncated, attempting continuation {continuations}")
+                
+                contents = [
+                    types.Content(role="user", parts=[types.Part(text=prompt)]),
+                    types.Content(role="model", parts=[types.Part(text=response_text)]),
+                    types.Content(role="user", parts=[types.Part(text=CONTINUATION_INSTRUCTION)]),
+                ]
+                # Not streamed: the text the model repeats at the seam is only known
+                # once the round is complete, so the new text is emitted after merging
+                response = await _generate_content(
+                    self.client, self.model, contents, config,  # Reuse same config including system_instruction
+                    kind="continuation",
+                )
+                
+                usage = getattr(response, "usage_metadata", None)
+                extra_tokens += getattr(usage, "total_token_count", None) or 0
+                merged = _merge_continuation(response_text, self._extract_text(response))
+                if on_text is not None and len(merged) > len(response_text):
+                    on_text(merged[len(response_text):])
+                response_text = merged
+
+            _continuation_stats.calls += 1
+            _continuation_stats.rounds += continuations
+            _continuation_stats.extra_tokens += extra_tokens
+            logging.info(
+                f"Auto-continuation used {continuations} round(s) and {extra_tokens} extra tokens "
+                f"({len(response_text)} chars total)"
+            )
+
+        return response_text
+
     def _extract_text(self, response) -> str:
         """Extract text from response, handling multiple parts."""
         if not response.candidates:
@@ -163,6 +583,8 @@ class GoogleGeminiClient:
         """
         Synchronous version of generate for compatibility.
         
+        Note: this bypasses the async LLM governor (rate limits / priority lanes).
+        
         Args:
             prompt (str): The prompt to send to the Gemini API.
             temperature (float): Controls randomness in the output (0.0 to 1.0).
@@ -204,16 +626,18 @@ class GoogleGeminiClient:
             str: Chunks of the generated response content.
         """
         try:
-            async for chunk in await self.client.aio.models.generate_content_stream(
-                model=self.model,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    temperature=temperature,
-                    max_output_tokens=max_tokens,
-                )
-            ):
-                if chunk.text:
-                    yield chunk.text
+            # Hold a governor slot for the whole stream
+            async with get_llm_governor().slot(estimated_tokens=estimate_tokens(prompt)):
+                async for chunk in await self.client.aio.models.generate_content_stream(
+                    model=self.model,
+                    contents=prompt,
+                    config=types.GenerateContentConfig(
+                        temperature=temperature,
+                        max_output_tokens=max_tokens,
+                    )
+                ):
+                    if chunk.text:
+                        yield chunk.text
                     
         except Exception as e:
             logging.error(f"Error streaming from Google Gemini API: {str(e)}")
@@ -234,17 +658,8 @@ class GoogleGeminiFunctions:
         if not settings.is_gemini_configured:
             raise ValueError("Missing Google Gemini configuration. Please set GOOGLE_API_KEY or configure Vertex AI settings.")
         
-        # Initialize the Google GenAI client
-        if settings.USE_VERTEX_AI:
-            # Use Vertex AI
-            self.client = genai.Client(
-                vertexai=True,
-                project=settings.GOOGLE_CLOUD_PROJECT,
-                location=settings.GOOGLE_CLOUD_LOCATION
-            )
-        else:
-            # Use Gemini Developer API
-            self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        # Shared Google GenAI client (one connection pool for both client singletons)
+        self.client = get_genai_client()
         
         self.model = settings.GEMINI_MODEL
         logging.info(f"Initialized Google Gemini Functions client with model: {self.model}")
@@ -258,6 +673,7 @@ class GoogleGeminiFunctions:
         function_call: Union[str, Dict[str, str], None] = None,
         system_instruction: Optional[str] = None,
         thinking_budget: Optional[int] = None,
+        cache: Optional[bool] = None,
     ) -> Dict[str, Any]:
         """
         Generate a response from Google Gemini with function calling.
@@ -269,6 +685,8 @@ class GoogleGeminiFunctions:
             temperature (float): Controls randomness in the output (0.0 to 1.0).
             function_call (Union[str, Dict[str, str], None]): For OpenAI compatibility. 
                 Can be "auto", "none", or {"name": "function_name"} to force a specific function call.
+            cache (Optional[bool]): Serve/store this call via the response cache.
+                None falls back to settings.LLM_CACHE_ENABLED.
 
         Returns:
             Dict[str, Any]: A dictionary containing either the message content or function call details.
@@ -331,32 +749,54 @@ class GoogleGeminiFunctions:
             if system_instruction:
                 config.system_instruction = system_instruction
 
-            # Generate content 
-            response = await self.client.aio.models.generate_content(
-                model=self.model,
-                contents=prompt,
-                config=config,
+            key_parts = {
+                "kind": "generate_with_functions",
+                "model": self.model,
+                "contents": prompt,
+                "system_instruction": system_instruction,
+                "temperature": temperature,
+                "max_output_tokens": max_tokens,
+                "thinking_config": thinking_cfg,
+                "tools": tools,
+                "tool_config": tool_config,
+            }
+            return await _run_request(
+                key_parts,
+                lambda: self._generate_with_functions_uncached(prompt, config),
+                cache=cache,
+                decode=copy.deepcopy,  # Callers mutate the returned arguments dict
             )
 
-            # Check for function calls first
-            if response.function_calls:
-                fn_call = response.function_calls[0]
-                return {
-                    "type": "function_call",
-                    "name": fn_call.name,
-                    "arguments": dict(fn_call.args) if fn_call.args else {}
-                }
-
-            # Otherwise return text 
-            if response.text:
-                return {"type": "text", "content": response.text}
-
-            raise Exception("Empty response from Gemini API")
-
         except Exception as e:
             logging.error(f"Error in generate_with_functions: {str(e)}")
             raise 
 
+    async def _generate_with_functions_uncached(
+        self,
+        prompt: str,
+        config: types.GenerateContentConfig,
+    ) -> Dict[str, Any]:
+        """Issue a function-calling request and normalize the result to a dict."""
+        # Generate content 
+        response = await _generate_content(
+            self.client, self.model, prompt, config, kind="generate_with_functions"
+        )
+
+        # Check for function calls first
+        if response.function_calls:
+            fn_call = response.function_calls[0]
+            return {
+                "type": "function_call",
+                "name": fn_call.name,
+                "arguments": dict(fn_call.args) if fn_call.args else {}
+            }
+
+        # Otherwise return text 
+        if response.text:
+            return {"type": "text", "content": response.text}
+
+        raise Exception("Empty response from Gemini API")
+
     async def generate_structured(
         self,
         prompt: str,
@@ -364,6 +804,7 @@ class GoogleGeminiFunctions:
         system_instruction: Optional[str] = None,
         temperature: float = 0.7,
         thinking_budget: Optional[int] = None,
+        cache: Optional[bool] = None,
     ) -> Any:
         """
         Generate structured output using pydantic schema.
@@ -372,6 +813,8 @@ class GoogleGeminiFunctions:
             prompt: User prompt 
             response_schema: Pydantic BaseModel class defining output structure 
             system_instruction: System-level instructions
+            cache: Serve/store this call via the response cache
+                   (None falls back to settings.LLM_CACHE_ENABLED)
 
         Returns:
             Validated Pydantic model instance
@@ -380,16 +823,40 @@ class GoogleGeminiFunctions:
         if thinking_budget:
             thinking_cfg = types.ThinkingConfig(thinking_budget=thinking_budget)
 
-        response = await self.client.aio.models.generate_content(
-            model=self.model,
-            contents=prompt,
-            config=types.GenerateContentConfig(
-                system_instruction=system_instruction,
-                response_mime_type="application/json",
-                response_schema=response_schema,
-                temperature=temperature,
-                thinking_config=thinking_cfg,
-            )
+        config = types.GenerateContentConfig(
+            system_instruction=system_instruction,
+            response_mime_type="application/json",
+            response_schema=response_schema,
+            temperature=temperature,
+            thinking_config=thinking_cfg,
+        )
+
+        key_parts = {
+            "kind": "generate_structured",
+            "model": self.model,
+            "contents": prompt,
+            "system_instruction": system_instruction,
+            "temperature": temperature,
+            "thinking_config": thinking_cfg,
+            "response_schema": response_schema,
+        }
+        return await _run_request(
+            key_parts,
+            lambda: self._generate_structured_uncached(prompt, response_schema, config),
+            cache=cache,
+            encode=lambda result: result.model_dump(mode="json"),
+            decode=response_schema.model_validate,
+        )
+
+    async def _generate_structured_uncached(
+        self,
+        prompt: str,
+        response_schema: type,
+        config: types.GenerateContentConfig,
+    ) -> Any:
+        """Issue a JSON-mode request and validate it against the response schema."""
+        response = await _generate_content(
+            self.client, self.model, prompt, config, kind="generate_structured"
         )
 
         # Parse and validate with Pydantic
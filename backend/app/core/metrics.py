@@ -0,0 +1,352 @@
+# app/core/metrics.py
+"""
+Prometheus Metrics
+
+Minimal in-process counters, gauges and histograms rendered in the Prometheus
+text exposition format (``GET /metrics``), without a client library:
+
+- Each labelled series is a child object created on first use and cached, so
+  recording a value is a dict lookup plus an in-place update (histograms bump
+  one slot of a fixed-size bucket array found by bisection; cumulative counts
+  are only computed when scraped).
+- State that other modules already keep (governor queue, retry counters,
+  cache hits, job pool, ...) is read at scrape time by collectors instead of
+  being mirrored on the hot path.
+
+Instrumented directly: end-to-end workflow latency and outcomes, in-flight
+requests, per-phase latency, LLM call latency per persona role, token
+throughput per workflow, and cancelled queries and calls (with the tokens
+their cancellation saved).
+
+Usage:
+    from app.core.metrics import WORKFLOW_SECONDS, register_collector, render
+
+    WORKFLOW_SECONDS.labels("routing").observe(3.2)
+    register_collector(lambda: [gauge_family("jobs_queued", "Queued jobs", {(): 3})])
+    text = render()
+"""
+
+import bisect
+import logging
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+# (name, type, help, [(labels, value)]) as produced by collectors
+Family = Tuple[str, str, str, List[Tuple[Dict[str, str], float]]]
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 300, 600)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class _Metric:
+    """
+    A metric family with a fixed set of label names and cached children.
+
+    Args:
+        name: Metric name
+        documentation: HELP text
+        labelnames: Label names, in the order ``labels()`` takes their values
+        max_series: Label combinations kept; further ones are folded into an "other" series
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), max_series: int = 200):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_series = max_series
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._children[()] = self._new_child()
+        _REGISTRY.append(self)
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def labels(self, *values: Any) -> Any:
+        """The child series for these label values (created once)."""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            if len(self._children) >= self.max_series:
+                # Unbounded label values (e.g. generated worker roles) must not grow the scrape forever
+                values = ("other",) * len(values)
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _label_dict(self, values: Tuple[str, ...]) -> Dict[str, str]:
+        return {name: "" if value is None else str(value) for name, value in zip(self.labelnames, values)}
+
+    def samples(self) -> List[Tuple[str, Dict[str, str], float]]:
+        raise NotImplementedError
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Monotonic counter (``labels(...).inc(n)``)."""
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def samples(self):
+        return [(f"{self.name}_total", self._label_dict(values), child.value) for values, child in list(self._children.items())]
+
+
+class Gauge(_Metric):
+    """Value that goes up and down (``labels(...).inc() / .dec() / .set(v)``)."""
+
+    kind = "gauge"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def samples(self):
+        return [(self.name, self._label_dict(values), child.value) for values, child in list(self._children.items())]
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """Bucketed distribution (``labels(...).observe(v)``)."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        max_series: int = 200,
+    ):
+        self.bounds = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames, max_series)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.bounds)
+
+    def samples(self):
+        samples = []
+        for values, child in list(self._children.items()):
+            labels = self._label_dict(values)
+            cumulative = 0
+            for bound, count in zip(self.bounds + (math.inf,), list(child.counts)):
+                cumulative += count
+                samples.append((f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative))
+            samples.append((f"{self.name}_count", labels, cumulative))
+            samples.append((f"{self.name}_sum", labels, child.sum))
+        return samples
+
+
+_REGISTRY: List[_Metric] = []
+_collectors: List[Callable[[], Iterable[Family]]] = []
+
+
+def register_collector(collector: Callable[[], Iterable[Family]]) -> None:
+    """Add a scrape-time collector returning metric families (see gauge_family / counter_family)."""
+    _collectors.append(collector)
+
+
+def gauge_family(name: str, documentation: str, values: Dict[Tuple[Tuple[str, str], ...], Any]) -> Family:
+    """A gauge family from {((label, value), ...): number} (None values are skipped)."""
+    return (name, "gauge", documentation, [(dict(labels), value) for labels, value in values.items() if value is not None])
+
+
+def counter_family(name: str, documentation: str, values: Dict[Tuple[Tuple[str, str], ...], Any]) -> Family:
+    """A counter family (``_total`` is appended to the name)."""
+    return (f"{name}_total", "counter", documentation, [(dict(labels), value) for labels, value in values.items() if value is not None])
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    lines: List[str] = []
+    for metric in list(_REGISTRY):
+        lines.append(f"# HELP {metric.name} {metric.documentation}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        for name, labels, value in metric.samples():
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    for collector in list(_builtin_collectors()) + _collectors:
+        try:
+            families = list(collector())
+        except Exception as e:
+            logging.warning(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+            continue
+        for name, kind, documentation, samples in families:
+            base = name[:-len("_total")] if kind == "counter" and name.endswith("_total") else name
+            lines.append(f"# HELP {base} {documentation}")
+            lines.append(f"# TYPE {base} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(float(value))}")
+    return "\n".join(lines) + "\n"
+
+
+# ============================================================================
+# Instrumented metrics
+# ============================================================================
+
+WORKFLOW_SECONDS = Histogram(
+    "workflow_request_duration_seconds", "End-to-end latency of a query (selection and workflow)", ["workflow"]
+)
+WORKFLOW_REQUESTS = Counter("workflow_requests", "Queries processed, by workflow and outcome", ["workflow", "outcome"])
+REQUESTS_IN_FLIGHT = Gauge("workflow_requests_in_flight", "Queries currently being processed")
+PHASE_SECONDS = Histogram("workflow_phase_duration_seconds", "Latency of a labelled workflow phase block", ["workflow", "phase"])
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_duration_seconds", "Gemini call latency including retries and rate-limit waits, by persona role", ["role"],
+    max_series=50,
+)
+LLM_TOKENS = Counter("llm_tokens", "Tokens processed by Gemini calls, by workflow and kind", ["workflow", "kind"])
+LLM_CALLS = Counter("llm_calls", "Completed Gemini calls, by workflow", ["workflow"])
+LLM_CANCELLED_CALLS = Counter(
+    "llm_cancelled_calls", "Gemini calls abandoned by cancellation, by whether the request had been sent", ["stage"]
+)
+LLM_TOKENS_SAVED = Counter(
+    "llm_tokens_saved_by_cancellation", "Estimated tokens not spent because calls were cancelled, by workflow", ["workflow"]
+)
+REQUESTS_CANCELLED = Counter("workflow_requests_cancelled", "Queries cancelled before finishing, by reason", ["reason"])
+
+
+# ============================================================================
+# Scrape-time collectors for state kept elsewhere
+# ============================================================================
+
+def _governor_families() -> Iterable[Family]:
+    from app.core.rate_limiter import get_llm_governor
+
+    stats = get_llm_governor().get_stats()
+    yield gauge_family("llm_governor_in_flight", "Gemini calls holding a governor slot", {(): stats["in_flight"]})
+    yield gauge_family(
+        "llm_governor_queue_depth", "Gemini calls waiting for the governor, by lane",
+        {(("lane", lane),): depth for lane, depth in stats["queue_depth"].items()},
+    )
+    yield counter_family(
+        "llm_governor_granted", "Gemini calls granted by the governor, by lane",
+        {(("lane", lane),): count for lane, count in stats["granted"].items()},
+    )
+    yield counter_family("llm_governor_wait_seconds", "Total time Gemini calls waited for the governor", {(): stats["total_wait_seconds"]})
+
+
+def _retry_families() -> Iterable[Family]:
+    from app.core.llm_client import get_retry_stats
+
+    stats = get_retry_stats()
+    yield counter_family("llm_attempts", "Gemini request attempts (first tries and retries)", {(): stats["attempts"]})
+    yield counter_family("llm_retries", "Gemini requests retried after a transient error", {(): stats["retries"]})
+    yield counter_family("llm_retries_exhausted", "Gemini requests that failed after all retries", {(): stats["exhausted"]})
+    yield counter_family("llm_deadline_exceeded", "Gemini requests stopped by the request deadline", {(): stats["deadline_exceeded"]})
+
+
+def _cache_families() -> Iterable[Family]:
+    from app.config import settings
+    from app.core import llm_cache, selection_cache
+    from app.core.workflow_classifier import get_classifier_stats
+
+    if llm_cache._response_cache is not None:
+        stats = llm_cache._response_cache.get_stats()
+        yield counter_family(
+            "llm_cache_lookups", "LLM response cache lookups, by result",
+            {(("result", "memory_hit"),): stats["memory_hits"], (("result", "disk_hit"),): stats["disk_hits"], (("result", "miss"),): stats["misses"]},
+        )
+    if settings.SELECTOR_CACHE_ENABLED and selection_cache._selection_cache is not None:
+        stats = selection_cache._selection_cache.get_stats()
+        yield counter_family(
+            "selection_cache_lookups", "Semantic workflow selection cache lookups, by result",
+            {(("result", "hit"),): stats["hits"], (("result", "miss"),): stats["lookups"] - stats["hits"]},
+        )
+    stats = get_classifier_stats()
+    yield counter_family(
+        "selector_classifications", "Queries seen by the local pre-classifier, by whether the LLM selector was skipped",
+        {(("bypassed", "true"),): stats["bypassed"], (("bypassed", "false"),): stats["queries"] - stats["bypassed"]},
+    )
+
+
+def _speculation_families() -> Iterable[Family]:
+    from app.core.speculation import get_speculation_stats
+    from app.core.workflow_race import get_race_stats
+
+    speculation = get_speculation_stats()
+    yield counter_family(
+        "speculative_runs", "Speculative workflow runs, by result",
+        {(("result", "hit"),): speculation["hits"], (("result", "miss"),): speculation["misses"]},
+    )
+    race = get_race_stats()
+    yield counter_family(
+        "workflow_races", "Workflow races, by winner",
+        {(("winner", "selected"),): race["selected_wins"], (("winner", "alternative"),): race["alternative_wins"]},
+    )
+    yield counter_family(
+        "wasted_llm_tokens", "Tokens spent by cancelled speculative and losing race runs, by source",
+        {(("source", "speculation"),): speculation["wasted_tokens"], (("source", "race"),): race["wasted_tokens"]},
+    )
+
+
+def _admission_families() -> Iterable[Family]:
+    from app.core.admission import get_admission_controller
+
+    stats = get_admission_controller().get_stats()
+    yield gauge_family("admission_load", "Expected LLM calls of admitted queries", {(): stats["load"]})
+    yield gauge_family("admission_capacity", "Admission capacity target in expected LLM calls", {(): stats["capacity"]})
+    yield gauge_family("admission_queue_depth", "Queries waiting for admission", {(): stats["waiting"]})
+    yield counter_family(
+        "admission_decisions", "Admission decisions, by result",
+        {
+            (("result", "normal"),): stats["admitted"] - stats["reduced"] - stats["cheapest"],
+            (("result", "reduced"),): stats["reduced"],
+            (("result", "cheapest"),): stats["cheapest"],
+            (("result", "rejected"),): stats["rejected"] + stats["queue_timeouts"],
+        },
+    )
+
+
+def _builtin_collectors() -> Iterable[Callable[[], Iterable[Family]]]:
+    return (_governor_families, _retry_families, _cache_families, _speculation_families, _admission_families)
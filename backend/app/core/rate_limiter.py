@@ -0,0 +1,275 @@
+# app/core/rate_limiter.py
+"""
+LLM Rate Limiter and Concurrency Governor
+
+A process-wide gate that every Gemini request passes through before it is sent.
+It combines:
+
+1. A requests-per-minute token bucket
+2. A tokens-per-minute token bucket (debited with an estimate up front and
+   reconciled with the real usage once the response arrives)
+3. A max-in-flight limit
+4. Priority lanes: waiting interactive requests are always granted before
+   waiting batch requests; within a lane requests are served FIFO
+5. Optional per-request budgets: ``request_concurrency(n)`` caps the in-flight
+   calls of one request's concurrent work (e.g. raced workflows) together
+
+The lane of the current request is carried in a context variable, so it flows
+through workflow fan-outs (asyncio.gather / create_task copy the context)
+without threading a parameter through every call.
+
+Usage:
+    from app.core.rate_limiter import get_llm_governor, priority_lane, Priority
+
+    with priority_lane(Priority.BATCH):
+        async with get_llm_governor().slot(estimated_tokens=1200):
+            response = await client.aio.models.generate_content(...)
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union
+
+from app.config import settings
+
+
+class Priority(IntEnum):
+    """Scheduling lanes; lower values are served first."""
+    INTERACTIVE = 0
+    BATCH = 1
+
+
+_current_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.INTERACTIVE)
+_request_limit: ContextVar[Optional[asyncio.Semaphore]] = ContextVar("llm_request_limit", default=None)
+
+
+@contextmanager
+def priority_lane(priority: Union[Priority, str]) -> Iterator[Priority]:
+    """
+    Run the enclosed code (and any tasks it spawns) in the given priority lane.
+
+    Args:
+        priority: A Priority member or its name ("interactive" / "batch").
+                  Unknown names and other values fall back to the interactive lane.
+    """
+    if not isinstance(priority, Priority):
+        lane = Priority.__members__.get(priority.upper()) if isinstance(priority, str) else None
+        if lane is None:
+            logging.warning(f"Unknown priority lane {priority!r}, using interactive")
+            lane = Priority.INTERACTIVE
+        priority = lane
+    token = _current_priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _current_priority.reset(token)
+
+
+@contextmanager
+def request_concurrency(max_in_flight: int) -> Iterator[None]:
+    """
+    Share one in-flight budget between the LLM calls of the enclosed block and
+    the tasks it spawns (on top of the process-wide limits). 0 disables it.
+    """
+    token = _request_limit.set(asyncio.Semaphore(max_in_flight) if max_in_flight > 0 else None)
+    try:
+        yield
+    finally:
+        _request_limit.reset(token)
+
+
+def current_priority() -> Priority:
+    """Return the priority lane of the current context."""
+    return _current_priority.get()
+
+
+def estimate_tokens(*texts: Any) -> int:
+    """Cheap prompt-size estimate (~4 characters per token) used before the real count is known."""
+    return max(1, sum(len(str(text)) for text in texts if text) // 4)
+
+
+class TokenBucket:
+    """
+    Continuous-refill token bucket.
+
+    Attributes:
+        capacity: Maximum burst size.
+        rate: Refill rate in tokens per second.
+        tokens: Current balance (may go negative after reconciliation).
+    """
+
+    def __init__(self, per_minute: int, capacity: Optional[int] = None):
+        self.capacity = float(capacity or per_minute)
+        self.rate = per_minute / 60.0
+        self.tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` tokens are available (requests larger than capacity wait for a full bucket)."""
+        self._refill(now)
+        needed = min(amount, self.capacity) - self.tokens
+        return max(0.0, needed / self.rate) if needed > 0 else 0.0
+
+    def consume(self, amount: float) -> None:
+        self.tokens -= amount
+
+
+class LLMGovernor:
+    """
+    Shared RPM/TPM limiter with a max-in-flight semaphore and priority lanes.
+
+    A limit of 0 disables that particular constraint.
+    """
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self._request_bucket = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self._token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self._waiters: List[Tuple[int, int, "asyncio.Future[None]", int]] = []
+        self._sequence = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.in_flight = 0
+        self.granted = {lane.name.lower(): 0 for lane in Priority}
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self.peak_queue_depth = 0
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 1, priority: Optional[Priority] = None) -> AsyncIterator[None]:
+        """Hold one in-flight slot (and one of the request's budget, if set) for the duration of the block."""
+        request_limit = _request_limit.get()
+        if request_limit is not None:
+            await request_limit.acquire()
+        try:
+            await self.acquire(estimated_tokens, priority)
+            try:
+                yield
+            finally:
+                self.release()
+        finally:
+            if request_limit is not None:
+                request_limit.release()
+
+    async def acquire(self, estimated_tokens: int = 1, priority: Optional[Priority] = None) -> None:
+        """
+        Wait until a request of ``estimated_tokens`` may be sent.
+
+        Args:
+            estimated_tokens: Expected token cost, debited from the TPM bucket.
+            priority: Lane override; defaults to the current context's lane.
+        """
+        lane = current_priority() if priority is None else priority
+        future: "asyncio.Future[None]" = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(lane), next(self._sequence), future, estimated_tokens))
+        self.peak_queue_depth = max(self.peak_queue_depth, len(self._waiters))
+        started = time.monotonic()
+        self._pump()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just before we were cancelled: hand the slot back
+                self.release()
+            raise
+        waited = time.monotonic() - started
+        self.total_wait_seconds += waited
+        self.max_wait_seconds = max(self.max_wait_seconds, waited)
+        self.granted[lane.name.lower()] += 1
+        if waited > 1.0:
+            logging.info(f"LLM request waited {waited:.1f}s for rate limit ({lane.name.lower()} lane)")
+
+    def release(self) -> None:
+        """Return an in-flight slot and wake the next eligible waiter."""
+        self.in_flight -= 1
+        self._pump()
+
+    def reconcile(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the TPM bucket once the real token usage of a request is known."""
+        if self._token_bucket is not None and actual_tokens:
+            self._token_bucket.consume(actual_tokens - estimated_tokens)
+
+    def _pump(self) -> None:
+        """Grant waiting requests in priority order while capacity allows."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+        while self._waiters:
+            _, _, future, tokens = self._waiters[0]
+            if future.done():  # Cancelled while waiting
+                heapq.heappop(self._waiters)
+                continue
+            if self.max_in_flight > 0 and self.in_flight >= self.max_in_flight:
+                return  # release() will pump again
+
+            now = time.monotonic()
+            wait = 0.0
+            if self._request_bucket is not None:
+                wait = max(wait, self._request_bucket.time_until(1, now))
+            if self._token_bucket is not None:
+                wait = max(wait, self._token_bucket.time_until(tokens, now))
+            if wait > 0:
+                self._timer = asyncio.get_running_loop().call_later(wait, self._pump)
+                return
+
+            heapq.heappop(self._waiters)
+            if self._request_bucket is not None:
+                self._request_bucket.consume(1)
+            if self._token_bucket is not None:
+                self._token_bucket.consume(tokens)
+            self.in_flight += 1
+            future.set_result(None)
+
+    def queue_depth(self) -> Dict[str, int]:
+        """Number of waiting requests per lane."""
+        depth = {lane.name.lower(): 0 for lane in Priority}
+        for lane, _, future, _ in self._waiters:
+            if not future.done():
+                depth[Priority(lane).name.lower()] += 1
+        return depth
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return in-flight, queue depth, grant and wait counters."""
+        return {
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "queue_depth": self.queue_depth(),
+            "peak_queue_depth": self.peak_queue_depth,
+            "granted": dict(self.granted),
+            "total_wait_seconds": round(self.total_wait_seconds, 3),
+            "max_wait_seconds": round(self.max_wait_seconds, 3),
+            "request_tokens_available": round(self._request_bucket.tokens, 1) if self._request_bucket else None,
+            "tpm_tokens_available": round(self._token_bucket.tokens, 1) if self._token_bucket else None,
+        }
+
+
+# Singleton instance
+_llm_governor: Optional[LLMGovernor] = None
+
+
+def get_llm_governor() -> LLMGovernor:
+    """
+    Get the process-wide LLM governor (singleton pattern).
+
+    Returns:
+        LLMGovernor: Configured from LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE
+                     and LLM_MAX_IN_FLIGHT.
+    """
+    global _llm_governor
+    if _llm_governor is None:
+        _llm_governor = LLMGovernor(
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+            max_in_flight=settings.LLM_MAX_IN_FLIGHT,
+        )
+    return _llm_governor
@@ -0,0 +1,352 @@
+# app/core/response_index.py
+"""
+Searchable Response Archive Index
+
+A local SQLite database (with an FTS5 full-text index) over archived
+WorkflowResponses, filled by the ResponseSaver's background writer as it
+archives each batch, or rebuilt from the JSONL segments with ``rebuild``.
+
+- Lookup by session_id, workflow and time range, plus full-text search over the
+  query and final answer (BM25 ranked, with snippets)
+- Repeat detection for "serve from archive": an exact match on the normalized
+  query, else the FTS candidates sharing its words are compared by character
+  similarity (difflib) against ARCHIVE_SERVE_MIN_SIMILARITY
+
+The index is a cache of the archive: deleting the file loses nothing that
+``python -m app.core.response_index rebuild`` cannot restore.
+
+Usage:
+    from app.core.response_index import get_response_index
+
+    index = get_response_index()
+    hits = index.search("rate limiting", workflow="routing", limit=10)
+    repeat = index.find_repeat(query, min_similarity=0.95, max_age_seconds=86400)
+"""
+
+import argparse
+import difflib
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import settings
+from app.models.schemas import WorkflowResponse
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    session_id TEXT NOT NULL,
+    workflow TEXT,
+    saved_at TEXT NOT NULL,
+    user_id TEXT,
+    query TEXT,
+    query_hash TEXT,
+    final_response TEXT,
+    response_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_session ON responses (session_id);
+CREATE INDEX IF NOT EXISTS responses_workflow_time ON responses (workflow, saved_at);
+CREATE INDEX IF NOT EXISTS responses_time ON responses (saved_at);
+CREATE INDEX IF NOT EXISTS responses_query_hash ON responses (query_hash, saved_at);
+CREATE VIRTUAL TABLE IF NOT EXISTS responses_fts USING fts5 (
+    query, final_response, content='responses', content_rowid='id'
+);
+"""
+
+
+# Answers that may be served again: complete, not degraded by admission control
+# (e.g. a direct_answer given under load) and without an error
+_SERVABLE = (
+    "r.final_response IS NOT NULL "
+    "AND json_extract(r.response_json, '$.degraded') IS NULL "
+    "AND json_extract(r.response_json, '$.error') IS NULL"
+)
+
+
+def normalize_query(query: str) -> str:
+    """Lowercased words joined by single spaces (punctuation and spacing ignored)."""
+    return " ".join(_WORD_RE.findall(query.lower()))
+
+
+def _query_hash(query: Optional[str]) -> Optional[str]:
+    if not query:
+        return None
+    return hashlib.sha256(normalize_query(query).encode("utf-8")).hexdigest()
+
+
+def _fts_terms(text: str, operator: str) -> str:
+    """Quote each word so user text cannot inject FTS5 query syntax."""
+    return f" {operator} ".join(f'"{word}"' for word in _WORD_RE.findall(text))
+
+
+class ResponseIndex:
+    """
+    SQLite/FTS5 index of archived responses. Safe to share between threads.
+
+    Args:
+        path: Database file (":memory:" for a throwaway index)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def add_many(self, records: Iterable[Dict[str, Any]]) -> int:
+        """
+        Index archive records ({"saved_at", "query", "user_id", "response"}).
+
+        Returns:
+            Number of records indexed
+        """
+        rows = []
+        for record in records:
+            response = record["response"]
+            rows.append((
+                response["session_id"],
+                (response.get("workflow_info") or {}).get("selected_workflow"),
+                record["saved_at"],
+                record.get("user_id"),
+                record.get("query"),
+                _query_hash(record.get("query")),
+                response.get("final_response"),
+                json.dumps(response, ensure_ascii=False),
+            ))
+        if not rows:
+            return 0
+        with self._lock, self._conn:
+            for row in rows:
+                cursor = self._conn.execute(
+                    "INSERT INTO responses (session_id, workflow, saved_at, user_id, query, query_hash, final_response, response_json) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+                self._conn.execute(
+                    "INSERT INTO responses_fts (rowid, query, final_response) VALUES (?, ?, ?)",
+                    (cursor.lastrowid, row[4] or "", row[6] or ""),
+                )
+        return len(rows)
+
+    def search(
+        self,
+        text: Optional[str] = None,
+        workflow: Optional[str] = None,
+        session_id: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        limit: int = 20,
+    ) -> List[Dict[str, Any]]:
+        """
+        Find archived responses, best full-text match first (newest first without ``text``).
+
+        Args:
+            text: Words that must all appear in the query or final answer
+            workflow: Selected workflow
+            session_id: Session of the response
+            since / until: ISO timestamps bounding saved_at
+            limit: Maximum hits
+
+        Returns:
+            list: {"id", "session_id", "workflow", "saved_at", "query", "snippet", "score"} per hit
+        """
+        where, params = [], []
+        for clause, value in (
+            ("r.workflow = ?", workflow),
+            ("r.session_id = ?", session_id),
+            ("r.saved_at >= ?", since),
+            ("r.saved_at <= ?", until),
+        ):
+            if value:
+                where.append(clause)
+                params.append(value)
+
+        terms = _fts_terms(text, "AND") if text else ""
+        if terms:
+            sql = (
+                "SELECT r.id, r.session_id, r.workflow, r.saved_at, r.query, "
+                "snippet(responses_fts, 1, '[', ']', '...', 16) AS snippet, bm25(responses_fts) AS score "
+                "FROM responses_fts JOIN responses r ON r.id = responses_fts.rowid "
+                "WHERE responses_fts MATCH ?" + "".join(f" AND {clause}" for clause in where) +
+                " ORDER BY score LIMIT ?"
+            )
+            params = [terms] + params
+        else:
+            sql = (
+                "SELECT r.id, r.session_id, r.workflow, r.saved_at, r.query, "
+                "substr(r.final_response, 1, 200) AS snippet, NULL AS score FROM responses r" +
+                (" WHERE " + " AND ".join(where) if where else "") +
+                " ORDER BY r.saved_at DESC LIMIT ?"
+            )
+        with self._lock:
+            rows = self._conn.execute(sql, params + [max(1, limit)]).fetchall()
+        return [
+            {**dict(row), "score": round(-row["score"], 4) if row["score"] is not None else None}
+            for row in rows
+        ]
+
+    def get(self, entry_id: int) -> Optional[Dict[str, Any]]:
+        """The archived record with its full WorkflowResponse, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, saved_at, user_id, query, response_json FROM responses WHERE id = ?", (entry_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "id": row["id"],
+            "saved_at": row["saved_at"],
+            "user_id": row["user_id"],
+            "query": row["query"],
+            "response": json.loads(row["response_json"]),
+        }
+
+    def find_repeat(
+        self,
+        query: str,
+        min_similarity: float = 0.95,
+        max_age_seconds: Optional[float] = None,
+        candidates: int = 20,
+    ) -> Optional[Tuple[WorkflowResponse, float, str]]:
+        """
+        Find the newest archived answer to the same (or a near-identical) query.
+
+        Degraded answers and responses with an error are never returned.
+
+        Args:
+            query: The incoming query
+            min_similarity: Minimum character similarity of normalized queries (1.0 = exact only)
+            max_age_seconds: Ignore answers older than this
+            candidates: Full-text candidates compared for near matches
+
+        Returns:
+            (WorkflowResponse, similarity, saved_at) or None
+        """
+        normalized = normalize_query(query)
+        if not normalized:
+            return None
+        since = (
+            (datetime.now(timezone.utc) - timedelta(seconds=max_age_seconds)).isoformat()
+            if max_age_seconds else ""
+        )
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT r.response_json, r.saved_at FROM responses r "
+                f"WHERE r.query_hash = ? AND r.saved_at >= ? AND {_SERVABLE} "
+                "ORDER BY r.saved_at DESC LIMIT 1",
+                (_query_hash(query), since),
+            ).fetchone()
+            if row is None and min_similarity < 1.0:
+                rows = self._conn.execute(
+                    "SELECT r.query, r.response_json, r.saved_at FROM responses_fts "
+                    "JOIN responses r ON r.id = responses_fts.rowid "
+                    f"WHERE responses_fts MATCH ? AND r.saved_at >= ? AND {_SERVABLE} "
+                    "ORDER BY bm25(responses_fts) LIMIT ?",
+                    (f"query : ({_fts_terms(query, 'OR')})", since, candidates),
+                ).fetchall()
+            else:
+                rows = []
+
+        if row is not None:
+            return WorkflowResponse.model_validate_json(row["response_json"]), 1.0, row["saved_at"]
+
+        best = None
+        for candidate in rows:
+            similarity = difflib.SequenceMatcher(None, normalized, normalize_query(candidate["query"] or "")).ratio()
+            if similarity >= min_similarity and (best is None or (similarity, candidate["saved_at"]) > best[:2]):
+                best = (similarity, candidate["saved_at"], candidate["response_json"])
+        if best is None:
+            return None
+        return WorkflowResponse.model_validate_json(best[2]), round(best[0], 4), best[1]
+
+    def rebuild(self, base_dir: str) -> int:
+        """Drop the index and re-index every JSONL segment under ``base_dir``."""
+        from app.utils.response_saver import iter_archive
+
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.execute("INSERT INTO responses_fts (responses_fts) VALUES ('delete-all')")
+        count = 0
+        batch: List[Dict[str, Any]] = []
+        for record in iter_archive(base_dir):
+            batch.append(record)
+            if len(batch) >= 500:
+                count += self.add_many(batch)
+                batch = []
+        return count + self.add_many(batch)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Indexed responses, per-workflow counts and the saved_at range."""
+        with self._lock:
+            total, first, last = self._conn.execute(
+                "SELECT COUNT(*), MIN(saved_at), MAX(saved_at) FROM responses"
+            ).fetchone()
+            by_workflow = dict(self._conn.execute(
+                "SELECT COALESCE(workflow, 'unknown'), COUNT(*) FROM responses GROUP BY workflow"
+            ).fetchall())
+        return {"path": self.path, "responses": total, "first_saved_at": first, "last_saved_at": last, "by_workflow": by_workflow}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+# Singleton instance
+_response_index: Optional[ResponseIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_response_index() -> ResponseIndex:
+    """
+    Get the process-wide response archive index (singleton pattern).
+
+    Returns:
+        ResponseIndex: At ARCHIVE_INDEX_PATH (default: index.sqlite3 in RESPONSES_DIR).
+    """
+    global _response_index
+    if _response_index is None:
+        with _index_lock:
+            if _response_index is None:
+                path = settings.ARCHIVE_INDEX_PATH or os.path.join(settings.RESPONSES_DIR, "index.sqlite3")
+                _response_index = ResponseIndex(path)
+    return _response_index
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Maintain and query the response archive index.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rebuild = sub.add_parser("rebuild", help="Re-index every archived JSONL segment")
+    rebuild.add_argument("--dir", default=settings.RESPONSES_DIR, help="Archive directory (default: RESPONSES_DIR)")
+    search = sub.add_parser("search", help="Full-text search of archived queries and answers")
+    search.add_argument("text")
+    search.add_argument("--workflow")
+    search.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    index = get_response_index()
+    if args.command == "rebuild":
+        print(f"Indexed {index.rebuild(args.dir)} responses into {index.path}")
+    else:
+        for hit in index.search(args.text, workflow=args.workflow, limit=args.limit):
+            print(json.dumps(hit, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
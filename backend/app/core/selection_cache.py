@@ -0,0 +1,299 @@
+# app/core/selection_cache.py
+"""
+Semantic Cache for Workflow Selection
+
+Near-duplicate queries ("summarize X then translate", "summarize Y then
+translate") lead the LLM selector to the same WorkflowDecision. This cache keeps
+the decisions of recent queries next to a normalized embedding of each query and
+reuses a decision when a new query's cosine similarity to a cached one reaches
+SELECTOR_CACHE_THRESHOLD.
+
+- Index: a NumPy matrix of L2-normalized query vectors, searched brute force
+  (one matrix-vector product; a few thousand entries take microseconds)
+- Bounded: at most SELECTOR_CACHE_MAX_ENTRIES; the least recently used entry
+  is evicted (hits refresh recency)
+- Persistent: saved to SELECTOR_CACHE_PATH (.npz) every few inserts and on
+  shutdown, and loaded on first use
+
+Embedders (SELECTOR_CACHE_EMBEDDER):
+    hashing  Local, free: hashed word uni/bigrams and character trigrams
+             (catches rewordings and templated variants, not synonyms)
+    gemini   Gemini embedding model (SELECTOR_CACHE_EMBEDDING_MODEL); one cheap
+             API call per lookup, catches paraphrases
+
+Usage:
+    from app.core.selection_cache import get_selection_cache
+
+    cache = get_selection_cache()
+    hit = await cache.lookup(query)        # (WorkflowDecision, similarity) or None
+    await cache.add(query, decision)
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+from collections import Counter
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from google.genai import types
+
+from app.config import settings
+from app.core.gemini_transport import get_genai_client
+from app.core.rate_limiter import get_llm_governor, estimate_tokens
+
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+# ============================================================================
+# Embedders
+# ============================================================================
+
+def _stable_hash(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def hashing_embedding(text: str, dimensions: int) -> np.ndarray:
+    """
+    Feature-hashed bag of word unigrams/bigrams and character trigrams,
+    log-scaled term counts with signed buckets, L2-normalized.
+    """
+    words = _WORD_RE.findall(text.lower())
+    joined = " ".join(words)
+    features = Counter(words)
+    features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    features.update(f"#{joined[i:i + 3]}" for i in range(len(joined) - 2))
+
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature, count in features.items():
+        digest = _stable_hash(feature)
+        sign = 1.0 if digest & 1 else -1.0
+        vector[(digest >> 1) % dimensions] += sign * (1.0 + math.log(count))
+    return _normalize(vector)
+
+
+async def gemini_embedding(text: str, dimensions: int) -> np.ndarray:
+    """Embed with the Gemini embedding model through the shared client and LLM governor."""
+    async with get_llm_governor().slot(estimated_tokens=estimate_tokens(text)):
+        result = await get_genai_client().aio.models.embed_content(
+            model=settings.SELECTOR_CACHE_EMBEDDING_MODEL,
+            contents=text,
+            config=types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY", output_dimensionality=dimensions),
+        )
+    return _normalize(np.asarray(result.embeddings[0].values, dtype=np.float32))
+
+
+def _normalize(vector: np.ndarray) -> np.ndarray:
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm > 0 else vector
+
+
+# ============================================================================
+# Cache
+# ============================================================================
+
+@dataclass
+class SelectionCacheStats:
+    """Counters for the semantic selection cache."""
+    lookups: int = 0
+    hits: int = 0
+    inserts: int = 0
+    evictions: int = 0
+    embed_errors: int = 0
+
+
+class SemanticDecisionCache:
+    """
+    Bounded nearest-neighbour cache of WorkflowDecisions keyed by query embedding.
+
+    Args:
+        max_entries: Capacity; the least recently used entry is evicted when full
+        threshold: Minimum cosine similarity for a hit
+        embedder: "hashing" or "gemini"
+        dimensions: Embedding size
+        path: .npz file for persistence (None keeps the cache in memory only)
+        save_every: Persist after this many inserts
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 2048,
+        threshold: float = 0.9,
+        embedder: str = "hashing",
+        dimensions: int = 512,
+        path: Optional[str] = None,
+        save_every: int = 20,
+    ):
+        if embedder not in ("hashing", "gemini"):
+            raise ValueError(f"Unknown selection cache embedder '{embedder}' (expected 'hashing' or 'gemini')")
+        self.max_entries = max(1, max_entries)
+        self.threshold = threshold
+        self.embedder = embedder
+        self.dimensions = dimensions
+        self.path = path
+        self.save_every = max(1, save_every)
+        self.stats = SelectionCacheStats()
+
+        self._vectors = np.zeros((self.max_entries, dimensions), dtype=np.float32)
+        self._last_used = np.zeros(self.max_entries, dtype=np.int64)
+        self._queries: List[Optional[str]] = [None] * self.max_entries
+        self._decisions: List[Optional[Dict[str, Any]]] = [None] * self.max_entries
+        self._size = 0
+        self._clock = 0
+        self._unsaved = 0
+
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    async def _embed(self, text: str) -> Optional[np.ndarray]:
+        try:
+            if self.embedder == "gemini":
+                return await gemini_embedding(text, self.dimensions)
+            return hashing_embedding(text, self.dimensions)
+        except Exception as e:
+            self.stats.embed_errors += 1
+            logging.warning(f"Selection cache embedding failed: {e}")
+            return None
+
+    async def lookup(self, query: str) -> Optional[Tuple[Any, float]]:
+        """
+        Find the cached decision of the most similar query.
+
+        Returns:
+            (WorkflowDecision, similarity) if the best match reaches the threshold, else None
+        """
+        from app.core.workflow_selector import WorkflowDecision
+
+        self.stats.lookups += 1
+        if self._size == 0:
+            return None
+        vector = await self._embed(query)
+        if vector is None:
+            return None
+
+        similarities = self._vectors[:self._size] @ vector
+        best = int(np.argmax(similarities))
+        similarity = float(similarities[best])
+        if similarity < self.threshold:
+            return None
+
+        self._last_used[best] = self._tick()
+        self.stats.hits += 1
+        return WorkflowDecision.model_validate(self._decisions[best]), similarity
+
+    async def add(self, query: str, decision: Any) -> None:
+        """Cache the decision for a query, evicting the least recently used entry when full."""
+        vector = await self._embed(query)
+        if vector is None:
+            return
+
+        if self._size < self.max_entries:
+            slot = self._size
+            self._size += 1
+        else:
+            slot = int(np.argmin(self._last_used[:self._size]))
+            self.stats.evictions += 1
+
+        self._vectors[slot] = vector
+        self._last_used[slot] = self._tick()
+        self._queries[slot] = query
+        self._decisions[slot] = decision.model_dump(mode="json")
+        self.stats.inserts += 1
+
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def save(self) -> None:
+        """Persist the cache to ``path`` (atomic replace)."""
+        if not self.path or self._unsaved == 0:
+            return
+        order = np.argsort(self._last_used[:self._size])  # Oldest first, so a smaller reload keeps the newest
+        metadata = {
+            "embedder": self.embedder,
+            "dimensions": self.dimensions,
+            "queries": [self._queries[i] for i in order],
+            "decisions": [self._decisions[i] for i in order],
+        }
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp_path = f"{self.path}.tmp.npz"
+            np.savez(tmp_path, vectors=self._vectors[:self._size][order], metadata=np.array(json.dumps(metadata)))
+            os.replace(tmp_path, self.path)
+            self._unsaved = 0
+        except OSError as e:
+            logging.warning(f"Could not save selection cache to {self.path}: {e}")
+
+    def _load(self) -> None:
+        if not os.path.exists(self.path):
+            return
+        try:
+            with np.load(self.path) as data:
+                vectors = data["vectors"]
+                metadata = json.loads(str(data["metadata"]))
+        except Exception as e:
+            logging.warning(f"Could not load selection cache {self.path}: {e}")
+            return
+        if metadata.get("embedder") != self.embedder or metadata.get("dimensions") != self.dimensions:
+            logging.info("Selection cache on disk was built with a different embedder; starting empty")
+            return
+
+        keep = min(len(vectors), self.max_entries)
+        start = len(vectors) - keep
+        self._vectors[:keep] = vectors[start:]
+        self._queries[:keep] = metadata["queries"][start:]
+        self._decisions[:keep] = metadata["decisions"][start:]
+        self._last_used[:keep] = np.arange(1, keep + 1)
+        self._size = keep
+        self._clock = keep
+        logging.info(f"Loaded {keep} cached workflow selections from {self.path}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        stats = asdict(self.stats)
+        stats["hit_rate"] = round(self.stats.hits / self.stats.lookups, 4) if self.stats.lookups else None
+        stats["size"] = self._size
+        stats["max_entries"] = self.max_entries
+        stats["threshold"] = self.threshold
+        stats["embedder"] = self.embedder
+        return stats
+
+
+# Singleton instance
+_selection_cache: Optional[SemanticDecisionCache] = None
+
+
+def get_selection_cache() -> SemanticDecisionCache:
+    """
+    Get the process-wide semantic selection cache (singleton pattern).
+
+    Returns:
+        SemanticDecisionCache: Configured from the SELECTOR_CACHE_* settings.
+    """
+    global _selection_cache
+    if _selection_cache is None:
+        _selection_cache = SemanticDecisionCache(
+            max_entries=settings.SELECTOR_CACHE_MAX_ENTRIES,
+            threshold=settings.SELECTOR_CACHE_THRESHOLD,
+            embedder=settings.SELECTOR_CACHE_EMBEDDER,
+            dimensions=settings.SELECTOR_CACHE_DIMENSIONS,
+            path=settings.SELECTOR_CACHE_PATH or None,
+        )
+    return _selection_cache
+
+
+def save_selection_cache() -> None:
+    """Persist the selection cache if it was used (called on application shutdown)."""
+    if _selection_cache is not None:
+        _selection_cache.save()
@@ -0,0 +1,133 @@
+# app/core/single_flight.py
+"""
+Single-Flight Request Coalescing
+
+When several concurrent callers issue an identical LLM request (for example the
+same query hitting /api/workflows/process twice), only the first caller (the
+leader) sends it; the others await the leader's in-flight result.
+
+Cancellation semantics:
+- The underlying request runs in its own task, shielded from any single caller,
+  in a copy of the leader's context without the leader's request deadline.
+- Each caller bounds its own wait by its own deadline (DeadlineExceeded); a
+  caller that times out or is cancelled (e.g. its HTTP client disconnected)
+  simply stops waiting, and the request keeps running for the remaining waiters.
+- When the last waiter goes away, the underlying request is cancelled so no
+  quota is spent on a result nobody will read.
+
+Usage:
+    from app.core.single_flight import get_single_flight
+
+    result = await get_single_flight().do(key, lambda: client.call(...))
+"""
+
+import asyncio
+import contextvars
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from app.core.deadlines import DeadlineExceeded, detach_deadline, remaining_time
+
+
+@dataclass
+class SingleFlightStats:
+    """Counters for coalesced LLM requests."""
+    leaders: int = 0
+    coalesced: int = 0
+    cancelled: int = 0
+
+
+class _Flight:
+    """An in-flight request and the number of callers waiting on it."""
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share the same key."""
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = SingleFlightStats()
+
+    async def do(self, key: str, call: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``call`` once per key among concurrent callers.
+
+        Args:
+            key: Identity of the request (e.g. the response cache key).
+            call: Zero-argument coroutine factory performing the request.
+
+        Returns:
+            The shared result. Callers must treat it as read-only or copy it.
+
+        Raises:
+            Whatever ``call`` raised, to every waiter; DeadlineExceeded to a
+            caller whose own deadline passed first; asyncio.CancelledError only
+            to callers that were themselves cancelled.
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            context = contextvars.copy_context()
+            context.run(detach_deadline)
+            flight = _Flight(asyncio.get_running_loop().create_task(call(), context=context))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _task, key=key, flight=flight: self._forget(key, flight))
+            self.stats.leaders += 1
+        else:
+            self.stats.coalesced += 1
+            logging.debug(f"Coalescing identical in-flight LLM request ({key[:12]})")
+
+        flight.waiters += 1
+        try:
+            remaining = remaining_time()
+            if remaining is None:
+                return await asyncio.shield(flight.task)
+            try:
+                return await asyncio.wait_for(asyncio.shield(flight.task), timeout=remaining)
+            except asyncio.TimeoutError:
+                if flight.task.done():
+                    raise  # The request itself timed out
+                raise DeadlineExceeded("LLM request deadline exceeded") from None
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to read the result: stop spending quota on it
+                self._forget(key, flight)
+                flight.task.cancel()
+                self.stats.cancelled += 1
+
+    def _forget(self, key: str, flight: _Flight) -> None:
+        """Remove a finished or abandoned flight so new callers start fresh."""
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return leader/coalesced/cancelled counters and current in-flight count."""
+        stats = asdict(self.stats)
+        stats["in_flight"] = self.in_flight
+        return stats
+
+
+# Singleton instance
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the process-wide single-flight coordinator (singleton pattern).
+
+    Returns:
+        SingleFlight: Shared by both Gemini client singletons.
+    """
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
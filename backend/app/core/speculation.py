@@ -0,0 +1,249 @@
+# app/core/speculation.py
+"""
+Speculative Workflow Execution
+
+Workflow selection and execution are serial: the selector's LLM call (often a
+second or more) delays every workflow call. In speculative mode the runner
+predicts the workflow locally and starts it concurrently with
+``select_workflow``:
+
+- Prediction: the last selection of the same session (``session_id``), else the
+  local pre-classifier when its confidence reaches SPECULATIVE_MIN_CONFIDENCE.
+  Nothing is speculated when the classifier is confident enough to bypass the
+  LLM selector, since selection is then already local.
+- Hit (the selector picks the predicted workflow): the speculative run is
+  adopted; its buffered stream events are replayed and it continues live.
+- Miss: the run is cancelled at once and the selected workflow starts normally.
+  Calls it completed count as wasted (they stay in the request's usage).
+
+An adopted run keeps the complexity estimated at prediction time (which only
+affects fan-out limits); ``workflow_info`` is always the selector's decision.
+
+Usage:
+    from app.core.speculation import start_speculation
+
+    speculation = start_speculation(query, session_id)
+    selection = await select_workflow(query)
+    result = await speculation.resolve(selection) if speculation else None
+    if result is None:
+        result = await get_workflow_handler(selection.selected_workflow)(selection, query)
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.streaming import event_sink, current_event_sink, is_streaming
+from app.core.usage import UsageTracker, usage_scope, set_workflow, current_tracker
+from app.core.workflow_classifier import classify_query
+from app.core.workflow_registry import get_workflow_handler, get_workflow_registry
+from app.core.workflow_selector import predicted_selection
+from app.models.schemas import WorkflowSelection
+
+
+# ============================================================================
+# Detached workflow runs
+# ============================================================================
+
+class _BufferedSink:
+    """Holds a run's stream events until it is adopted, then forwards them live."""
+
+    def __init__(self):
+        self._events: List[Tuple[str, Any]] = []
+        self._target: Optional[Callable[[str, Any], None]] = None
+
+    def __call__(self, event: str, payload: Any) -> None:
+        if self._target is None:
+            self._events.append((event, payload))
+        else:
+            self._target(event, payload)
+
+    def release(self, target: Callable[[str, Any], None]) -> None:
+        for event, payload in self._events:
+            target(event, payload)
+        self._events.clear()
+        self._target = target
+
+
+class WorkflowRun:
+    """
+    A workflow executing in its own task, isolated from the request until adopted.
+
+    Its LLM calls are tracked in a separate usage tracker and, while the request
+    is streaming, its events are buffered; both are handed to the request on
+    ``adopt()`` and its usage also on ``cancel()``.
+    """
+
+    def __init__(self, selection: WorkflowSelection, user_query: str):
+        self.selection = selection
+        self.started_at = time.monotonic()
+        self.tracker: Optional[UsageTracker] = None
+        self._sink = _BufferedSink() if is_streaming() else None
+        self._merged = False
+        self.task = asyncio.create_task(self._run(user_query))
+
+    async def _run(self, user_query: str) -> Tuple[str, List[Any]]:
+        execute = get_workflow_handler(self.selection.selected_workflow)
+        with usage_scope() as tracker, (event_sink(self._sink) if self._sink is not None else nullcontext()):
+            self.tracker = tracker
+            set_workflow(self.selection.selected_workflow)
+            return await execute(self.selection, user_query)
+
+    def _merge_usage(self) -> None:
+        parent = current_tracker()
+        if self._merged or parent is None or self.tracker is None:
+            return
+        parent.records.extend(self.tracker.records)
+        parent.cache_hits += self.tracker.cache_hits
+        self._merged = True
+
+    async def adopt(self) -> Tuple[str, List[Any]]:
+        """Make this the request's run: replay its events, wait for it and merge its usage."""
+        target = current_event_sink()
+        if self._sink is not None and target is not None:
+            self._sink.release(target)
+        try:
+            return await self.task
+        finally:
+            self._merge_usage()
+
+    async def cancel(self) -> List[Any]:
+        """
+        Cancel the run and merge the usage of the calls it completed.
+
+        Returns:
+            The LLMCallRecords of the calls it completed (wasted work)
+        """
+        self.task.cancel()
+        await asyncio.wait([self.task])
+        if not self.task.cancelled() and self.task.exception() is not None:
+            logging.debug(f"Cancelled workflow run had failed: {self.task.exception()}")
+        self._merge_usage()
+        return list(self.tracker.records) if self.tracker is not None else []
+
+
+# ============================================================================
+# Speculation
+# ============================================================================
+
+@dataclass
+class SpeculationStats:
+    """Counters for speculative execution."""
+    attempts: int = 0
+    skipped: int = 0  # No prediction (or the selector would decide locally anyway)
+    hits: int = 0
+    misses: int = 0
+    wasted_calls: int = 0
+    wasted_tokens: int = 0
+    overlap_seconds: float = 0.0  # Selection time hidden behind speculative work (hits)
+
+
+_stats = SpeculationStats()
+
+# session_id -> (workflow, confidence) of its last selection, least recently used first
+_session_selections: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+
+def remember_selection(session_id: Optional[str], selection: WorkflowSelection) -> None:
+    """Remember a session's selection as the prediction for its next query."""
+    if not session_id or settings.SPECULATIVE_SESSION_MEMORY <= 0:
+        return
+    _session_selections[session_id] = (selection.selected_workflow, selection.confidence or 0.0)
+    _session_selections.move_to_end(session_id)
+    while len(_session_selections) > settings.SPECULATIVE_SESSION_MEMORY:
+        _session_selections.popitem(last=False)
+
+
+def predict_workflow(user_query: str, session_id: Optional[str] = None) -> Optional[WorkflowSelection]:
+    """
+    Predict the selector's choice without calling the LLM.
+
+    Returns:
+        The WorkflowSelection to speculate on, or None
+    """
+    prediction = classify_query(user_query) if settings.SELECTOR_CLASSIFIER_ENABLED else None
+    if prediction is not None and prediction.confidence >= settings.SELECTOR_CLASSIFIER_THRESHOLD:
+        return None
+
+    previous = _session_selections.get(session_id) if session_id else None
+    if previous is not None:
+        workflow, confidence = previous
+        return predicted_selection(workflow, user_query, confidence, "Speculated from this session's previous selection.")
+    if prediction is not None and prediction.confidence >= settings.SPECULATIVE_MIN_CONFIDENCE:
+        return predicted_selection(
+            prediction.workflow, user_query, prediction.confidence,
+            f"Speculated from the local classifier (confidence {prediction.confidence:.2f})."
+        )
+    return None
+
+
+class Speculation:
+    """A speculative run of the predicted workflow, resolved against the selector's choice."""
+
+    def __init__(self, selection: WorkflowSelection, user_query: str):
+        self.run = WorkflowRun(selection, user_query)
+
+    @property
+    def workflow(self) -> str:
+        return self.run.selection.selected_workflow
+
+    async def resolve(self, selection: WorkflowSelection) -> Optional[Tuple[str, List[Any]]]:
+        """
+        Adopt the run if the selector agreed, else cancel it.
+
+        Returns:
+            (final_response, steps) of the adopted run, or None on a miss
+        """
+        if selection.selected_workflow == self.workflow:
+            _stats.hits += 1
+            _stats.overlap_seconds += time.monotonic() - self.run.started_at
+            logging.info(f"Speculative {self.workflow} run adopted")
+            return await self.run.adopt()
+
+        _stats.misses += 1
+        wasted = await self.run.cancel()
+        _stats.wasted_calls += len(wasted)
+        _stats.wasted_tokens += sum(record.total_tokens for record in wasted)
+        logging.info(
+            f"Speculative {self.workflow} run cancelled (selected {selection.selected_workflow}; "
+            f"{len(wasted)} calls wasted)"
+        )
+        return None
+
+    async def cancel(self) -> None:
+        """Abandon the speculation (e.g. selection itself failed)."""
+        _stats.misses += 1
+        wasted = await self.run.cancel()
+        _stats.wasted_calls += len(wasted)
+        _stats.wasted_tokens += sum(record.total_tokens for record in wasted)
+
+
+def start_speculation(user_query: str, session_id: Optional[str] = None) -> Optional[Speculation]:
+    """Start the predicted workflow for a query, or return None if there is nothing to predict."""
+    selection = predict_workflow(user_query, session_id)
+    if selection is None or not get_workflow_registry().is_registered(selection.selected_workflow):
+        _stats.skipped += 1
+        return None
+    _stats.attempts += 1
+    return Speculation(selection, user_query)
+
+
+def get_speculation_stats() -> Dict[str, Any]:
+    """
+    Return speculative execution metrics.
+
+    Returns:
+        dict: Attempts, skips, hits/misses and hit rate, wasted calls/tokens on
+              misses, and the selection time overlapped on hits
+    """
+    stats = asdict(_stats)
+    resolved = _stats.hits + _stats.misses
+    stats["hit_rate"] = round(_stats.hits / resolved, 4) if resolved else None
+    stats["overlap_seconds"] = round(_stats.overlap_seconds, 3)
+    stats["enabled"] = settings.SPECULATIVE_EXECUTION_ENABLED
+    return stats
@@ -0,0 +1,111 @@
+# app/core/streaming.py
+"""
+Workflow Event Streaming
+
+Lets a workflow run publish progress while it executes, without changing the
+workflow function signatures. A streaming endpoint installs an event sink (a
+context variable, so it flows into asyncio.gather fan-outs); with no sink
+installed every hook below is a no-op and workflows behave exactly as before.
+
+Events:
+    selection    The WorkflowSelection, as soon as the selector returns (again if a
+                 raced alternative workflow wins)
+    step         Each AgentResponse, when it is recorded
+    final_start  A final-output LLM call is starting ({"stream": n, "role": ...})
+    token        A chunk of final-output text ({"stream": n, "text": ...})
+
+Workflows opt in by recording steps in ``step_list()`` instead of a plain list
+and by wrapping their final-answer LLM call in ``final_output(role)``. A final
+call may stream more than once (e.g. a synthesis retry); clients should show
+the text of the latest ``stream`` id. The ``final`` response sent by the
+endpoint remains authoritative.
+
+Usage:
+    from app.core.streaming import step_list, final_output
+
+    intermediate_steps = step_list()
+    with final_output("Results Integrator"):
+        answer = await llm_client.generate(prompt)
+"""
+
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+EventSink = Callable[[str, Any], None]
+
+_event_sink: ContextVar[Optional[EventSink]] = ContextVar("workflow_event_sink", default=None)
+_token_sink: ContextVar[Optional[Callable[[str], None]]] = ContextVar("final_token_sink", default=None)
+_stream_ids = itertools.count(1)
+
+
+@contextmanager
+def event_sink(sink: EventSink) -> Iterator[None]:
+    """Deliver workflow events raised in the enclosed block to ``sink(event, payload)``."""
+    token = _event_sink.set(sink)
+    try:
+        yield
+    finally:
+        _event_sink.reset(token)
+
+
+def emit(event: str, payload: Any) -> None:
+    """Publish an event to the current sink, if any."""
+    sink = _event_sink.get()
+    if sink is not None:
+        sink(event, payload)
+
+
+def current_event_sink() -> Optional[EventSink]:
+    """Return the event sink of the current context, if any."""
+    return _event_sink.get()
+
+
+def is_streaming() -> bool:
+    """True if an event sink is installed for the current context."""
+    return _event_sink.get() is not None
+
+
+class StepList(list):
+    """A list of AgentResponse steps that publishes each step as it is added."""
+
+    def append(self, step: Any) -> None:
+        super().append(step)
+        emit("step", step)
+
+    def extend(self, steps: Iterable[Any]) -> None:
+        for step in steps:
+            self.append(step)
+
+
+def step_list() -> list:
+    """Create the intermediate-steps list for a workflow run."""
+    return StepList()
+
+
+@contextmanager
+def final_output(role: Optional[str] = None) -> Iterator[None]:
+    """
+    Mark the enclosed LLM generation as (a candidate for) the final answer.
+
+    While streaming, GoogleGeminiClient.generate streams this call from the
+    API and forwards each text chunk as a ``token`` event.
+    """
+    sink = _event_sink.get()
+    if sink is None:
+        yield
+        return
+
+    stream = next(_stream_ids)
+    sink("final_start", {"stream": stream, "role": role})
+    token = _token_sink.set(lambda text: sink("token", {"stream": stream, "text": text}))
+    try:
+        yield
+    finally:
+        _token_sink.reset(token)
+
+
+def current_token_sink() -> Optional[Callable[[str], None]]:
+    """Return the callback receiving final-output text chunks, if the current call should stream."""
+    return _token_sink.get()
@@ -0,0 +1,289 @@
+# app/core/usage.py
+"""
+LLM Usage and Latency Accounting
+
+Every Gemini call records its token usage (from ``response.usage_metadata``)
+and wall time, labelled with the workflow, phase and persona role that issued
+it. Labels and the per-request tracker live in context variables, so they flow
+into asyncio.gather fan-outs without threading parameters through the clients.
+
+Records are aggregated two ways:
+
+1. Per request: ``usage_scope()`` collects the calls of one API request and
+   summarizes them per phase and per persona role (the ``usage`` block on
+   WorkflowResponse).
+2. Per process: a rollup of all calls since startup, keyed by workflow/phase and
+   role, for scraping (``get_usage_rollup()``).
+
+Usage:
+    from app.core.usage import usage_scope, llm_phase
+
+    with usage_scope() as tracker:
+        with llm_phase("planning", role="Task Coordinator"):
+            plan = await functions_client.generate_structured(...)
+    summary = tracker.summary()
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from app.core.metrics import (
+    LLM_CALL_SECONDS, LLM_CALLS, LLM_CANCELLED_CALLS, LLM_TOKENS, LLM_TOKENS_SAVED, PHASE_SECONDS,
+)
+from app.models.schemas import UsageSummary, UsageTotals
+
+
+@dataclass
+class LLMCallRecord:
+    """Usage of one Gemini API call (retries and governor wait included in wall time)."""
+    kind: str
+    model: str
+    workflow: Optional[str]
+    phase: Optional[str]
+    role: Optional[str]
+    started_at: float
+    wall_seconds: float
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    thinking_tokens: int = 0
+    cached_tokens: int = 0
+    total_tokens: int = 0
+
+
+def _add(totals: UsageTotals, record: LLMCallRecord) -> None:
+    totals.calls += 1
+    totals.prompt_tokens += record.prompt_tokens
+    totals.output_tokens += record.output_tokens
+    totals.thinking_tokens += record.thinking_tokens
+    totals.cached_tokens += record.cached_tokens
+    totals.total_tokens += record.total_tokens
+    totals.llm_seconds = round(totals.llm_seconds + record.wall_seconds, 3)
+
+
+class UsageTracker:
+    """Collects the LLM call records of a single request."""
+
+    def __init__(self):
+        self.started_at = time.monotonic()
+        self.workflow: Optional[str] = None
+        self.records: List[LLMCallRecord] = []
+        self.cache_hits = 0
+
+    def summary(self) -> UsageSummary:
+        """Aggregate the recorded calls into totals, per-phase and per-role usage."""
+        summary = UsageSummary(cache_hits=self.cache_hits)
+        for record in self.records:
+            _add(summary.totals, record)
+            _add(summary.by_phase.setdefault(record.phase or "unlabeled", UsageTotals()), record)
+            _add(summary.by_role.setdefault(record.role or "unlabeled", UsageTotals()), record)
+        return summary
+
+
+# Labels are (workflow, phase, role)
+_tracker: ContextVar[Optional[UsageTracker]] = ContextVar("usage_tracker", default=None)
+_labels: ContextVar[Tuple[Optional[str], Optional[str], Optional[str]]] = ContextVar(
+    "usage_labels", default=(None, None, None)
+)
+
+
+@contextmanager
+def usage_scope() -> Iterator[UsageTracker]:
+    """Track the LLM calls made in the enclosed block (and the tasks it spawns)."""
+    tracker = UsageTracker()
+    tracker_token = _tracker.set(tracker)
+    labels_token = _labels.set((None, None, None))
+    try:
+        yield tracker
+    finally:
+        _labels.reset(labels_token)
+        _tracker.reset(tracker_token)
+
+
+def current_tracker() -> Optional[UsageTracker]:
+    """Return the usage tracker of the current request, if any."""
+    return _tracker.get()
+
+
+def set_workflow(workflow: str) -> None:
+    """
+    Label subsequent calls in this context with the selected workflow.
+
+    Intended to be called inside ``usage_scope()``, which restores the labels on exit.
+    """
+    _, phase, role = _labels.get()
+    _labels.set((workflow, phase, role))
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.workflow = workflow
+
+
+@contextmanager
+def llm_phase(phase: str, role: Optional[str] = None) -> Iterator[None]:
+    """Label the LLM calls made in the enclosed block with a workflow phase and persona role."""
+    workflow, _, current_role = _labels.get()
+    token = _labels.set((workflow, phase, role or current_role))
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        _labels.reset(token)
+        PHASE_SECONDS.labels(workflow or "unlabeled", phase).observe(time.monotonic() - started)
+
+
+@contextmanager
+def shared_call_scope() -> Iterator[UsageTracker]:
+    """
+    Collect the calls of one LLM request shared by several callers (single-flight).
+
+    The calls still count once in the process rollup under the current labels;
+    each caller then adds the collected records to its own request with
+    ``adopt_shared_calls``.
+    """
+    tracker = UsageTracker()
+    token = _tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _tracker.reset(token)
+
+
+def adopt_shared_calls(records: List[LLMCallRecord]) -> None:
+    """Add the records of a shared LLM request to the current request, under the current labels."""
+    tracker = _tracker.get()
+    if tracker is None:
+        return
+    workflow, phase, role = _labels.get()
+    tracker.records.extend(replace(record, workflow=workflow, phase=phase, role=role) for record in records)
+
+
+def current_labels() -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    """Return the (workflow, phase, role) labels of the current context."""
+    return _labels.get()
+
+
+# Process-wide rollup since startup
+_rollup_totals = UsageTotals()
+_rollup_by_phase: Dict[str, UsageTotals] = {}
+_rollup_by_role: Dict[str, UsageTotals] = {}
+_rollup_cache_hits = 0
+_rollup_cancelled_calls = 0
+_rollup_tokens_saved = 0
+
+# Keys kept per rollup breakdown. Roles can be generated by the LLM (e.g.
+# "<perspective> Worker"), so, as with the metric series, further keys are
+# folded into "other" instead of growing the rollup forever.
+_ROLLUP_MAX_KEYS = 50
+
+
+def _rollup_entry(rollup: Dict[str, UsageTotals], key: str) -> UsageTotals:
+    totals = rollup.get(key)
+    if totals is None:
+        if len(rollup) >= _ROLLUP_MAX_KEYS:
+            key = "other"
+        totals = rollup.setdefault(key, UsageTotals())
+    return totals
+
+
+def record_llm_call(kind: str, model: str, response: Any, started_at: float, wall_seconds: float) -> LLMCallRecord:
+    """
+    Record one completed Gemini call against the current request and the process rollup.
+
+    Args:
+        kind: Client method that issued the call (generate, continuation, ...).
+        model: Model name.
+        response: The GenerateContentResponse (its usage_metadata is read if present).
+        started_at: time.monotonic() when the call started.
+        wall_seconds: Elapsed time including retries and rate-limit waits.
+    """
+    workflow, phase, role = _labels.get()
+    usage = getattr(response, "usage_metadata", None)
+    record = LLMCallRecord(
+        kind=kind,
+        model=model,
+        workflow=workflow,
+        phase=phase,
+        role=role,
+        started_at=started_at,
+        wall_seconds=wall_seconds,
+        prompt_tokens=getattr(usage, "prompt_token_count", None) or 0,
+        output_tokens=getattr(usage, "candidates_token_count", None) or 0,
+        thinking_tokens=getattr(usage, "thoughts_token_count", None) or 0,
+        cached_tokens=getattr(usage, "cached_content_token_count", None) or 0,
+        total_tokens=getattr(usage, "total_token_count", None) or 0,
+    )
+
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.records.append(record)
+
+    phase_key = f"{workflow}/{phase or 'unlabeled'}" if workflow else (phase or "unlabeled")
+    _add(_rollup_totals, record)
+    _add(_rollup_entry(_rollup_by_phase, phase_key), record)
+    _add(_rollup_entry(_rollup_by_role, role or "unlabeled"), record)
+
+    workflow_label = workflow or "unlabeled"
+    LLM_CALL_SECONDS.labels(role or "unlabeled").observe(wall_seconds)
+    LLM_CALLS.labels(workflow_label).inc()
+    LLM_TOKENS.labels(workflow_label, "prompt").inc(record.prompt_tokens)
+    LLM_TOKENS.labels(workflow_label, "output").inc(record.output_tokens)
+    LLM_TOKENS.labels(workflow_label, "thinking").inc(record.thinking_tokens)
+    return record
+
+
+def record_cache_hit() -> None:
+    """Count an LLM call that was served from the response cache."""
+    global _rollup_cache_hits
+    _rollup_cache_hits += 1
+    tracker = _tracker.get()
+    if tracker is not None:
+        tracker.cache_hits += 1
+
+
+def record_cancelled_call(estimated_prompt_tokens: int, sent: bool) -> int:
+    """
+    Count a Gemini call abandoned by cancellation and estimate the tokens it saved.
+
+    A call cancelled while waiting for the governor saves its prompt and its
+    output; once sent, only the output (estimated as the mean output and
+    thinking tokens of completed calls by the same persona role).
+
+    Args:
+        estimated_prompt_tokens: The call's estimated prompt size.
+        sent: Whether the request had already reached Gemini.
+
+    Returns:
+        int: Estimated tokens saved.
+    """
+    global _rollup_cancelled_calls, _rollup_tokens_saved
+    workflow, _, role = _labels.get()
+    totals = _rollup_by_role.get(role or "unlabeled") or _rollup_totals
+    expected_output = (totals.output_tokens + totals.thinking_tokens) // totals.calls if totals.calls else 0
+    saved = expected_output + (0 if sent else estimated_prompt_tokens)
+
+    _rollup_cancelled_calls += 1
+    _rollup_tokens_saved += saved
+    LLM_CANCELLED_CALLS.labels("in_flight" if sent else "queued").inc()
+    LLM_TOKENS_SAVED.labels(workflow or "unlabeled").inc(saved)
+    return saved
+
+
+def get_usage_rollup() -> Dict[str, Any]:
+    """
+    Return process-wide LLM usage since startup.
+
+    Returns:
+        dict: Totals plus breakdowns keyed by "workflow/phase" and by persona role
+              (at most _ROLLUP_MAX_KEYS each, the rest under "other"), cache hits,
+              and calls cancelled with the tokens that saved.
+    """
+    return {
+        "totals": _rollup_totals.model_dump(),
+        "by_phase": {key: totals.model_dump() for key, totals in sorted(_rollup_by_phase.items())},
+        "by_role": {key: totals.model_dump() for key, totals in sorted(_rollup_by_role.items())},
+        "cache_hits": _rollup_cache_hits,
+        "cancelled_calls": _rollup_cancelled_calls,
+        "tokens_saved_by_cancellation": _rollup_tokens_saved,
+    }
@@ -0,0 +1,462 @@
+# app/core/workflow_classifier.py
+"""
+Local Workflow Pre-Classifier
+
+Decides the workflow for a query locally, in microseconds, so ``select_workflow``
+only pays for the structured-output Gemini call when the local decision is
+uncertain.
+
+The classifier combines two signals:
+
+1. Rules: keyword / regex patterns taken from the "Signals" listed for each
+   workflow in WORKFLOW_DESCRIPTIONS (e.g. "create a prompt" -> prompt_generator,
+   "and then" -> prompt_chaining). Rule hits are turned into a distribution over
+   workflows; one strong, unopposed signal is enough for a confident decision.
+2. A trained model: multinomial naive Bayes over word unigrams/bigrams (plus the
+   rule hits as features), trained on the selections the LLM selector made and
+   logged to SELECTOR_LOG_PATH (opt-in: SELECTOR_LOG_ENABLED). Without a trained
+   model the rules decide alone.
+
+A query is routed locally when the blended confidence reaches
+SELECTOR_CLASSIFIER_THRESHOLD. Metrics cover the bypass rate and how often the
+classifier agrees with the LLM: on every fallback (the LLM runs anyway) and on
+an optional sample of bypassed queries that are also sent to the LLM in the
+background (SELECTOR_CLASSIFIER_SHADOW_RATE).
+
+Usage:
+    # Train (or retrain) from logged LLM selections
+    python -m app.core.workflow_classifier train
+
+    from app.core.workflow_classifier import classify_query
+    prediction = classify_query("Create a prompt for summarizing legal docs")
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+
+
+# ============================================================================
+# Rules (from the "Signals" in WORKFLOW_DESCRIPTIONS)
+# ============================================================================
+
+# workflow -> [(pattern, weight)]; weight 1.0 is a strong signal, 0.5 a hint.
+# Every WorkflowType value has an entry, so the keys double as the label set.
+_RULES: Dict[str, List[Tuple[str, float]]] = {
+    "prompt_generator": [
+        (r"\b(create|write|build|generate|design|draft|craft)\b[\w\s,-]{0,40}\b(prompt|system prompt|prompt template)s?\b", 1.0),
+        (r"\binstructions for (an? )?(ai|llm|model|chatbot|assistant)\b", 1.0),
+        (r"\bmeta[- ]?prompt", 1.0),
+    ],
+    "prompt_chaining": [
+        (r"\b(and|,) then\b", 1.0),
+        (r"\bfirst\b.{0,120}\b(then|next|after that|finally)\b", 1.0),
+        (r"\b(after that|followed by|afterwards)\b", 0.5),
+        (r"\bstep[- ]by[- ]step\b", 0.5),
+    ],
+    "evaluator_optimizer": [
+        (r"\bproofread\b", 1.0),
+        # Generic verbs ("optimize a query", "refine oil") are only hints on their own
+        (r"\b(improve|polish|refine|tighten|optimi[sz]e)\b", 0.5),
+        (r"\bmake (it|this|them) (better|clearer|more \w+)\b", 1.0),
+        (r"\b(professional|persuasive|concise) (email|letter|essay|bio|cover letter)\b", 0.5),
+    ],
+    "routing": [
+        (r"^\s*(what|who|when|where|why|how|is|are|can|does|define|explain)\b[^.?!]{0,80}\??\s*$", 0.5),
+        (r"\b(reset|forgot|change) (my )?password\b", 1.0),
+        (r"\b(debug|fix) (this|my|the) (error|bug|exception)\b", 1.0),
+    ],
+    "orchestrator_workers": [
+        (r"\b(plan|organi[sz]e) (my|a|an|our|the)\b", 1.0),
+        (r"\b(refactor|migrate|roadmap|end-to-end|launch)\b", 0.5),
+        (r"\b(strategy|project|campaign|itinerary)\b", 0.5),
+    ],
+    "parallel_section_voting": [
+        (r"\b(comprehensive|thorough|in-depth)\b.{0,80}\b(verif\w*|consensus|validated|fact-check\w*)\b", 1.0),
+        (r"\bfrom (all|multiple|several|different) (angles|perspectives|viewpoints)\b", 0.5),
+    ],
+    "parallel_sectioning": [
+        (r"\b(marketing|technical|financial|legal|security)\b.{0,40}\b(and|,)\b.{0,40}\bperspectives?\b", 1.0),
+    ],
+    "parallel_voting": [
+        (r"\bis (this|it|that)\b.{0,30}\b(phishing|spam|scam|safe|appropriate|legit\w*)\b", 1.0),
+        (r"\b(verify|fact-check) (this|that|the) (claim|statement|fact)\b", 1.0),
+    ],
+    "autonomous_agent": [
+        (r"\b(research|investigate|explore)\b.{0,60}\b(latest|recent|developments|sources|web)\b", 1.0),
+    ],
+    # Simple queries reach direct_answer through the selector's complexity fast path
+    "direct_answer": [],
+}
+
+# Signals of workflow patterns without a registered handler count toward the
+# registered workflow that covers them; the classifier only predicts
+# registered workflows (anything else would fail dispatch with a 400). The
+# selector maps LLM decisions naming such a pattern the same way.
+_ALIASES = {
+    "parallel_sectioning": "parallel_section_voting",
+    "parallel_voting": "routing",
+    "autonomous_agent": "orchestrator_workers",
+}
+
+
+def registered_workflow(workflow: str) -> str:
+    """Map a workflow pattern without a handler to the registered workflow that covers it."""
+    return _ALIASES.get(workflow, workflow)
+
+_COMPILED_RULES = {
+    workflow: [(re.compile(pattern, re.IGNORECASE | re.DOTALL), weight) for pattern, weight in patterns]
+    for workflow, patterns in _RULES.items()
+}
+
+# Pseudo-count spread over all workflows so a single weak hint stays uncertain
+_RULE_PRIOR = 0.15
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+
+def rule_scores(query: str) -> Dict[str, float]:
+    """Summed weights of the rule patterns each workflow matched (only workflows with hits)."""
+    scores: Dict[str, float] = {}
+    for workflow, patterns in _COMPILED_RULES.items():
+        score = sum(weight for pattern, weight in patterns if pattern.search(query))
+        if score:
+            scores[workflow] = score
+    return scores
+
+
+def _rule_distribution(scores: Dict[str, float], labels: List[str]) -> Dict[str, float]:
+    total = sum(scores.values()) + _RULE_PRIOR
+    return {label: (scores.get(label, 0.0) + _RULE_PRIOR / len(labels)) / total for label in labels}
+
+
+def features(query: str) -> List[str]:
+    """Unigram and bigram tokens plus one ``rule:<workflow>`` feature per rule hit."""
+    words = _TOKEN_RE.findall(query.lower())
+    tokens = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    tokens.extend(f"rule:{workflow}" for workflow in rule_scores(query))
+    return tokens
+
+
+# ============================================================================
+# Naive Bayes model
+# ============================================================================
+
+class NaiveBayesModel:
+    """Multinomial naive Bayes with Laplace smoothing over ``features()``."""
+
+    def __init__(self, doc_counts: Dict[str, int], token_counts: Dict[str, Dict[str, int]], alpha: float = 1.0):
+        self.doc_counts = doc_counts
+        self.token_counts = token_counts
+        self.alpha = alpha
+        self.vocabulary = {token for counts in token_counts.values() for token in counts}
+        self.totals = {label: sum(counts.values()) for label, counts in token_counts.items()}
+
+    @classmethod
+    def train(cls, examples: List[Tuple[str, str]], alpha: float = 1.0) -> "NaiveBayesModel":
+        """Fit on (query, workflow) pairs."""
+        doc_counts: Counter = Counter()
+        token_counts: Dict[str, Counter] = {}
+        for query, label in examples:
+            doc_counts[label] += 1
+            token_counts.setdefault(label, Counter()).update(features(query))
+        return cls(dict(doc_counts), {label: dict(counts) for label, counts in token_counts.items()}, alpha)
+
+    def predict_proba(self, query: str) -> Dict[str, float]:
+        """Posterior probability of each workflow seen in training."""
+        tokens = [token for token in features(query) if token in self.vocabulary]
+        documents = sum(self.doc_counts.values())
+        vocabulary_size = len(self.vocabulary) or 1
+        log_probs = {}
+        for label, count in self.doc_counts.items():
+            counts = self.token_counts.get(label, {})
+            denominator = self.totals.get(label, 0) + self.alpha * vocabulary_size
+            log_prob = math.log(count / documents)
+            for token in tokens:
+                log_prob += math.log((counts.get(token, 0) + self.alpha) / denominator)
+            log_probs[label] = log_prob
+        peak = max(log_probs.values())
+        exp = {label: math.exp(value - peak) for label, value in log_probs.items()}
+        total = sum(exp.values())
+        return {label: value / total for label, value in exp.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"alpha": self.alpha, "doc_counts": self.doc_counts, "token_counts": self.token_counts}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "NaiveBayesModel":
+        return cls(data["doc_counts"], data["token_counts"], data.get("alpha", 1.0))
+
+
+# ============================================================================
+# Classification
+# ============================================================================
+
+@dataclass
+class ClassifierPrediction:
+    """Local workflow decision with its confidence and the rule signals that fired."""
+    workflow: str
+    confidence: float
+    signals: List[str] = field(default_factory=list)
+    used_model: bool = False
+
+
+_model: Optional[NaiveBayesModel] = None
+_model_loaded = False
+_model_lock = threading.Lock()
+
+
+def _get_model() -> Optional[NaiveBayesModel]:
+    """Load the trained model once (None if it has not been trained yet)."""
+    global _model, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                path = settings.SELECTOR_CLASSIFIER_MODEL_PATH
+                if os.path.exists(path):
+                    try:
+                        with open(path, "r", encoding="utf-8") as f:
+                            _model = NaiveBayesModel.from_dict(json.load(f)["model"])
+                        logging.info(f"Loaded workflow classifier model from {path}")
+                    except Exception as e:
+                        logging.warning(f"Could not load workflow classifier model {path}: {e}")
+                _model_loaded = True
+    return _model
+
+
+def classify_query(query: str, model: Optional[NaiveBayesModel] = None) -> ClassifierPrediction:
+    """
+    Predict the workflow for a query locally.
+
+    When a trained model is available its distribution is averaged with the
+    rules' (SELECTOR_CLASSIFIER_MODEL_WEIGHT), or used alone if no rule fired;
+    otherwise the rules decide alone. Only workflows registered in
+    app.core.workflow_registry are predicted.
+
+    Args:
+        query: The user query
+        model: Model to use instead of the trained model on disk
+
+    Returns:
+        ClassifierPrediction: Most likely workflow and its confidence (0.0-1.0)
+    """
+    from app.core.workflow_registry import get_workflow_registry
+
+    model = model or _get_model()
+    labels = get_workflow_registry().names()
+    scores: Dict[str, float] = {}
+    for workflow, score in rule_scores(query).items():
+        workflow = registered_workflow(workflow)
+        if workflow in labels:
+            scores[workflow] = scores.get(workflow, 0.0) + score
+    distribution = _rule_distribution(scores, labels)
+
+    if model is not None:
+        weight = settings.SELECTOR_CLASSIFIER_MODEL_WEIGHT if scores else 1.0
+        model_probs: Dict[str, float] = {}
+        for label, probability in model.predict_proba(query).items():
+            label = registered_workflow(label)
+            model_probs[label] = model_probs.get(label, 0.0) + probability
+        distribution = {
+            label: (1 - weight) * distribution[label] + weight * model_probs.get(label, 0.0)
+            for label in labels
+        }
+
+    workflow = max(distribution, key=distribution.get)
+    return ClassifierPrediction(
+        workflow=workflow,
+        confidence=round(distribution[workflow], 4),
+        signals=sorted(scores),
+        used_model=model is not None,
+    )
+
+
+# ============================================================================
+# Metrics and selection log
+# ============================================================================
+
+@dataclass
+class ClassifierStats:
+    """Counters for the pre-classifier."""
+    queries: int = 0
+    bypassed: int = 0
+    fallbacks: int = 0
+    compared: int = 0  # Fallbacks where the LLM's choice was compared with the classifier's
+    agreed: int = 0
+    shadow_compared: int = 0  # Bypassed queries also sent to the LLM
+    shadow_agreed: int = 0
+    classify_seconds: float = 0.0
+
+
+_stats = ClassifierStats()
+_log_lock = threading.Lock()
+
+
+def record_prediction(bypassed: bool, elapsed: float) -> None:
+    """Count a classification and whether it bypassed the LLM selector."""
+    _stats.queries += 1
+    _stats.classify_seconds += elapsed
+    if bypassed:
+        _stats.bypassed += 1
+    else:
+        _stats.fallbacks += 1
+
+
+def record_agreement(prediction: Optional[ClassifierPrediction], llm_workflow: str, shadow: bool = False) -> None:
+    """Compare the classifier's choice with the LLM selector's choice for the same query."""
+    if prediction is None:
+        return
+    agreed = prediction.workflow == llm_workflow
+    if shadow:
+        _stats.shadow_compared += 1
+        _stats.shadow_agreed += int(agreed)
+    else:
+        _stats.compared += 1
+        _stats.agreed += int(agreed)
+
+
+def log_selection(query: str, workflow: str, confidence: float) -> None:
+    """
+    Append an LLM selector decision to SELECTOR_LOG_PATH (training data for the model).
+
+    Opt-in (SELECTOR_LOG_ENABLED) since it stores raw user queries, and skipped
+    with the fake backend, whose selections are not real training data. The
+    file is rotated to ``<path>.1`` once it exceeds SELECTOR_LOG_MAX_MB.
+    """
+    path = settings.SELECTOR_LOG_PATH
+    if not settings.SELECTOR_LOG_ENABLED or not path or settings.GEMINI_BACKEND == "fake":
+        return
+    record = {"ts": time.time(), "query": query, "workflow": workflow, "confidence": confidence}
+    try:
+        with _log_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            if os.path.exists(path) and os.path.getsize(path) >= settings.SELECTOR_LOG_MAX_MB * 1024 * 1024:
+                os.replace(path, f"{path}.1")
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    except OSError as e:
+        logging.warning(f"Could not log workflow selection: {e}")
+
+
+def get_classifier_stats() -> Dict[str, Any]:
+    """
+    Return pre-classifier metrics.
+
+    Returns:
+        dict: Counters plus bypass rate, agreement rates (on fallbacks and on
+              shadowed bypasses), mean classification time and whether a
+              trained model is loaded.
+    """
+    stats = asdict(_stats)
+    stats["bypass_rate"] = round(_stats.bypassed / _stats.queries, 4) if _stats.queries else None
+    stats["agreement_rate"] = round(_stats.agreed / _stats.compared, 4) if _stats.compared else None
+    stats["shadow_agreement_rate"] = (
+        round(_stats.shadow_agreed / _stats.shadow_compared, 4) if _stats.shadow_compared else None
+    )
+    stats["mean_classify_ms"] = round(_stats.classify_seconds / _stats.queries * 1000, 3) if _stats.queries else None
+    stats["model_loaded"] = _get_model() is not None
+    stats["threshold"] = settings.SELECTOR_CLASSIFIER_THRESHOLD
+    del stats["classify_seconds"]
+    return stats
+
+
+# ============================================================================
+# Training
+# ============================================================================
+
+def load_examples(path: str, min_confidence: float) -> List[Tuple[str, str]]:
+    """Read (query, workflow) pairs from a selection log, keeping confident LLM decisions."""
+    examples = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if record.get("query") and record.get("workflow") and record.get("confidence", 0) >= min_confidence:
+                examples.append((record["query"], record["workflow"]))
+    return examples
+
+
+def evaluate(model: NaiveBayesModel, examples: List[Tuple[str, str]], threshold: float) -> Dict[str, Any]:
+    """Accuracy overall and on the queries that would bypass the LLM at ``threshold``."""
+    correct = bypassed = bypassed_correct = 0
+    for query, label in examples:
+        prediction = classify_query(query, model=model)
+        correct += prediction.workflow == label
+        if prediction.confidence >= threshold:
+            bypassed += 1
+            bypassed_correct += prediction.workflow == label
+    return {
+        "examples": len(examples),
+        "accuracy": round(correct / len(examples), 4) if examples else None,
+        "bypass_rate": round(bypassed / len(examples), 4) if examples else None,
+        "bypass_accuracy": round(bypassed_correct / bypassed, 4) if bypassed else None,
+    }
+
+
+def train(log_path: str, model_path: str, min_confidence: float = 0.7, holdout: float = 0.2, seed: int = 0) -> Dict[str, Any]:
+    """
+    Train the model on logged selections and save it.
+
+    A ``holdout`` fraction is evaluated first (at SELECTOR_CLASSIFIER_THRESHOLD)
+    so the threshold can be tuned; the saved model is then fit on all examples.
+    """
+    global _model, _model_loaded
+    examples = load_examples(log_path, min_confidence)
+    if not examples:
+        raise ValueError(f"No usable selections in {log_path}")
+
+    shuffled = examples[:]
+    random.Random(seed).shuffle(shuffled)
+    cut = int(len(shuffled) * (1 - holdout))
+    report: Dict[str, Any] = {"examples": len(examples), "labels": dict(Counter(label for _, label in examples))}
+    if holdout > 0 and 0 < cut < len(shuffled):
+        report["holdout"] = evaluate(
+            NaiveBayesModel.train(shuffled[:cut]), shuffled[cut:], settings.SELECTOR_CLASSIFIER_THRESHOLD
+        )
+
+    model = NaiveBayesModel.train(examples)
+    os.makedirs(os.path.dirname(os.path.abspath(model_path)), exist_ok=True)
+    with open(model_path, "w", encoding="utf-8") as f:
+        json.dump({"trained_at": time.time(), "report": report, "model": model.to_dict()}, f)
+    if model_path == settings.SELECTOR_CLASSIFIER_MODEL_PATH:
+        _model, _model_loaded = model, True
+    return report
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Train or try the local workflow pre-classifier.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    train_parser = commands.add_parser("train", help="Train the model on logged LLM selections")
+    train_parser.add_argument("--log", default=settings.SELECTOR_LOG_PATH, help="Selection log JSONL")
+    train_parser.add_argument("--out", default=settings.SELECTOR_CLASSIFIER_MODEL_PATH, help="Model file")
+    train_parser.add_argument("--min-confidence", type=float, default=0.7,
+                              help="Ignore LLM selections below this confidence (default: 0.7)")
+    train_parser.add_argument("--holdout", type=float, default=0.2, help="Fraction held out for evaluation")
+    classify_parser = commands.add_parser("classify", help="Classify a query")
+    classify_parser.add_argument("query")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    if args.command == "train":
+        print(json.dumps(train(args.log, args.out, args.min_confidence, args.holdout), indent=2))
+    else:
+        print(json.dumps(asdict(classify_query(args.query)), indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
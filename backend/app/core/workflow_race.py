@@ -0,0 +1,158 @@
+# app/core/workflow_race.py
+"""
+Racing the Alternative Workflow
+
+When the LLM selector is unsure (confidence below WORKFLOW_RACE_MAX_CONFIDENCE)
+and names an ``alternative_workflow``, the runner can execute both workflows
+concurrently and answer with the first to finish, trading some extra tokens
+for a much lower tail latency on ambiguous queries:
+
+- Both runs share one in-flight budget of WORKFLOW_RACE_MAX_IN_FLIGHT LLM calls
+  (``request_concurrency``), so a race never doubles the request's pressure on
+  the governor.
+- If the alternative finishes first, the selected workflow gets a grace window
+  of WORKFLOW_RACE_GRACE_SECONDS; finishing within it, the selector's preferred
+  (higher-confidence) answer wins.
+- A run that fails loses; the loser is cancelled at once to save its remaining
+  calls. Calls it completed are counted as wasted and stay in the request's usage.
+
+Usage:
+    from app.core.workflow_race import should_race, race_workflows
+
+    if should_race(selection):
+        selection, (final_response, steps) = await race_workflows(selection, query)
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.rate_limiter import request_concurrency
+from app.core.speculation import WorkflowRun
+from app.core.streaming import emit
+from app.core.workflow_registry import get_workflow_registry
+from app.core.workflow_selector import alternative_selection
+from app.models.schemas import WorkflowSelection
+
+
+@dataclass
+class RaceStats:
+    """Counters for workflow races."""
+    races: int = 0
+    selected_wins: int = 0
+    alternative_wins: int = 0
+    grace_wins: int = 0  # Selected workflow won within the grace window after the alternative finished
+    failures: int = 0  # Runs that failed during a race
+    wasted_calls: int = 0
+    wasted_tokens: int = 0
+
+
+_stats = RaceStats()
+
+
+def should_race(selection: WorkflowSelection, enabled: Optional[bool] = None) -> bool:
+    """
+    True if the selection is uncertain enough to race its alternative workflow.
+
+    Args:
+        selection: The selector's WorkflowSelection
+        enabled: Per-request override of settings.WORKFLOW_RACE_ENABLED
+    """
+    if not (settings.WORKFLOW_RACE_ENABLED if enabled is None else enabled):
+        return False
+    alternative = selection.alternative_workflow
+    return (
+        alternative is not None
+        and alternative != selection.selected_workflow
+        and (selection.confidence or 0.0) < settings.WORKFLOW_RACE_MAX_CONFIDENCE
+        and get_workflow_registry().is_registered(alternative)
+    )
+
+
+def _succeeded(run: WorkflowRun) -> bool:
+    return run.task.done() and not run.task.cancelled() and run.task.exception() is None
+
+
+async def race_workflows(selection: WorkflowSelection, user_query: str) -> Tuple[WorkflowSelection, Tuple[str, List[Any]]]:
+    """
+    Run the selected and alternative workflows concurrently and keep the winner.
+
+    Returns:
+        (winning WorkflowSelection, (final_response, steps))
+
+    Raises:
+        Exception: The selected workflow's error if both runs fail
+    """
+    alternative = alternative_selection(selection)
+    _stats.races += 1
+    logging.info(
+        f"Racing {selection.selected_workflow} against {alternative.selected_workflow} "
+        f"(selector confidence {selection.confidence or 0.0:.0%})"
+    )
+
+    with request_concurrency(settings.WORKFLOW_RACE_MAX_IN_FLIGHT):
+        selected_run = WorkflowRun(selection, user_query)
+        alternative_run = WorkflowRun(alternative, user_query)
+    runs = [selected_run, alternative_run]
+
+    try:
+        winner: Optional[WorkflowRun] = None
+        pending = {run.task for run in runs}
+        while pending and winner is None:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            if _succeeded(selected_run):
+                winner = selected_run
+            elif _succeeded(alternative_run):
+                winner = alternative_run
+                if not selected_run.task.done() and settings.WORKFLOW_RACE_GRACE_SECONDS > 0:
+                    await asyncio.wait([selected_run.task], timeout=settings.WORKFLOW_RACE_GRACE_SECONDS)
+                    if _succeeded(selected_run):
+                        winner = selected_run
+                        _stats.grace_wins += 1
+    except BaseException:
+        for run in runs:
+            await run.cancel()
+        raise
+
+    _stats.failures += sum(1 for run in runs if run.task.done() and not run.task.cancelled() and run.task.exception())
+    if winner is None:
+        # Both failed: surface the selected workflow's error
+        for run in runs:
+            await run.cancel()
+        raise selected_run.task.exception()
+
+    loser = alternative_run if winner is selected_run else selected_run
+    wasted = await loser.cancel()
+    _stats.wasted_calls += len(wasted)
+    _stats.wasted_tokens += sum(record.total_tokens for record in wasted)
+
+    if winner is selected_run:
+        _stats.selected_wins += 1
+        won = selection
+    else:
+        _stats.alternative_wins += 1
+        won = alternative.model_copy(update={
+            "reasoning": f"{selection.reasoning} Raced against {alternative.selected_workflow}, which finished first.",
+            "alternative_workflow": selection.selected_workflow,
+        })
+        emit("selection", won)
+    logging.info(
+        f"Race won by {won.selected_workflow}; {loser.selection.selected_workflow} cancelled "
+        f"({len(wasted)} calls wasted)"
+    )
+    return won, await winner.adopt()
+
+
+def get_race_stats() -> Dict[str, Any]:
+    """
+    Return workflow race metrics.
+
+    Returns:
+        dict: Races run, wins of the selected vs. alternative workflow (and
+              grace-window wins), failed runs, and calls/tokens spent by losers
+    """
+    stats = asdict(_stats)
+    stats["enabled"] = settings.WORKFLOW_RACE_ENABLED
+    return stats
@@ -0,0 +1,191 @@
+# app/core/workflow_registry.py
+"""
+Workflow Registry
+
+Maps each workflow (keyed by WorkflowType value) to the module that implements
+it and imports that module only when the workflow is first dispatched, so a
+cold process (e.g. the serverless ``api/index.py`` entry point) does not pay for
+importing every workflow up front.
+
+New workflows register themselves without touching the runner or endpoints:
+
+    from app.core.workflow_registry import register_workflow
+
+    register_workflow("my_workflow", module="app.core.workflows.my_workflow")
+    register_workflow(WorkflowType.ROUTING, handler=my_routing_execute)  # replace=True to override
+
+A handler is ``async def execute(workflow_selection, user_query) -> (final_response, steps)``.
+The import time of every lazily loaded module is recorded; ``get_import_report()``
+lists it, and WORKFLOW_PRELOAD imports chosen workflows at startup for
+long-running servers.
+
+Usage:
+    from app.core.workflow_registry import get_workflow_handler
+
+    execute = get_workflow_handler(selection.selected_workflow)
+    final_response, steps = await execute(selection, query)
+"""
+
+import importlib
+import logging
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+WorkflowHandler = Callable[[Any, str], Awaitable[Tuple[str, List[Any]]]]
+
+
+class UnsupportedWorkflowError(ValueError):
+    """Raised when the selector returns a workflow with no handler."""
+
+
+@dataclass
+class WorkflowEntry:
+    """A registered workflow: where its handler lives and what loading it cost."""
+    name: str
+    module: Optional[str] = None
+    attribute: str = "execute"
+    handler: Optional[WorkflowHandler] = None
+    import_seconds: Optional[float] = None
+    modules_loaded: Optional[int] = None
+
+
+def _key(workflow: Union[Enum, str]) -> str:
+    return workflow.value if isinstance(workflow, Enum) else str(workflow)
+
+
+class WorkflowRegistry:
+    """Lazily importing map of workflow name -> execute handler."""
+
+    def __init__(self):
+        self._entries: Dict[str, WorkflowEntry] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        workflow: Union[Enum, str],
+        module: Optional[str] = None,
+        handler: Optional[WorkflowHandler] = None,
+        attribute: str = "execute",
+        replace: bool = False,
+    ) -> None:
+        """
+        Register a workflow by module path (imported on first use) or by handler.
+
+        Args:
+            workflow: WorkflowType member or workflow name
+            module: Dotted module path exposing ``attribute``
+            handler: The execute coroutine function itself
+            attribute: Name of the handler in ``module``
+            replace: Allow overriding an existing registration
+
+        Raises:
+            ValueError: If neither/both of module and handler are given, or the
+                        workflow is already registered and replace is False
+        """
+        if (module is None) == (handler is None):
+            raise ValueError("Register a workflow with exactly one of module= or handler=")
+        name = _key(workflow)
+        with self._lock:
+            if name in self._entries and not replace:
+                raise ValueError(f"Workflow '{name}' is already registered")
+            self._entries[name] = WorkflowEntry(name=name, module=module, attribute=attribute, handler=handler)
+
+    def is_registered(self, workflow: Union[Enum, str]) -> bool:
+        return _key(workflow) in self._entries
+
+    def names(self) -> List[str]:
+        return sorted(self._entries)
+
+    def get(self, workflow: Union[Enum, str]) -> WorkflowHandler:
+        """
+        Return the handler for a workflow, importing its module on first use.
+
+        Raises:
+            UnsupportedWorkflowError: If the workflow is not registered
+        """
+        name = _key(workflow)
+        entry = self._entries.get(name)
+        if entry is None:
+            raise UnsupportedWorkflowError(f"Unsupported workflow: {name}")
+        if entry.handler is None:
+            with self._lock:
+                if entry.handler is None:
+                    self._load(entry)
+        return entry.handler
+
+    def _load(self, entry: WorkflowEntry) -> None:
+        modules_before = len(sys.modules)
+        started = time.perf_counter()
+        module = importlib.import_module(entry.module)
+        entry.import_seconds = round(time.perf_counter() - started, 4)
+        entry.modules_loaded = len(sys.modules) - modules_before
+        entry.handler = getattr(module, entry.attribute)
+        logging.info(
+            f"Loaded workflow '{entry.name}' from {entry.module} in {entry.import_seconds * 1000:.1f}ms "
+            f"({entry.modules_loaded} new modules)"
+        )
+
+    def preload(self, workflows: List[str]) -> None:
+        """Import the given workflows now (errors are logged, not raised)."""
+        for workflow in workflows:
+            try:
+                self.get(workflow)
+            except Exception as e:
+                logging.error(f"Could not preload workflow '{workflow}': {e}")
+
+    def import_report(self) -> Dict[str, Dict[str, Any]]:
+        """Per workflow: module, whether it is loaded, import seconds and modules it pulled in."""
+        return {
+            name: {
+                "module": entry.module,
+                "loaded": entry.handler is not None,
+                "import_seconds": entry.import_seconds,
+                "modules_loaded": entry.modules_loaded,
+            }
+            for name, entry in sorted(self._entries.items())
+        }
+
+
+_registry = WorkflowRegistry()
+
+# Built-in workflows (WorkflowType values without an implementation are left unregistered)
+for _name in (
+    "prompt_chaining",
+    "routing",
+    "parallel_section_voting",
+    "orchestrator_workers",
+    "evaluator_optimizer",
+    "prompt_generator",
+    "direct_answer",
+):
+    _registry.register(_name, module=f"app.core.workflows.{_name}")
+
+
+def get_workflow_registry() -> WorkflowRegistry:
+    """Get the process-wide workflow registry."""
+    return _registry
+
+
+def register_workflow(
+    workflow: Union[Enum, str],
+    module: Optional[str] = None,
+    handler: Optional[WorkflowHandler] = None,
+    attribute: str = "execute",
+    replace: bool = False,
+) -> None:
+    """Register a workflow with the process-wide registry (see WorkflowRegistry.register)."""
+    _registry.register(workflow, module=module, handler=handler, attribute=attribute, replace=replace)
+
+
+def get_workflow_handler(workflow: Union[Enum, str]) -> WorkflowHandler:
+    """Return the execute handler for a workflow (see WorkflowRegistry.get)."""
+    return _registry.get(workflow)
+
+
+def get_import_report() -> Dict[str, Dict[str, Any]]:
+    """Return per-workflow module import cost (see WorkflowRegistry.import_report)."""
+    return _registry.import_report()
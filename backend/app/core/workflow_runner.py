@@ -0,0 +1,150 @@
+# app/core/workflow_runner.py
+"""
+Workflow Runner
+
+Runs one QueryRequest end to end, in-process: workflow selection, execution of
+the selected workflow, and assembly of the WorkflowResponse. The HTTP endpoints
+and the offline batch runner (app.batch_runner) both go through ``run_query`` so
+they share priority lanes, deadlines and usage accounting. Workflows are
+dispatched through the lazy registry in app.core.workflow_registry. With
+speculative execution (app.core.speculation) the predicted workflow starts
+while the selector is still deciding, and an uncertain selection can be raced
+against its alternative workflow (app.core.workflow_race).
+
+Usage:
+    from app.core.workflow_runner import run_query
+
+    response = await run_query(QueryRequest(query="..."))
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+from app.config import settings
+from app.core.admission import CHEAPEST, REDUCED, current_degradation
+from app.core.deadlines import DeadlineExceeded, deadline_scope
+from app.core.helpers.request_config import InvalidRequestConfig, config_flag, config_priority, config_seconds
+from app.core.metrics import REQUESTS_IN_FLIGHT, WORKFLOW_REQUESTS, WORKFLOW_SECONDS
+from app.core.rate_limiter import priority_lane
+from app.core.speculation import start_speculation, remember_selection
+from app.core.workflow_race import should_race, race_workflows
+from app.core.streaming import emit
+from app.core.usage import usage_scope, set_workflow
+from app.core.workflow_registry import get_workflow_handler, UnsupportedWorkflowError
+from app.core.workflow_selector import predicted_selection, select_workflow
+from app.models.schemas import QueryRequest, WorkflowResponse, WorkflowSelection
+
+__all__ = ["run_query", "InvalidRequestConfig", "UnsupportedWorkflowError"]
+
+
+async def _select(user_query: str, degraded: Optional[str]) -> WorkflowSelection:
+    """Select the workflow, or apply the degradation admission control chose under load."""
+    if degraded == CHEAPEST:
+        return predicted_selection(
+            "direct_answer", user_query, 1.0, "Admission control: answered directly while the server is under load."
+        )
+    workflow_selection = await select_workflow(user_query)
+    if degraded == REDUCED:
+        # The heavier workflows size their fan-out and thinking budgets by complexity
+        workflow_selection = workflow_selection.model_copy(update={"complexity": "simple"})
+    return workflow_selection
+
+
+async def run_query(request: QueryRequest, default_priority: str = "interactive") -> WorkflowResponse:
+    """
+    Select and execute the workflow for a query and build the WorkflowResponse.
+
+    LLM calls run in ``config.priority`` (default ``default_priority``) and share
+    a deadline of ``config.timeout_seconds`` (default settings.TIMEOUT_SECONDS).
+    ``config.speculative`` (default settings.SPECULATIVE_EXECUTION_ENABLED) runs
+    the predicted workflow concurrently with selection; ``config.race`` (default
+    settings.WORKFLOW_RACE_ENABLED) races a low-confidence selection against the
+    selector's alternative and keeps the first to finish. A query admitted
+    degraded (app.core.admission) runs with the "simple" complexity budget or
+    as direct_answer, without speculation or races.
+    Inside ``app.core.streaming.event_sink`` the selection, each step and the
+    final answer's tokens are published as they happen.
+
+    Args:
+        request: The QueryRequest to process
+        default_priority: Priority lane when the request does not set one
+
+    Returns:
+        WorkflowResponse: Final response, selection, steps, timing and usage.
+                          The request's session_id is kept when provided.
+
+    Raises:
+        InvalidRequestConfig: If config.priority or config.timeout_seconds is unusable
+        DeadlineExceeded: If the request deadline expired
+        UnsupportedWorkflowError: If the selected workflow has no handler
+    """
+    start_time = time.time()
+    config = request.config or {}
+    priority = config_priority(config, default_priority)
+    timeout_seconds = config_seconds(config, "timeout_seconds", settings.TIMEOUT_SECONDS)
+    degraded = current_degradation()
+    speculative = config_flag(config, "speculative", settings.SPECULATIVE_EXECUTION_ENABLED) and degraded is None
+    if degraded is not None:
+        race = False
+    else:
+        race = config_flag(config, "race", settings.WORKFLOW_RACE_ENABLED) if "race" in config else None
+
+    REQUESTS_IN_FLIGHT.labels().inc()
+    outcome, usage_tracker = "error", None
+    try:
+        with priority_lane(priority), deadline_scope(timeout_seconds), usage_scope() as usage_tracker:
+            speculation = start_speculation(request.query, request.session_id) if speculative else None
+
+            # Select the appropriate workflow
+            try:
+                workflow_selection = await _select(request.query, degraded)
+            except BaseException:
+                if speculation is not None:
+                    await speculation.cancel()
+                raise
+            emit("selection", workflow_selection)
+            remember_selection(request.session_id, workflow_selection)
+
+            # Execute the selected workflow
+            selected_workflow = workflow_selection.selected_workflow
+            set_workflow(selected_workflow)
+            intermediate_steps = []
+
+            # Adopt the speculative run if it guessed right, race an uncertain
+            # selection against its alternative, or route to the registered
+            # workflow handler (imported on first use)
+            result = await speculation.resolve(workflow_selection) if speculation is not None else None
+            if result is None and should_race(workflow_selection, race):
+                workflow_selection, result = await race_workflows(workflow_selection, request.query)
+                set_workflow(workflow_selection.selected_workflow)
+            elif result is None:
+                execute = get_workflow_handler(selected_workflow)
+                result = await execute(workflow_selection, request.query)
+            final_response, steps = result
+        outcome = "ok"
+    except DeadlineExceeded:
+        outcome = "deadline_exceeded"
+        raise
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.labels().dec()
+        workflow = (usage_tracker.workflow if usage_tracker is not None else None) or "unselected"
+        WORKFLOW_SECONDS.labels(workflow).observe(time.time() - start_time)
+        WORKFLOW_REQUESTS.labels(workflow, outcome).inc()
+
+    intermediate_steps.extend(steps)
+
+    response = WorkflowResponse(
+        workflow_info=workflow_selection,
+        final_response=final_response,
+        intermediate_steps=intermediate_steps,
+        processing_time=time.time() - start_time,
+        usage=usage_tracker.summary(),
+        degraded=degraded
+    )
+    if request.session_id:
+        response.session_id = request.session_id
+    return response
@@ -3,17 +3,31 @@
 Workflow Selector - Phase 2 Modernization
 
 Uses structured outputs (Pydantic) instead of function calling for more
-reliable workflow selection with confidence scoring.
+reliable workflow selection with confidence scoring. A local pre-classifier
+(app.core.workflow_classifier) answers confident cases without the LLM call,
+and decisions are reused across near-duplicate queries (app.core.selection_cache).
 """
 from enum import Enum
-from typing import List, Optional
+from typing import List, Optional, Set
 from pydantic import BaseModel, Field
+import asyncio
 import logging
+import random
+import time
 
+from app.config import settings
 from app.models.schemas import WorkflowSelection
 from app.core.llm_client import get_functions_client
+from app.core.deadlines import DeadlineExceeded
+from app.core.usage import llm_phase
 from app.personas.agent_personas import agent_personas, get_workflow_personas
 from app.core.helpers.persona_utils import generate_agent_context, get_agent_config
+from app.core.selection_cache import get_selection_cache
+from app.core.workflow_registry import get_workflow_registry
+from app.core.workflow_classifier import (
+    ClassifierPrediction, classify_query, record_prediction, record_agreement, log_selection,
+    registered_workflow,
+)
 
 
 # ============================================================================
@@ -31,6 +45,7 @@ class WorkflowType(str, Enum):
     EVALUATOR_OPTIMIZER = "evaluator_optimizer"
     PROMPT_GENERATOR = "prompt_generator"
     AUTONOMOUS_AGENT = "autonomous_agent"
+    DIRECT_ANSWER = "direct_answer"
 
 
 class WorkflowDecision(BaseModel):
@@ -111,6 +126,11 @@ WORKFLOW_DESCRIPTIONS = """
 **Best for:** Open-ended research/exploration requiring tool use and adaptive planning.
 **Examples:** "Research quantum computing developments", "Investigate this security issue"
 **Signals:** Research tasks, exploration, requires external tools, multi-step discovery
+
+### 9. direct_answer
+**Best for:** Simple, self-contained questions or requests a single response answers fully.
+**Examples:** "What is the capital of Peru?", "Convert 5 miles to km", "Define idempotent"
+**Signals:** Short factual questions, definitions, one-line tasks, no analysis or iteration needed
 """
 
 
@@ -123,7 +143,13 @@ async def select_workflow(
     use_autonomous_exclusively: bool = False
 ) -> WorkflowSelection:
     """
-    Select the optimal workflow for a user query using structured output.
+    Select the optimal workflow for a user query.
+    
+    The local pre-classifier (app.core.workflow_classifier) decides first. When
+    its confidence is below settings.SELECTOR_CLASSIFIER_THRESHOLD (or it is
+    disabled), the decision of a near-duplicate earlier query is reused from the
+    semantic selection cache (app.core.selection_cache); only on a miss does the
+    structured-output LLM selector run.
     
     Args:
         user_query: The user's request to analyze
@@ -141,7 +167,81 @@ async def select_workflow(
             reasoning="Autonomous agent workflow selected by explicit user/system choice.",
             confidence=1.0
         )
-    
+
+    prediction = None
+    if settings.SELECTOR_CLASSIFIER_ENABLED:
+        started = time.perf_counter()
+        prediction = classify_query(user_query)
+        bypass = (
+            prediction.confidence >= settings.SELECTOR_CLASSIFIER_THRESHOLD
+            and get_workflow_registry().is_registered(prediction.workflow)
+        )
+        record_prediction(bypass, time.perf_counter() - started)
+        if bypass:
+            logging.info(
+                f"Workflow selected locally: {prediction.workflow} "
+                f"(confidence: {prediction.confidence:.0%}, signals: {', '.join(prediction.signals) or 'model'})"
+            )
+            if random.random() < settings.SELECTOR_CLASSIFIER_SHADOW_RATE:
+                _start_shadow_comparison(user_query, prediction)
+            return _apply_fast_path(_build_workflow_selection(
+                workflow_name=prediction.workflow,
+                reasoning=(
+                    f"Selected by the local classifier (confidence {prediction.confidence:.2f}; "
+                    f"signals: {', '.join(prediction.signals) or 'trained model'})."
+                ),
+                confidence=prediction.confidence,
+                complexity=_estimate_complexity(user_query)
+            ))
+
+    try:
+        selection_cache = get_selection_cache() if settings.SELECTOR_CACHE_ENABLED else None
+        cached = await selection_cache.lookup(user_query) if selection_cache is not None else None
+        if cached is not None:
+            decision, similarity = cached
+            logging.info(
+                f"Workflow selection reused from a similar query: {decision.selected_workflow.value} "
+                f"(similarity: {similarity:.2f})"
+            )
+            return _apply_fast_path(_build_workflow_selection(
+                workflow_name=registered_workflow(decision.selected_workflow.value),
+                reasoning=f"{decision.reasoning} (Reused from a similar query, similarity {similarity:.2f}.)",
+                confidence=decision.confidence,
+                complexity=decision.complexity_assessment,
+                required_agents=decision.required_agents,
+                alternative_workflow=_alternative(decision)
+            ))
+
+        decision = await _select_with_llm(user_query)
+        log_selection(user_query, decision.selected_workflow.value, decision.confidence)
+        record_agreement(prediction, decision.selected_workflow.value)
+        if selection_cache is not None:
+            await selection_cache.add(user_query, decision)
+        
+        return _apply_fast_path(_build_workflow_selection(
+            workflow_name=registered_workflow(decision.selected_workflow.value),
+            reasoning=decision.reasoning,
+            confidence=decision.confidence,
+            complexity=decision.complexity_assessment,
+            required_agents=decision.required_agents,
+            alternative_workflow=_alternative(decision)
+        ))
+        
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logging.error(f"Workflow selection failed: {e}")
+        # Fallback to orchestrator_workers as safe default for complex queries
+        return _build_workflow_selection(
+            workflow_name="orchestrator_workers",
+            reasoning=f"Fallback to orchestrator_workers due to selection error: {str(e)}",
+            confidence=0.5,
+            complexity="medium"
+        )
+
+
+async def _select_with_llm(user_query: str) -> WorkflowDecision:
+    """Ask the LLM selector (structured output) for a WorkflowDecision."""
     # Get selector persona from meta
     selector_persona = agent_personas.get("meta", {}).get("workflow_selector", {})
     selector_config = get_agent_config(selector_persona)
@@ -167,46 +267,91 @@ Consider:
 Provide your selection with confidence score and reasoning.
 """
 
-    try:
-        functions_client = get_functions_client()
-        
-        # Use structured output instead of function calling
+    functions_client = get_functions_client()
+    
+    # Use structured output instead of function calling
+    with llm_phase("workflow_selection", role="Workflow Selector"):
         decision: WorkflowDecision = await functions_client.generate_structured(
             prompt=selection_prompt,
             response_schema=WorkflowDecision,
             system_instruction=system_instruction,
             temperature=selector_config.get("temperature", 0.3),
             thinking_budget=selector_config.get("thinking_budget", 256),
+            cache=selector_config.get("cache"),
         )
-        
-        # Log the decision
-        logging.info(
-            f"Workflow selected: {decision.selected_workflow.value} "
-            f"(confidence: {decision.confidence:.0%}, "
-            f"complexity: {decision.complexity_assessment})"
-        )
-        
-        # If low confidence, log the alternative
-        if decision.confidence < 0.8 and decision.alternative_workflow:
-            logging.info(f"Alternative considered: {decision.alternative_workflow.value}")
-        
-        return _build_workflow_selection(
-            workflow_name=decision.selected_workflow.value,
-            reasoning=decision.reasoning,
-            confidence=decision.confidence,
-            complexity=decision.complexity_assessment,
-            required_agents=decision.required_agents
-        )
-        
-    except Exception as e:
-        logging.error(f"Workflow selection failed: {e}")
-        # Fallback to orchestrator_workers as safe default for complex queries
+    
+    # Log the decision
+    logging.info(
+        f"Workflow selected: {decision.selected_workflow.value} "
+        f"(confidence: {decision.confidence:.0%}, "
+        f"complexity: {decision.complexity_assessment})"
+    )
+    
+    # If low confidence, log the alternative
+    if decision.confidence < 0.8 and decision.alternative_workflow:
+        logging.info(f"Alternative considered: {decision.alternative_workflow.value}")
+    return decision
+
+
+# Strong references to background shadow comparisons until they finish
+_shadow_tasks: Set[asyncio.Task] = set()
+
+
+def _start_shadow_comparison(user_query: str, prediction: ClassifierPrediction) -> None:
+    """Also ask the LLM selector in the background to measure agreement on bypassed queries."""
+    async def compare() -> None:
+        try:
+            with llm_phase("workflow_selection_shadow", role="Workflow Selector"):
+                decision = await _select_with_llm(user_query)
+            log_selection(user_query, decision.selected_workflow.value, decision.confidence)
+            record_agreement(prediction, decision.selected_workflow.value, shadow=True)
+        except DeadlineExceeded:
+            # Inherits the request's deadline; a late comparison is just dropped
+            logging.debug("Shadow workflow selection ran past the request deadline")
+        except Exception as e:
+            logging.debug(f"Shadow workflow selection failed: {e}")
+
+    task = asyncio.create_task(compare())
+    _shadow_tasks.add(task)
+    task.add_done_callback(_shadow_tasks.discard)
+
+
+def _apply_fast_path(selection: WorkflowSelection) -> WorkflowSelection:
+    """
+    Send simple, confidently classified queries to the single-call direct_answer workflow.
+
+    Applies when complexity is "simple", confidence reaches
+    settings.DIRECT_ANSWER_MIN_CONFIDENCE and the selected workflow is one of
+    settings.DIRECT_ANSWER_FROM (multi-call pipelines a single answer can replace).
+    """
+    if not settings.DIRECT_ANSWER_ENABLED or selection.selected_workflow == WorkflowType.DIRECT_ANSWER.value:
+        return selection
+    eligible = {name.strip() for name in settings.DIRECT_ANSWER_FROM.split(",") if name.strip()}
+    if (
+        selection.complexity == "simple"
+        and (selection.confidence or 0.0) >= settings.DIRECT_ANSWER_MIN_CONFIDENCE
+        and selection.selected_workflow in eligible
+    ):
+        logging.info(f"Simple query: answering directly instead of running {selection.selected_workflow}")
         return _build_workflow_selection(
-            workflow_name="orchestrator_workers",
-            reasoning=f"Fallback to orchestrator_workers due to selection error: {str(e)}",
-            confidence=0.5,
-            complexity="medium"
+            workflow_name=WorkflowType.DIRECT_ANSWER.value,
+            reasoning=f"{selection.reasoning} Simple query, answered directly instead of via {selection.selected_workflow}.",
+            confidence=selection.confidence,
+            complexity=selection.complexity
         )
+    return selection
+
+
+def _estimate_complexity(user_query: str) -> str:
+    """
+    Rough task complexity from query length, for locally selected workflows.
+
+    Never "simple": a short query can still be multi-step ("Write a blog post
+    and then translate it to French") or open-ended ("Plan my vacation"), so
+    the direct_answer fast path and the reduced budgets are left to the LLM
+    selector's complexity assessment.
+    """
+    return "complex" if len(user_query.split()) > 80 else "medium"
 
 
 def _build_workflow_selection(
@@ -214,7 +359,8 @@ def _build_workflow_selection(
     reasoning: str,
     confidence: float = 1.0,
     complexity: str = "medium",
-    required_agents: List[str] = None
+    required_agents: List[str] = None,
+    alternative_workflow: Optional[str] = None
 ) -> WorkflowSelection:
     """
     Build a WorkflowSelection object with personas.
@@ -225,6 +371,7 @@ def _build_workflow_selection(
         confidence: Confidence score (0.0-1.0)
         complexity: Task complexity (simple/medium/complex)
         required_agents: List of agent roles (auto-detected if not provided)
+        alternative_workflow: Runner-up workflow named by the selector
         
     Returns:
         Complete WorkflowSelection object
@@ -242,10 +389,21 @@ def _build_workflow_selection(
         required_agents=required_agents,
         personas=personas,
         confidence=confidence,
-        complexity=complexity
+        complexity=complexity,
+        alternative_workflow=alternative_workflow
     )
 
 
+def _alternative(decision: WorkflowDecision) -> Optional[str]:
+    """The decision's alternative workflow, if it names a different one."""
+    if decision.alternative_workflow is None:
+        return None
+    alternative = registered_workflow(decision.alternative_workflow.value)
+    if alternative == registered_workflow(decision.selected_workflow.value):
+        return None
+    return alternative
+
+
 # ============================================================================
 # Utility Functions
 # ============================================================================
@@ -267,5 +425,33 @@ def get_workflow_description(workflow_name: str) -> str:
         "evaluator_optimizer": "Iterative quality refinement",
         "prompt_generator": "AI prompt/template creation",
         "autonomous_agent": "Open-ended tool-using exploration",
+        "direct_answer": "Single-call answer for simple queries",
     }
     return descriptions.get(workflow_name, "Unknown workflow")
+
+
+def forced_selection(workflow_name: str, reasoning: str = "Workflow fixed by the caller.") -> WorkflowSelection:
+    """Build the WorkflowSelection for a workflow chosen without the selector (e.g. benchmarks)."""
+    return _build_workflow_selection(workflow_name=workflow_name, reasoning=reasoning, confidence=1.0)
+
+
+def predicted_selection(workflow_name: str, user_query: str, confidence: float, reasoning: str) -> WorkflowSelection:
+    """Build the selection the selector would return for a locally predicted workflow (e.g. speculation)."""
+    return _apply_fast_path(_build_workflow_selection(
+        workflow_name=workflow_name,
+        reasoning=reasoning,
+        confidence=confidence,
+        complexity=_estimate_complexity(user_query)
+    ))
+
+
+def alternative_selection(selection: WorkflowSelection) -> Optional[WorkflowSelection]:
+    """Build the WorkflowSelection for the selector's runner-up workflow, if it named one."""
+    if not selection.alternative_workflow:
+        return None
+    return _build_workflow_selection(
+        workflow_name=selection.alternative_workflow,
+        reasoning=f"Runner-up to {selection.selected_workflow} (selector confidence {selection.confidence or 0.0:.2f}).",
+        confidence=round(1.0 - (selection.confidence or 0.0), 4),
+        complexity=selection.complexity or "medium"
+    )
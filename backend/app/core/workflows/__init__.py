@@ -1,25 +1,8 @@
-# from .autonomousAgent import execute_autonomous_agent as autonomousAgent # Changed to uppercase A
-# from .basic_workflows import ( # Assuming you might have other workflow functions here
-#     prompt_chaining_workflow,
-#     routing_workflow,
-#     # Add other specific workflow functions if they exist and need to be exported
-# )
+# app/core/workflows/__init__.py
+"""
+Workflow implementations, one module per pattern, each exposing
+``async def execute(workflow_selection, user_query) -> (final_response, steps)``.
 
-# __all__ = [
-#     "autonomousAgent", # Changed to uppercase A
-#     "prompt_chaining_workflow",
-#     "routing_workflow",
-#     # Add other workflow names to __all__ if they are defined above
-# ]
-from app.core.workflows import (
-    orchestrator_workers,
-    orchestrator_workers_with_tools,
-    parallel_sectioning,
-    prompt_generator,
-    prompt_chaining,
-    routing,
-    parallel_voting,
-    evaluator_optimizer,
-    parallel_section_voting
-    # ... other workflows
-)
\ No newline at end of file
+Modules are not imported here: app.core.workflow_registry imports each one on
+first use, so importing this package stays cheap.
+"""
@@ -28,6 +28,7 @@ from google.genai import types
 from app.models.schemas import WorkflowSelection, AgentResponse, WorkflowResponse, ToolDefinition, ToolCategory, PerceptionOutput, ReasoningOutput, PlanningOutput, ExecutionOutput, ReflectionOutput, ErrorRecoveryStrategy, AgentRole
 from app.core.llm_client import get_functions_client, get_llm_client, GoogleGeminiClient, GoogleGeminiFunctions
 from app.tools.registry import get_all_tools
+from app.core.helpers.fanout import gather_cancelling
 
 # Logging setup
 logger = logging.getLogger(__name__)
@@ -232,7 +233,7 @@ async def execute_tools_parallel(
         execute_tool(fc.name, dict(fc.args) if fc.args else {}, session_id, all_tools)
         for fc in function_calls
     ]
-    return await asyncio.gather(*tasks)
+    return await gather_cancelling(*tasks)
 
 
 # ============================================================================
@@ -0,0 +1,68 @@
+# app/core/workflows/direct_answer.py
+"""
+Direct Answer Workflow Module
+
+Fast path for simple queries: one LLM call answers the query directly, with no
+analysis, classification or validation stages. The selector dispatches here
+when a query is assessed as simple with high confidence (see
+DIRECT_ANSWER_* settings), so a short question costs one call instead of the
+three of prompt_chaining or two of routing.
+
+Functions:
+    execute: Main entry point that answers a user query in a single call
+"""
+
+from app.models.schemas import WorkflowSelection, AgentResponse
+from app.core.llm_client import get_llm_client
+from app.core.deadlines import DeadlineExceeded
+from app.core.usage import llm_phase
+from app.core.streaming import step_list, final_output
+from app.core.helpers.persona_utils import generate_agent_context, get_agent_config
+from typing import Tuple, List
+import logging
+
+
+async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tuple[str, List[AgentResponse]]:
+    """
+    Answer a simple query with a single LLM call.
+
+    Args:
+        workflow_selection: Contains workflow configuration and persona definitions
+        user_query: The original query from the user
+
+    Returns:
+        Tuple containing:
+            - final_response: The answer to the user's query
+            - intermediate_steps: The single responder step
+    """
+    llm_client = get_llm_client()
+    personas = workflow_selection.personas or {}
+    intermediate_steps = step_list()
+
+    responder = personas.get("responder_agent", {})
+    responder_config = get_agent_config(responder)
+    role = responder.get("role", "Direct Responder")
+
+    try:
+        with llm_phase("answer", role=role), final_output(role):
+            final_response = await llm_client.generate(
+                prompt=user_query,
+                system_instruction=generate_agent_context(responder, as_system_instruction=True),
+                temperature=responder_config["temperature"],
+                max_tokens=responder_config["max_tokens"],
+                thinking_budget=responder_config["thinking_budget"],
+                cache=responder_config["cache"],
+            )
+    except DeadlineExceeded:
+        raise
+    except Exception as e:
+        logging.error(f"Direct answer failed: {str(e)}")
+        final_response = f"I'm sorry, I couldn't answer that right now: {str(e)}"
+
+    intermediate_steps.append(AgentResponse(
+        agent_role=role,
+        content=final_response,
+        metadata={"workflow": "direct_answer", "complexity": workflow_selection.complexity}
+    ))
+
+    return final_response, intermediate_steps
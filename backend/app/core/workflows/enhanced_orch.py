@@ -5,13 +5,13 @@ from google import genai
 from google.genai import types
 from pydantic import BaseModel
 from typing import List, Tuple, Dict, Any, Optional
-import asyncio
 import logging
 
 from app.models.schemas import WorkflowSelection, AgentResponse
 from app.config import settings
 from app.utils.context_loader import load_context_content
 from app.core.llm_client import get_llm_client, get_functions_client
+from app.core.helpers.fanout import gather_cancelling
 
 
 # ============================================================================
@@ -210,7 +210,7 @@ Execute this subtask thoroughly. Provide a detailed, complete response."""
             break
         
         # Execute in parallel
-        results = await asyncio.gather(
+        results = await gather_cancelling(
             *[process_subtask(st) for st in executable],
             return_exceptions=True
         )
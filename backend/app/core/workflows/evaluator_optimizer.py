@@ -20,6 +20,11 @@ and iterative refinement.
 
 from app.models.schemas import WorkflowSelection, AgentResponse
 from app.core.llm_client import get_llm_client, get_functions_client
+from app.core.deadlines import DeadlineExceeded, deadline_expired
+from app.core.usage import llm_phase
+from app.core.helpers.persona_utils import get_agent_config
+from app.core.streaming import step_list, final_output
+from app.core.helpers.complexity import complexity_budget
 from typing import Tuple, List, Dict, Any
 import logging
 import json
@@ -75,7 +80,7 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     functions_client = get_functions_client()
     llm_client = get_llm_client()
     personas = workflow_selection.personas.get("evaluator_optimizer", {})
-    intermediate_steps = []
+    intermediate_steps = step_list()
     
     # Load context content - REMOVE FROM HERE
     # context_content = load_context_content(settings.CONTEXT_FILE_PATH)
@@ -135,19 +140,25 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
         }
     }
     
+    criteria_config = get_agent_config(personas.get("criteria_agent", {}), cache=True)  # Same query, same criteria
+
     # Prepare the criteria definition prompt - Temporarily remove context_prefix
     criteria_prompt = f"""
     Analyze the following user query and determine the most appropriate evaluation criteria 
     for assessing a response. Consider the task type, potential complexities, and target audience.
+    
+    USER QUERY: {user_query}
     """
     
     try:
         # Get criteria using function calling
-        criteria_response = await functions_client.generate_with_functions(
-            criteria_prompt,
-            [criteria_function],
-            function_call={"name": "define_evaluation_criteria"},
-        )
+        with llm_phase("criteria", role="Evaluation Criteria Designer"):
+            criteria_response = await functions_client.generate_with_functions(
+                criteria_prompt,
+                [criteria_function],
+                function_call={"name": "define_evaluation_criteria"},
+                cache=criteria_config["cache"],
+            )
         
         if criteria_response["type"] == "function_call" and criteria_response["name"] == "define_evaluation_criteria":
             criteria_data = criteria_response["arguments"]
@@ -177,6 +188,8 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
                 "target_audience": "General user",
                 "special_considerations": []
             }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Error in criteria definition: {str(e)}")
         criteria_data = {
@@ -242,7 +255,10 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     
     try:
         # Get initial response
-        initial_response = await llm_client.generate(generator_prompt, temperature=0.7)
+        with llm_phase("generation", role="Content Creator"), final_output("Content Creator"):
+            initial_response = await llm_client.generate(generator_prompt, temperature=0.7)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Error generating initial response: {str(e)}")
         initial_response = f"I apologize, but I encountered an issue while generating the initial response. Error: {str(e)}"
@@ -256,7 +272,8 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     
     # Initialize current response
     current_response = initial_response
-    max_iterations = min(criteria_data["max_iterations"], 3)  # Cap at 3 to prevent excessive iterations
+    # Cap at 3 to prevent excessive iterations, and fewer for simple tasks
+    max_iterations = min(criteria_data["max_iterations"], complexity_budget(workflow_selection).max_refinement_iterations)
     
     # Define the evaluation function
     evaluation_function = {
@@ -312,6 +329,11 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
         # Skip evaluation on the final iteration
         if iteration == max_iterations:
             break
+        
+        # Out of time: return the best response so far instead of starting another round
+        if deadline_expired():
+            logging.warning(f"Request deadline reached, stopping refinement after iteration {iteration - 1}")
+            break
             
         # Step 3: Evaluate the current response
         evaluator_agent = personas.get("evaluator_agent", {})
@@ -339,11 +361,12 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
         
         try:
             # Get evaluation using function calling
-            evaluation_response = await functions_client.generate_with_functions(
-                evaluator_prompt,
-                [evaluation_function],
-                function_call={"name": "evaluate_response"},
-            )
+            with llm_phase("evaluation", role="Quality Assessor"):
+                evaluation_response = await functions_client.generate_with_functions(
+                    evaluator_prompt,
+                    [evaluation_function],
+                    function_call={"name": "evaluate_response"},
+                )
             
             if evaluation_response["type"] == "function_call" and evaluation_response["name"] == "evaluate_response":
                 evaluation = evaluation_response["arguments"]
@@ -362,6 +385,10 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
                     "improvement_suggestions": ["Consider revising for clarity and completeness"],
                     "is_satisfactory": False
                 }
+        except DeadlineExceeded:
+            # Out of time mid-round: the current response is the best we have
+            logging.warning(f"Request deadline reached, stopping refinement during evaluation {iteration}")
+            break
         except Exception as e:
             logging.error(f"Error in response evaluation: {str(e)}")
             evaluation = {
@@ -428,7 +455,11 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
         
         try:
             # Get optimized response
-            optimized_response = await llm_client.generate(optimizer_prompt, temperature=0.6)
+            with llm_phase("optimization", role="Refinement Specialist"), final_output("Refinement Specialist"):
+                optimized_response = await llm_client.generate(optimizer_prompt, temperature=0.6)
+        except DeadlineExceeded:
+            logging.warning(f"Request deadline reached, stopping refinement during optimization {iteration}")
+            break
         except Exception as e:
             logging.error(f"Error in response optimization: {str(e)}")
             optimized_response = current_response + "\n\n[Note: An error occurred during optimization. This is the previous version.]"
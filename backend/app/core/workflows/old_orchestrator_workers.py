@@ -19,10 +19,10 @@ require different types of expertise or processing approaches.
 from app.models.schemas import WorkflowSelection, AgentResponse
 import difflib
 from app.core.llm_client import get_llm_client, get_functions_client
+from app.core.helpers.fanout import gather_cancelling
 from typing import Tuple, List, Dict, Any
 import logging
 import json
-import asyncio
 from app.config import settings # Import settings
 from app.utils.context_loader import load_context_content # Import context loader
 
@@ -285,7 +285,7 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
                 }
         
         # Process all executable subtasks in parallel
-        current_results = await asyncio.gather(
+        current_results = await gather_cancelling(
             *[process_subtask(subtask) for subtask in executable_subtasks]
         )
         
@@ -5,7 +5,6 @@ from google import genai
 from google.genai import types
 from pydantic import BaseModel
 from typing import List, Tuple, Dict, Any, Optional
-import asyncio
 import difflib
 import logging
 
@@ -13,7 +12,12 @@ from app.models.schemas import WorkflowSelection, AgentResponse
 from app.config import settings
 from app.utils.context_loader import load_context_content
 from app.core.llm_client import get_llm_client, get_functions_client
+from app.core.deadlines import DeadlineExceeded, deadline_expired
+from app.core.usage import llm_phase
+from app.core.streaming import step_list, final_output
 from app.core.helpers.persona_utils import generate_agent_context, get_agent_config
+from app.core.helpers.complexity import complexity_budget, scale_thinking_budget
+from app.core.helpers.fanout import gather_cancelling
 
 
 # ============================================================================
@@ -39,6 +43,20 @@ class TaskPlan(BaseModel):
 # Helpers
 # ============================================================================
 
+def limit_subtasks(task_plan: TaskPlan, max_subtasks: int) -> TaskPlan:
+    """Keep the highest-priority subtasks and drop dependencies on removed ones."""
+    if len(task_plan.subtasks) <= max_subtasks:
+        return task_plan
+    kept = sorted(task_plan.subtasks, key=lambda x: x.priority)[:max_subtasks]
+    kept_ids = {st.id for st in kept}
+    subtasks = [
+        st.model_copy(update={"dependencies": [d for d in st.dependencies if d in kept_ids]})
+        for st in task_plan.subtasks if st.id in kept_ids
+    ]
+    logging.info(f"Trimmed task plan from {len(task_plan.subtasks)} to {len(subtasks)} subtasks")
+    return task_plan.model_copy(update={"subtasks": subtasks})
+
+
 def format_subtask_results(subtasks: List[SubTask], results: Dict[str, str]) -> str:
     """Format subtask results for synthesis."""
     formatted = ""
@@ -98,7 +116,7 @@ async def execute(
     # personas is already the dict of agents for this workflow
     # e.g., {"orchestrator_agent": {...}, "worker_agent": {...}, "synthesizer_agent": {...}}
     workflow_personas = workflow_selection.personas or {}
-    intermediate_steps = []
+    intermediate_steps = step_list()
 
     # Load context
     context_content = load_context_content(settings.CONTEXT_FILE_PATH)
@@ -109,6 +127,7 @@ async def execute(
     # =========================================================================
     orchestrator_persona = workflow_personas.get("orchestrator_agent", {})
     orchestrator_config = get_agent_config(orchestrator_persona)
+    budget = complexity_budget(workflow_selection)
     # orchestrator_agent = workflow_personas.get("orchestrator_agent", {})
     # orchestrator_system = generate_agent_context(orchestrator_agent)
 
@@ -118,7 +137,7 @@ async def execute(
 
 Analyze this request and create a detailed execution plan:
 1. Understand the overall task requirements
-2. Break it into logical subtasks with clear boundaries
+2. Break it into at most {budget.max_subtasks} logical subtasks with clear boundaries
 3. Identify required expertise for each subtask
 4. Determine dependencies between subtasks
 5. Create an execution strategy
@@ -126,13 +145,17 @@ Analyze this request and create a detailed execution plan:
 Be specific - workers will execute based on your instructions."""
 
     try:
-        task_plan = await functions_client.generate_structured(
-            prompt=planning_prompt,
-            response_schema=TaskPlan,
-            system_instruction=generate_agent_context(orchestrator_persona, as_system_instruction=True),
-            thinking_budget=orchestrator_config["thinking_budget"],
-            temperature=orchestrator_config["temperature"],
-        )
+        with llm_phase("planning", role="Task Coordinator"):
+            task_plan = await functions_client.generate_structured(
+                prompt=planning_prompt,
+                response_schema=TaskPlan,
+                system_instruction=generate_agent_context(orchestrator_persona, as_system_instruction=True),
+                thinking_budget=scale_thinking_budget(orchestrator_config["thinking_budget"], workflow_selection),
+                temperature=orchestrator_config["temperature"],
+                cache=orchestrator_config["cache"],
+            )
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Task planning failed: {e}")
         task_plan = TaskPlan(
@@ -147,6 +170,7 @@ Be specific - workers will execute based on your instructions."""
             )],
             execution_strategy="Execute single comprehensive task"
         )
+    task_plan = limit_subtasks(task_plan, budget.max_subtasks)
 
     # Record planning step
     intermediate_steps.append(AgentResponse(
@@ -196,12 +220,14 @@ DESCRIPTION: {subtask.description}
 Execute this subtask thoroughly."""
 
         try:
-            response = await llm_client.generate(
-                prompt=worker_prompt,
-                system_instruction=worker_system,
-                thinking_budget=worker_config["thinking_budget"],  # 0 from persona
-                temperature=worker_config["temperature"],          # 0.5 from persona
-            )
+            with llm_phase("workers", role=f"{subtask.required_expertise} Specialist"):
+                response = await llm_client.generate(
+                    prompt=worker_prompt,
+                    system_instruction=worker_system,
+                    thinking_budget=worker_config["thinking_budget"],  # 0 from persona
+                    temperature=worker_config["temperature"],          # 0.5 from persona
+                    cache=worker_config["cache"],
+                )
             return {
                 "subtask_id": subtask.id,
                 "title": subtask.title,
@@ -209,6 +235,8 @@ Execute this subtask thoroughly."""
                 "response": response,
                 "success": True
             }
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logging.error(f"Worker failed on {subtask.id}: {e}")
             return {
@@ -233,12 +261,14 @@ Execute this subtask thoroughly."""
             # Force process remaining to avoid infinite loop
             executable = pending_subtasks[:1]
         
-        results = await asyncio.gather(
+        results = await gather_cancelling(
             *[process_subtask(st) for st in executable],
             return_exceptions=True
         )
         
         for result in results:
+            if isinstance(result, DeadlineExceeded):
+                raise result
             if isinstance(result, Exception):
                 logging.error(f"Subtask exception: {result}")
                 continue
@@ -295,16 +325,22 @@ CRITICAL CONSTRAINTS:
     synthesized_response = None
     
     for attempt in range(max_synthesis_attempts):
+        if attempt > 0 and synthesized_response and deadline_expired():
+            # Keep the first synthesis rather than replacing it with the error fallback
+            logging.warning("Request deadline reached, skipping synthesis retry")
+            break
         try:
-            synthesized_response = await llm_client.generate(
-                prompt=synthesis_prompt if attempt == 0 else synthesis_prompt + 
-                    "\n\nADDITIONAL CONSTRAINT: Your previous synthesis was too similar to worker outputs. "
-                    "Write a completely fresh, distilled summary in your own words.",
-                system_instruction=synthesizer_system,
-                thinking_budget=synthesizer_config["thinking_budget"],
-                temperature=synthesizer_config["temperature"] - (attempt * 0.1),  # Lower temp on retry
-                max_tokens=synthesizer_config["max_tokens"],
-            )
+            with llm_phase("synthesis", role="Results Integrator"), final_output("Results Integrator"):
+                synthesized_response = await llm_client.generate(
+                    prompt=synthesis_prompt if attempt == 0 else synthesis_prompt + 
+                        "\n\nADDITIONAL CONSTRAINT: Your previous synthesis was too similar to worker outputs. "
+                        "Write a completely fresh, distilled summary in your own words.",
+                    system_instruction=synthesizer_system,
+                    thinking_budget=scale_thinking_budget(synthesizer_config["thinking_budget"], workflow_selection),
+                    temperature=synthesizer_config["temperature"] - (attempt * 0.1),  # Lower temp on retry
+                    max_tokens=synthesizer_config["max_tokens"],
+                    cache=synthesizer_config["cache"],
+                )
             
             # Plagiarism check (restored from v1)
             if not check_synthesis_plagiarism(synthesized_response, subtask_results):
@@ -313,6 +349,12 @@ CRITICAL CONSTRAINTS:
             if attempt < max_synthesis_attempts - 1:
                 logging.info(f"Synthesis attempt {attempt + 1} too similar, retrying...")
                 
+        except DeadlineExceeded:
+            if synthesized_response is None:
+                raise
+            # Keep the earlier synthesis rather than failing the request
+            logging.warning("Request deadline reached during synthesis retry, keeping the previous synthesis")
+            break
         except Exception as e:
             logging.error(f"Synthesis attempt {attempt + 1} failed: {e}")
             if attempt == max_synthesis_attempts - 1:
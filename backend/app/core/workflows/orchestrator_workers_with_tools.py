@@ -14,7 +14,6 @@ from google import genai
 from google.genai import types
 from pydantic import BaseModel
 from typing import List, Tuple, Dict, Any, Optional
-import asyncio
 import difflib
 import logging
 import json
@@ -24,6 +23,7 @@ from app.config import settings
 from app.utils.context_loader import load_context_content
 from app.core.llm_client import get_llm_client, get_functions_client
 from app.core.helpers.persona_utils import generate_agent_context, get_agent_config
+from app.core.helpers.fanout import gather_cancelling
 from app.services.gemini_tools import GeminiToolsAdapter, create_tools_for_role
 
 
@@ -306,7 +306,7 @@ Execute this subtask thoroughly using the available tools."""
             logging.error("Circular dependency or unresolvable state")
             executable = pending_subtasks[:1]
         
-        results = await asyncio.gather(
+        results = await gather_cancelling(
             *[process_subtask_with_tools(st) for st in executable],
             return_exceptions=True
         )
@@ -5,7 +5,8 @@ A hybrid workflow that combines parallel sectioning (task decomposition) with
 multi-perspective voting (quality validation) for higher quality outputs.
 
 Workflow Phases:
-1. Task Sectioning: Break the query into 3-5 independent subtasks
+1. Task Sectioning: Break the query into independent subtasks (how many
+   depends on the selector's complexity assessment; 3-5 for medium tasks)
 2. Parallel Processing: Process each subtask with a worker agent
 3. Multi-Perspective Voting: Evaluate each worker output from multiple perspectives
 4. Consensus Aggregation: Combine validated section outputs into a cohesive response
@@ -13,10 +14,14 @@ Workflow Phases:
 
 from app.models.schemas import WorkflowSelection, AgentResponse
 from app.core.llm_client import get_llm_client, get_functions_client
+from app.core.deadlines import DeadlineExceeded
 from app.core.helpers.persona_utils import generate_agent_context, get_agent_config
+from app.core.helpers.complexity import complexity_budget
+from app.core.helpers.fanout import gather_cancelling
+from app.core.usage import llm_phase
+from app.core.streaming import step_list, final_output
 from typing import Tuple, List, Dict, Any
 import logging
-import asyncio
 
 
 async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tuple[str, List[AgentResponse]]:
@@ -41,7 +46,7 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     functions_client = get_functions_client()
     llm_client = get_llm_client()
     personas = workflow_selection.personas.get("parallel_section_voting", {})
-    intermediate_steps = []
+    intermediate_steps = step_list()
     
     # ==========================================================================
     # PHASE 1: Task Sectioning
@@ -95,12 +100,18 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
         }
     }
     
+    budget = complexity_budget(workflow_selection)
+    section_range = (
+        str(budget.max_sections) if budget.min_sections == budget.max_sections
+        else f"{budget.min_sections}-{budget.max_sections}"
+    )
+
     sectioning_prompt = f"""
     {generate_agent_context(section_planner)}
     
     USER QUERY: {user_query}
     
-    Your task is to break down this complex query into 3-5 independent sections that can be:
+    Your task is to break down this query into {section_range} independent sections that can be:
     1. Processed in parallel by worker agents
     2. Validated through multi-perspective voting
     
@@ -113,20 +124,27 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     """
     
     try:
-        breakdown_response = await functions_client.generate_with_functions(
-            sectioning_prompt,
-            [task_breakdown_function],
-            function_call={"name": "break_into_sections"}
-        )
+        with llm_phase("sectioning", role="Section Planner"):
+            breakdown_response = await functions_client.generate_with_functions(
+                sectioning_prompt,
+                [task_breakdown_function],
+                function_call={"name": "break_into_sections"}
+            )
         
         if breakdown_response["type"] == "function_call" and breakdown_response["name"] == "break_into_sections":
             task_breakdown = breakdown_response["arguments"]
         else:
             logging.warning("Task breakdown function call not returned, using default breakdown")
             task_breakdown = _get_default_breakdown()
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Error in task breakdown: {str(e)}")
         task_breakdown = _get_default_breakdown(str(e))
+
+    if len(task_breakdown["sections"]) > budget.max_sections:
+        logging.info(f"Trimming {len(task_breakdown['sections'])} sections to {budget.max_sections} for a {workflow_selection.complexity} task")
+        task_breakdown["sections"] = task_breakdown["sections"][:budget.max_sections]
     
     # Record the sectioning step
     intermediate_steps.append(AgentResponse(
@@ -161,17 +179,20 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
         """
         
         try:
-            worker_response = await llm_client.generate(
-                worker_prompt, 
-                temperature=get_agent_config(section_worker).get("temperature", 0.7)
-            )
+            with llm_phase("section_workers", role=f"{section['perspective']} Worker"):
+                worker_response = await llm_client.generate(
+                    worker_prompt, 
+                    temperature=get_agent_config(section_worker).get("temperature", 0.7)
+                )
+        except DeadlineExceeded:
+            raise
         except Exception as e:
             logging.error(f"Error processing section {section['id']}: {str(e)}")
             worker_response = f"Error processing this section: {str(e)}"
         
         # Step 2b: Multi-perspective voting on the worker output
         voting_perspectives = ["accuracy", "completeness", "clarity"]
-        votes = await asyncio.gather(
+        votes = await gather_cancelling(
             *[vote_on_section(section, worker_response, perspective, section_voter) 
               for perspective in voting_perspectives]
         )
@@ -194,7 +215,7 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
         }
     
     # Process all sections in parallel (each section goes through worker + voting)
-    section_results = await asyncio.gather(
+    section_results = await gather_cancelling(
         *[process_and_vote_section(section) for section in task_breakdown["sections"]]
     )
     
@@ -255,10 +276,13 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     """
     
     try:
-        aggregated_response = await llm_client.generate(
-            aggregation_prompt,
-            temperature=get_agent_config(consensus_aggregator).get("temperature", 0.7)
-        )
+        with llm_phase("aggregation", role="Consensus Aggregator"), final_output("Consensus Aggregator"):
+            aggregated_response = await llm_client.generate(
+                aggregation_prompt,
+                temperature=get_agent_config(consensus_aggregator).get("temperature", 0.7)
+            )
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Error in aggregation: {str(e)}")
         # Fallback: concatenate validated sections
@@ -344,11 +368,12 @@ async def vote_on_section(
     """
     
     try:
-        vote_response = await functions_client.generate_with_functions(
-            vote_prompt,
-            [vote_function],
-            function_call={"name": "cast_vote"}
-        )
+        with llm_phase("voting", role=f"{perspective} Voter"):
+            vote_response = await functions_client.generate_with_functions(
+                vote_prompt,
+                [vote_function],
+                function_call={"name": "cast_vote"}
+            )
         
         if vote_response["type"] == "function_call" and vote_response["name"] == "cast_vote":
             vote = vote_response["arguments"]
@@ -361,6 +386,8 @@ async def vote_on_section(
                 "confidence": 0.5,
                 "reasoning": "Unable to parse vote response"
             }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Error in voting for section {section['id']} from {perspective}: {str(e)}")
         return {
@@ -20,6 +20,10 @@ Functions:
 
 from app.models.schemas import WorkflowSelection, AgentResponse
 from app.core.llm_client import get_llm_client
+from app.core.deadlines import DeadlineExceeded
+from app.core.usage import llm_phase
+from app.core.streaming import step_list, final_output
+from app.core.helpers.persona_utils import get_agent_config
 # Remove tool-related imports
 from typing import Tuple, List
 import logging
@@ -51,7 +55,7 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     """
     llm_client = get_llm_client()
     personas = workflow_selection.personas.get("prompt_chaining", {})
-    intermediate_steps: List[AgentResponse] = []
+    intermediate_steps: List[AgentResponse] = step_list()
     
     # Load context content - REMOVE FROM HERE
     # context_content = load_context_content(settings.CONTEXT_FILE_PATH)
@@ -71,7 +75,10 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     step1_result_content = "No analysis generated."
     try:
         # Use simple generation
-        step1_result_content = await llm_client.generate(step1_prompt)
+        with llm_phase("initial_processing", role="Initial Processor"):
+            step1_result_content = await llm_client.generate(step1_prompt)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error during Step 1 LLM call: {e}", exc_info=True)
         step1_result_content = f"Error during initial processing: {e}"
@@ -83,6 +90,7 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     
     # Gate: Validate the Step 1 Output
     gate_agent = personas.get("gate_agent", {})
+    gate_config = get_agent_config(gate_agent, cache=True)  # Same output, same verdict
     gate_prompt = f"""
     {generate_agent_context(gate_agent)}
     
@@ -102,8 +110,11 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     
     gate_result = "PASS" # Default to pass if error occurs
     try:
-        gate_response = await llm_client.generate(gate_prompt)
+        with llm_phase("validation_gate", role="Validator"):
+            gate_response = await llm_client.generate(gate_prompt, cache=gate_config["cache"])
         gate_result = gate_response.strip()
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error during Gate validation LLM call: {e}", exc_info=True)
         gate_result = f"FAIL: Error during validation - {e}" # Treat LLM error as failure
@@ -136,7 +147,10 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     final_response = "Could not generate final response."
     try:
         # Use simple generation
-        final_response = await llm_client.generate(step2_prompt)
+        with llm_phase("refinement", role="Refiner"), final_output("Refiner"):
+            final_response = await llm_client.generate(step2_prompt)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logger.error(f"Error during Step 2 LLM call: {e}", exc_info=True)
         final_response = f"Error during final response generation: {e}"
@@ -24,6 +24,10 @@ from app.models.schemas import (
 )
 from app.config import settings
 from app.core.llm_client import get_functions_client, get_llm_client
+from app.core.deadlines import DeadlineExceeded
+from app.core.usage import llm_phase
+from app.core.streaming import step_list
+from app.core.helpers.complexity import scale_thinking_budget
 
 
 # ============================================================================
@@ -100,7 +104,7 @@ async def execute(
     llm_client = get_llm_client()
     
     workflow_personas = workflow_selection.personas.get("prompt_generator", {})
-    intermediate_steps = []
+    intermediate_steps = step_list()
     
     # =========================================================================
     # STEP 1: Analyze the Task
@@ -124,12 +128,15 @@ Provide a thorough analysis including:
 6. Identify potential challenges and edge cases"""
 
     try:
-        analysis: PromptAnalysis = await functions_client.generate_structured(
-            prompt=analysis_prompt,
-            response_schema=PromptAnalysis,
-            system_instruction=generate_agent_context(analyzer_agent),
-            thinking_budget=1024,
-        )
+        with llm_phase("analysis", role="Task Analyst"):
+            analysis: PromptAnalysis = await functions_client.generate_structured(
+                prompt=analysis_prompt,
+                response_schema=PromptAnalysis,
+                system_instruction=generate_agent_context(analyzer_agent),
+                thinking_budget=scale_thinking_budget(1024, workflow_selection),
+            )
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Task analysis failed: {e}")
         # Fallback analysis
@@ -186,12 +193,15 @@ Generate a complete, production-ready prompt with all required sections.
 The 'rendered_prompt' field should contain the final markdown-formatted prompt ready for use."""
 
     try:
-        generated: GeneratedPrompt = await functions_client.generate_structured(
-            prompt=generation_prompt,
-            response_schema=GeneratedPrompt,
-            system_instruction=generate_agent_context(generator_agent),
-            thinking_budget=2048,  # Higher budget for creative generation
-        )
+        with llm_phase("generation", role="Prompt Engineer"):
+            generated: GeneratedPrompt = await functions_client.generate_structured(
+                prompt=generation_prompt,
+                response_schema=GeneratedPrompt,
+                system_instruction=generate_agent_context(generator_agent),
+                thinking_budget=scale_thinking_budget(2048, workflow_selection),  # Higher budget for creative generation
+            )
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Prompt generation failed: {e}")
         raise RuntimeError(f"Failed to generate prompt: {e}")
@@ -251,11 +261,14 @@ Provide:
 4. Final recommendation (approve/revise)"""
 
     try:
-        review_response = await llm_client.generate(
-            prompt=review_prompt,
-            system_instruction=generate_agent_context(reviewer_agent),
-            temperature=0.3,  # Lower temperature for critical review
-        )
+        with llm_phase("review", role="Prompt Reviewer"):
+            review_response = await llm_client.generate(
+                prompt=review_prompt,
+                system_instruction=generate_agent_context(reviewer_agent),
+                temperature=0.3,  # Lower temperature for critical review
+            )
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.warning(f"Review step failed: {e}")
         review_response = "Review skipped due to error."
@@ -365,9 +378,10 @@ Create a complete, production-ready prompt with:
 and robust prompts optimized for AI agents. Use direct language, include all necessary 
 sections, and ensure the prompt handles edge cases appropriately."""
 
-    return await functions_client.generate_structured(
-        prompt=prompt,
-        response_schema=GeneratedPrompt,
-        system_instruction=system_instruction,
-        thinking_budget=2048,
-    )
\ No newline at end of file
+    with llm_phase("generation", role="Prompt Engineer"):
+        return await functions_client.generate_structured(
+            prompt=prompt,
+            response_schema=GeneratedPrompt,
+            system_instruction=system_instruction,
+            thinking_budget=2048,
+        )
\ No newline at end of file
@@ -18,6 +18,10 @@ Functions:
 
 from app.models.schemas import WorkflowSelection, AgentResponse
 from app.core.llm_client import get_llm_client, get_functions_client
+from app.core.deadlines import DeadlineExceeded
+from app.core.usage import llm_phase
+from app.core.helpers.persona_utils import get_agent_config
+from app.core.streaming import step_list, final_output
 from typing import Tuple, List, Dict, Any
 import logging
 import json
@@ -40,10 +44,11 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     functions_client = get_functions_client()
     llm_client = get_llm_client()
     personas = workflow_selection.personas.get("routing", {})
-    intermediate_steps = []
+    intermediate_steps = step_list()
     
     # Step 1: Classify the query using the classifier agent
     classifier_agent = personas.get("classifier_agent", {})
+    classifier_config = get_agent_config(classifier_agent, cache=True)  # Same query, same category
     
     # Define categories for classification
     categories = ["technical_support", "account_management", "product_information", "billing_support", "general_inquiry"]
@@ -91,11 +96,13 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     
     try:
         # Get classification using function calling
-        classification_response = await functions_client.generate_with_functions(
-            classifier_prompt,
-            [classification_function],
-            function_call={"name": "classify_query"}
-        )
+        with llm_phase("classification", role="Query Classifier"):
+            classification_response = await functions_client.generate_with_functions(
+                classifier_prompt,
+                [classification_function],
+                function_call={"name": "classify_query"},
+                cache=classifier_config["cache"],
+            )
         
         if classification_response["type"] == "function_call" and classification_response["name"] == "classify_query":
             classification = classification_response["arguments"]
@@ -107,6 +114,8 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
                 "confidence": 0.5,
                 "reasoning": "Fallback classification due to unexpected response format"
             }
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Error in query classification: {str(e)}")
         classification = {
@@ -152,16 +161,21 @@ async def execute(workflow_selection: WorkflowSelection, user_query: str) -> Tup
     Please provide a comprehensive and helpful response to the user's query.
     """
     
+    specialist_role = f"{category.replace('_', ' ').title()} Specialist"
+    
     try:
         # Get specialist response
-        specialist_response = await llm_client.generate(specialist_prompt, temperature=0.7)
+        with llm_phase("specialist", role=specialist_role), final_output(specialist_role):
+            specialist_response = await llm_client.generate(specialist_prompt, temperature=0.7)
+    except DeadlineExceeded:
+        raise
     except Exception as e:
         logging.error(f"Error getting specialist response: {str(e)}")
         specialist_response = f"I apologize, but I encountered an issue while processing your {category.replace('_', ' ')} request. Please try again or contact our support team directly."
     
     # Record the specialist response
     intermediate_steps.append(AgentResponse(
-        agent_role=f"{category.replace('_', ' ').title()} Specialist",
+        agent_role=specialist_role,
         content=specialist_response,
         metadata={"category": category}
     ))
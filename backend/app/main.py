@@ -2,6 +2,7 @@
 import sys
 import uvicorn
 from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.api.endpoints import workflows
 from app.config import settings
@@ -24,11 +25,41 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
+def _preload_workflows():
+    """Import the WORKFLOW_PRELOAD workflows and log the import cost of each workflow module."""
+    from app.core.workflow_registry import get_workflow_registry
+    
+    registry = get_workflow_registry()
+    preload = [name.strip() for name in settings.WORKFLOW_PRELOAD.split(",") if name.strip()]
+    if preload == ["all"]:
+        preload = registry.names()
+    registry.preload(preload)
+    for name, info in registry.import_report().items():
+        if info["loaded"]:
+            logging.info(f"Workflow {name}: imported in {info['import_seconds'] * 1000:.1f}ms ({info['modules_loaded']} modules)")
+        else:
+            logging.info(f"Workflow {name}: lazy ({info['module']})")
+
 # Initialize tools on startup
 @app.on_event("startup")
 async def startup_event():
     # init_tools()
-    pass
+    _preload_workflows()
+    if settings.is_gemini_configured and settings.LLM_HTTP_WARMUP:
+        from app.core.gemini_transport import warm_up
+        await warm_up()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    from app.core.gemini_transport import close
+    from app.core.cassettes import close_cassette
+    from app.core.selection_cache import save_selection_cache
+    await workflows.job_manager.shutdown()
+    if workflows.response_saver is not None:
+        await workflows.response_saver.close()
+    await close()
+    close_cassette()
+    save_selection_cache()
 
 # 
 # Configure CORS
@@ -47,6 +78,12 @@ app.include_router(workflows.router, prefix="/api")
 async def root():
     return {"message": "Welcome to the Dynamic Workflow API"}
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint (text exposition format 0.0.4)."""
+    from app.core.metrics import render
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
 
 
 if __name__ == "__main__":
@@ -16,12 +16,28 @@ class WorkflowSelection(BaseModel):
     personas: Optional[Dict[str, Dict[str, Any]]] = None
     confidence: Optional[float] = Field(default=None, ge=0.0, le=1.0, description="Selection confidence score")
     complexity: Optional[str] = Field(default=None, description="Task complexity: simple, medium, or complex")
+    alternative_workflow: Optional[str] = Field(default=None, description="Runner-up workflow named by the selector, if any")
 
 class AgentResponse(BaseModel):
     agent_role: str
     content: str 
     metadata: Optional[Dict[str, Any]] = None 
 
+class UsageTotals(BaseModel):
+    calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    thinking_tokens: int = 0
+    cached_tokens: int = 0
+    total_tokens: int = 0
+    llm_seconds: float = Field(default=0.0, description="Summed wall time of the LLM calls (overlaps when parallel)")
+
+class UsageSummary(BaseModel):
+    totals: UsageTotals = Field(default_factory=UsageTotals)
+    by_phase: Dict[str, UsageTotals] = Field(default_factory=dict)
+    by_role: Dict[str, UsageTotals] = Field(default_factory=dict)
+    cache_hits: int = 0
+
 class WorkflowResponse(BaseModel):
     session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
     workflow_info: WorkflowSelection
@@ -29,6 +45,34 @@ class WorkflowResponse(BaseModel):
     intermediate_steps: Optional[List[AgentResponse]] = None
     error: Optional[str] = None
     processing_time: float 
+    usage: Optional[UsageSummary] = None
+    archived_from: Optional[str] = Field(default=None, description="session_id of the archived response this answer was served from")
+    degraded: Optional[str] = Field(default=None, description='"reduced" or "cheapest" if admission control degraded the query under load')
+
+class BatchRequest(BaseModel):
+    requests: List[QueryRequest] = Field(min_length=1)
+    max_concurrency: Optional[int] = Field(default=None, ge=1, description="Queries in flight (capped by BATCH_MAX_CONCURRENCY)")
+    token_budget: Optional[int] = Field(default=None, ge=1, description="Stop starting queries once the batch used this many tokens")
+
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class JobInfo(BaseModel):
+    job_id: str
+    status: JobStatus
+    created_at: float = Field(description="Submission time (Unix seconds)")
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    queue_position: Optional[int] = Field(default=None, description="1-based position while queued")
+    workflow_info: Optional[WorkflowSelection] = None
+    intermediate_steps: List[AgentResponse] = Field(default_factory=list, description="Steps completed so far")
+    partial_response: Optional[str] = Field(default=None, description="Final answer text streamed so far")
+    result: Optional[WorkflowResponse] = None
+    error: Optional[str] = None
 
 class AgentRole(str, Enum):
     PERCEPTION = "perception"
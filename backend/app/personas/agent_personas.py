@@ -15,7 +15,8 @@ Structure:
                 "config": {            # Per-agent SDK config
                     "thinking_budget": int,  # 0=fast, 1024+=deep reasoning
                     "temperature": float,    # 0.0-1.0
-                    "max_tokens": int        # Max output tokens
+                    "max_tokens": int,       # Max output tokens
+                    "cache": bool            # Optional: serve repeats from the LLM response cache
                 }
             }
         }
@@ -314,6 +315,28 @@ agent_personas = {
         }
     },
 
+    # =========================================================================
+    # DIRECT ANSWER
+    # Single-call fast path for simple queries
+    # =========================================================================
+    "direct_answer": {
+        "responder_agent": {
+            "role": "Direct Responder",
+            "persona": "Clear, accurate and concise, answering the question asked without unnecessary preamble.",
+            "description": "Answers simple, well-defined queries directly in a single response.",
+            "strengths": [
+                "Concise answers",
+                "Factual accuracy",
+                "Plain explanations"
+            ],
+            "config": {
+                "thinking_budget": 0,  # Fast path: no thinking on models that allow it
+                "temperature": 0.5,
+                "max_tokens": 4096,
+            }
+        }
+    },
+
     # =========================================================================
     # META - Workflow infrastructure (not user-facing workflows)
     # =========================================================================
@@ -332,6 +355,7 @@ agent_personas = {
                 "thinking_budget": 128,  # Fast classification, no deep reasoning needed
                 "temperature": 0.3,  # Deterministic routing
                 "max_tokens": 1024,
+                "cache": True,  # Identical queries get identical routing
             }
         },
         "error_handler": {
@@ -1,25 +1,107 @@
+"""
+Response Archive
+
+Persists every WorkflowResponse without blocking the request that produced it.
+``save_response`` only enqueues; a background writer task drains a bounded
+queue, serializes in a worker thread and appends each batch as one gzip member
+to a compressed JSONL segment:
+
+    responses/2026/10/17/responses-143005-4242.jsonl.gz
+
+Segments are sharded by UTC day and rotate at RESPONSES_SEGMENT_MAX_MB, so the
+archive stays a few files per day instead of one file per response. When the
+queue is full, responses are dropped (and counted) rather than stalling the
+event loop. Each line is
+``{"saved_at", "query", "user_id", "response": WorkflowResponse}``.
+
+With an ``index`` (app.core.response_index) each written batch is also added
+to the searchable archive index, still off the event loop.
+
+RESPONSES_FORMAT=markdown keeps the previous one-markdown-file-per-response
+layout (also written in the background, sharded by day); markdown for a JSONL
+archive can be rendered offline:
+
+    python -m app.utils.response_saver export --out exported_md [--session-id ID]
+"""
+
+import argparse
+import asyncio
+import gzip
 import os
 import json
-from datetime import datetime
+import logging
+import sys
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import List, Optional
-from app.models.schemas import WorkflowResponse, AgentResponse
+from typing import Any, Dict, Iterator, List, Optional
+from app.models.schemas import WorkflowResponse, AgentResponse, QueryRequest
+
+
+def iter_archive(base_dir: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield the records of every JSONL segment under ``base_dir``, oldest first.
+    
+    A truncated final gzip member (from a crash mid-write) ends its segment.
+    """
+    for path in sorted(Path(base_dir).rglob("*.jsonl.gz")):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+        except (EOFError, OSError, json.JSONDecodeError) as e:
+            logging.warning(f"Stopped reading damaged archive segment {path}: {e}")
+
 
 class ResponseSaver:
-    def __init__(self, base_dir: str = "responses"):
+    def __init__(
+        self,
+        base_dir: str = "responses",
+        format: str = "jsonl",
+        queue_size: int = 1000,
+        batch_size: int = 50,
+        flush_seconds: float = 1.0,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        index: Optional[Any] = None,
+    ):
         """
         Initialize the ResponseSaver with a base directory for saving responses.
         
         Args:
             base_dir (str): Base directory where responses will be saved. Defaults to "responses".
+            format (str): "jsonl" (compressed segments) or "markdown" (one file per response).
+            queue_size (int): Responses waiting to be written before new ones are dropped.
+            batch_size (int): Maximum responses written per batch.
+            flush_seconds (float): Longest a queued response waits for its batch to fill.
+            segment_max_bytes (int): Size at which a JSONL segment is rotated.
+            index (ResponseIndex, optional): Index that written batches are added to.
         """
+        if format not in ("jsonl", "markdown"):
+            raise ValueError(f"Unknown responses format '{format}' (expected 'jsonl' or 'markdown')")
         self.base_dir = Path(base_dir)
+        self.format = format
+        self.queue_size = max(1, queue_size)
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.segment_max_bytes = segment_max_bytes
+        self.index = index
+        self.stats = {"queued": 0, "written": 0, "dropped": 0, "failed": 0, "batches": 0, "segments": 0, "bytes": 0}
+        self._queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._segment: Optional[Path] = None
+        self._segment_day: Optional[str] = None
         self._ensure_directory_exists()
     
     def _ensure_directory_exists(self):
         """Create the base directory if it doesn't exist."""
         os.makedirs(self.base_dir, exist_ok=True)
     
+    def _shard_dir(self, timestamp: datetime) -> Path:
+        """Day shard (YYYY/MM/DD) for a timestamp, created on demand."""
+        shard = self.base_dir / timestamp.strftime("%Y/%m/%d")
+        shard.mkdir(parents=True, exist_ok=True)
+        return shard
+    
     def _format_filename(self, session_id: str, timestamp: Optional[datetime] = None) -> str:
         """
         Generate a filename for the response.
@@ -88,22 +170,173 @@ class ResponseSaver:
         
         return "\n".join(lines)
     
-    def save_response(self, response: WorkflowResponse) -> Path:
+    def _record(self, response: WorkflowResponse, request: Optional[QueryRequest], saved_at: datetime) -> Dict[str, Any]:
+        return {
+            "saved_at": saved_at.isoformat(),
+            "query": request.query if request is not None else None,
+            "user_id": request.user_id if request is not None else None,
+            "response": response.model_dump(mode="json"),
+        }
+    
+    def save_response(self, response: WorkflowResponse, request: Optional[QueryRequest] = None) -> bool:
         """
-        Save a workflow response to a markdown file.
+        Queue a workflow response for the background writer.
+        
+        Outside an event loop (scripts) the response is written immediately.
         
         Args:
             response (WorkflowResponse): The workflow response to save.
+            request (QueryRequest, optional): The request it answers (its query is archived too).
         
         Returns:
-            Path: Path to the saved file.
+            bool: False if the queue was full and the response was dropped.
         """
-        filename = self._format_filename(response.session_id)
-        file_path = self.base_dir / filename
+        item = (response, request, datetime.now(timezone.utc))
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            self._write_batch([item])
+            return True
         
-        markdown_content = self._format_markdown(response)
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            logging.warning(f"Response archive queue is full, dropping response {response.session_id}")
+            return False
+        self.stats["queued"] += 1
+        return True
+    
+    def _ensure_writer(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._writer_task is None or self._writer_task.done():
+            self._writer_task = asyncio.create_task(self._writer())
+    
+    async def _writer(self) -> None:
+        """Drain the queue in batches, writing each batch in a worker thread."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.flush_seconds
+            while len(batch) < self.batch_size and batch[-1] is not None:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            
+            stop = batch[-1] is None
+            items = [item for item in batch if item is not None]
+            if items:
+                try:
+                    await asyncio.to_thread(self._write_batch, items)
+                except Exception as e:
+                    self.stats["failed"] += len(items)
+                    logging.error(f"Error saving {len(items)} responses: {str(e)}")
+            if stop:
+                return
+    
+    def _write_batch(self, items: List[Any]) -> None:
+        """Serialize and append a batch, then index it (runs in a worker thread)."""
+        records = [self._record(response, request, saved_at) for response, request, saved_at in items]
+        if self.format == "markdown":
+            for response, _, saved_at in items:
+                file_path = self._shard_dir(saved_at) / self._format_filename(response.session_id, saved_at)
+                with open(file_path, "w", encoding="utf-8") as f:
+                    f.write(self._format_markdown(response))
+        else:
+            lines = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+            data = gzip.compress(lines.encode("utf-8"))
+            with open(self._segment_path(items[0][2]), "ab") as f:
+                f.write(data)
+            self.stats["bytes"] += len(data)
+        self.stats["written"] += len(items)
+        self.stats["batches"] += 1
+        
+        if self.index is not None:
+            try:
+                self.index.add_many(records)
+            except Exception as e:
+                logging.error(f"Error indexing {len(records)} archived responses: {str(e)}")
+    
+    def _segment_path(self, timestamp: datetime) -> Path:
+        """The current JSONL segment, rotated by day and size."""
+        day = timestamp.strftime("%Y/%m/%d")
+        if (
+            self._segment is None
+            or self._segment_day != day
+            or (self._segment.exists() and self._segment.stat().st_size >= self.segment_max_bytes)
+        ):
+            name = f"responses-{timestamp.strftime('%H%M%S')}-{os.getpid()}"
+            shard = self._shard_dir(timestamp)
+            path = shard / f"{name}.jsonl.gz"
+            suffix = 1
+            while path.exists():
+                path = shard / f"{name}-{suffix}.jsonl.gz"
+                suffix += 1
+            self._segment = path
+            self._segment_day = day
+            self.stats["segments"] += 1
+        return self._segment
+    
+    async def close(self) -> None:
+        """Write everything still queued and stop the background writer."""
+        if self._writer_task is None or self._writer_task.done():
+            return
+        await self._queue.put(None)
+        await self._writer_task
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return queue depth and queued/written/dropped/failed counts, batches, segments and bytes."""
+        stats = dict(self.stats)
+        stats["format"] = self.format
+        stats["pending"] = self._queue.qsize() if self._queue is not None else 0
+        stats["queue_size"] = self.queue_size
+        return stats
+    
+    def export_markdown(self, out_dir: str, session_id: Optional[str] = None) -> int:
+        """
+        Render archived responses as markdown files (one per response).
         
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(markdown_content)
+        Args:
+            out_dir (str): Directory for the markdown files.
+            session_id (str, optional): Only export this session's responses.
         
-        return file_path 
\ No newline at end of file
+        Returns:
+            int: Number of files written.
+        """
+        os.makedirs(out_dir, exist_ok=True)
+        count = 0
+        for record in iter_archive(str(self.base_dir)):
+            response = WorkflowResponse.model_validate(record["response"])
+            if session_id and response.session_id != session_id:
+                continue
+            saved_at = datetime.fromisoformat(record["saved_at"])
+            with open(Path(out_dir) / self._format_filename(response.session_id, saved_at), "w", encoding="utf-8") as f:
+                f.write(self._format_markdown(response))
+            count += 1
+        return count
+
+
+def main(argv: Optional[list] = None) -> int:
+    from app.config import settings
+    
+    parser = argparse.ArgumentParser(description="Work with the compressed response archive.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export", help="Render archived responses as markdown")
+    export.add_argument("--dir", default=settings.RESPONSES_DIR, help="Archive directory (default: RESPONSES_DIR)")
+    export.add_argument("--out", required=True, help="Output directory for markdown files")
+    export.add_argument("--session-id", help="Only export this session")
+    args = parser.parse_args(argv)
+    
+    count = ResponseSaver(args.dir).export_markdown(args.out, session_id=args.session_id)
+    print(f"Exported {count} responses to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())